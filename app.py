@@ -1,14 +1,18 @@
+import click
 from flask import Flask, render_template, request, redirect, send_file
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash
 import os
 
 # Import extensions
-from extensions import db, jwt, bcrypt, migrate
+from extensions import db, jwt, bcrypt, migrate, auth_throttle, email_checker, db_router, trending, compressor, query_stats, metrics, slow_queries, profiler, tracer, similar_recipes, recommender
 from config import get_config
+from services.sqlite_tuning import init_sqlite_tuning
+from services.rollups import analytics_cli
+from services.json_provider import FastJSONProvider
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     # Load configuration
     config_class = get_config()
@@ -26,11 +30,25 @@ def create_app():
             app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///tastyshare.db'
             print("⚠️ Using SQLite fallback - DATABASE_URL not properly configured")
 
-    # Initialize extensions with app
+    # Initialize extensions with app (the router registers the replica bind first)
+    db_router.init_app(app)
     db.init_app(app)
+    init_sqlite_tuning(app, db)
+    tracer.init_app(app)  # first hooks, so the request span covers the other extensions
+    query_stats.init_app(app)
+    metrics.init_app(app)
+    slow_queries.init_app(app)
+    profiler.init_app(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
     migrate.init_app(app, db)
+    auth_throttle.init_app(app)
+    email_checker.init_app(app)
+    trending.init_app(app)
+    similar_recipes.init_app(app)
+    recommender.init_app(app)
+    app.cli.add_command(analytics_cli)
+    compressor.init_app(app)
     CORS(app)
 
     # Add security headers for HTTPS in production
@@ -54,6 +72,10 @@ def create_app():
     from models.recipe import Recipe
     from models.review import Review
     from models.favorite import Favorite
+    from models.trending import RecipeTrending, TrendingEvent
+    from models.analytics import DailyMetric
+    from models.similar import RecipeNeighbor
+    from models.recommendation import UserRecommendation
 
     # Import and register blueprints
     from routes.auth_routes import auth_bp
@@ -137,33 +159,28 @@ def create_app():
     def internal_error(error):
         return render_template('500.html'), 500
 
-    # Create database tables and default admin user
-    with app.app_context():
-        db.create_all()
-        
-        # Create default admin user if not exists
-        admin = User.query.filter_by(email='admin@tastyshare.com').first()
-        if not admin:
-            admin_user = User(
-                username='admin',
-                email='admin@tastyshare.com',
-                role='admin'
-            )
-            admin_user.set_password('admin123')
-            db.session.add(admin_user)
-            db.session.commit()
+    @app.cli.command('init-db')
+    @click.option('--sample-data', is_flag=True, help='Also add the demo users and recipes.')
+    def init_db_command(sample_data):
+        """Run the migrations and create the default admin user"""
+        from init_db import create_tables, seed_admin_user, seed_sample_data
+        create_tables()
+        seed_admin_user()
+        if sample_data:
+            seed_sample_data()
 
     return app
 
-# Create app instance
+# Create app instance (no database access; run `flask --app app init-db` once per deploy)
 app = create_app()
 
 if __name__ == '__main__':
-    # Initialize database on first run
+    # Development server: create the schema and demo data on first run
     with app.app_context():
         try:
-            # Check if tables exist
+            from init_db import create_tables
             from models.user import User
+            create_tables()
             if not User.query.first():
                 print("🚀 Initializing database...")
                 from init_db import main as init_database
@@ -171,20 +188,7 @@ if __name__ == '__main__':
                 print("✅ Database initialized successfully!")
         except Exception as e:
             print(f"⚠️ Database initialization failed: {e}")
-            # Try to fix schema issues
-            try:
-                print("🔧 Attempting to fix database schema...")
-                from sqlalchemy import text
-                db.engine.execute(text("ALTER TABLE users ALTER COLUMN password_hash TYPE VARCHAR(255);"))
-                print("✅ Schema fixed! Retrying initialization...")
-                from init_db import main as init_database
-                init_database()
-                print("✅ Database initialized successfully!")
-            except Exception as schema_error:
-                print(f"❌ Schema fix failed: {schema_error}")
-                print("Please manually reset the database schema")
-                # Don't crash the app
-                pass
+            print("Run `flask --app app init-db` or reset the database schema")
     
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host='0.0.0.0', port=port)
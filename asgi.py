@@ -0,0 +1,67 @@
+"""
+ASGI entry point for TastyShare (optional async serving mode).
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+The read endpoints of /api/recipes, /api/user and /api/auth are served by
+async handlers (routes/async_routes.py) on an async SQLAlchemy engine, so
+slow queries and slow clients wait on the event loop instead of holding a
+worker. Every other URL (writes, uploads, login, admin, pages, static
+files) goes to the regular Flask app, run in a bounded thread pool.
+
+``app.py`` behind gunicorn remains the default way to serve the app.
+"""
+
+from contextlib import asynccontextmanager
+
+import anyio
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app import app as flask_app
+from extensions import trending
+from routes.async_routes import async_routes
+from services.async_db import create_async_db
+
+
+def create_asgi_app(flask_app):
+    """Wrap a Flask app: async API routes first, the Flask app for everything else"""
+    engine, session_factory = create_async_db(flask_app)
+
+    def in_app_context(function):
+        def run():
+            with flask_app.app_context():
+                function()
+        return run
+
+    async def maintain_trending():
+        # The Flask app flushes in after_request; async handlers only buffer
+        while True:
+            await anyio.sleep(trending.flush_interval)
+            await anyio.to_thread.run_sync(in_app_context(trending.tick))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with anyio.create_task_group() as tasks:
+            if trending.enabled:
+                tasks.start_soon(maintain_trending)
+            yield
+            tasks.cancel_scope.cancel()
+        if trending.enabled:
+            await anyio.to_thread.run_sync(in_app_context(trending.flush))
+        await engine.dispose()
+
+    app = Starlette(
+        routes=[
+            *async_routes,
+            Mount('/', app=WSGIMiddleware(flask_app, workers=flask_app.config.get('ASGI_WSGI_THREADS', 8))),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.flask_app = flask_app
+    app.state.async_session = session_factory
+    return app
+
+
+app = create_asgi_app(flask_app)
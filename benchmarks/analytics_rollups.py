@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Analytics over a year of activity: daily rollups vs live GROUP BY.
+
+Bulk-inserts users, recipes, reviews and favorites spread over the last
+365 days, then times the backfill, an incremental (yesterday + today)
+rollup, GET /api/admin/analytics for a one-year range per bucket, and the
+same daily series computed live from the base tables for comparison.
+
+    python -m benchmarks.analytics_rollups --users 20000 --requests 50
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_test_app, auth_headers
+
+DAYS = 365
+
+
+def seed_year(users, rng):
+    from extensions import db
+    from models.user import User
+    from models.recipe import Recipe
+    from models.review import Review
+    from models.favorite import Favorite
+
+    now = datetime.utcnow()
+
+    def moment():
+        return now - timedelta(seconds=rng.randrange(DAYS * 86400))
+
+    db.session.execute(db.insert(User), [
+        {'username': f'year_user_{i}', 'email': f'year{i}@tastyshare.com', 'password_hash': 'x',
+         'role': 'user', 'is_active': True, 'created_at': moment()}
+        for i in range(users)
+    ])
+    db.session.execute(db.insert(Recipe), [
+        {'title': f'Year recipe {i}', 'description': 'Seasonal', 'ingredients': ['a'], 'instructions': ['b'],
+         'category': 'dinner', 'is_published': True, 'view_count': rng.randrange(500),
+         'user_id': rng.randrange(1, users + 1), 'created_at': moment()}
+        for i in range(users)
+    ])
+    pairs = {(rng.randrange(1, users + 1), rng.randrange(1, users + 1)) for _ in range(users * 3)}
+    db.session.execute(db.insert(Review), [
+        {'rating': rng.randint(1, 5), 'user_id': user_id, 'recipe_id': recipe_id, 'created_at': moment()}
+        for user_id, recipe_id in pairs
+    ])
+    db.session.execute(db.insert(Favorite), [
+        {'user_id': user_id, 'recipe_id': recipe_id, 'created_at': moment()}
+        for user_id, recipe_id in list(pairs)[:users * 2]
+    ])
+    db.session.commit()
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analytics rollup benchmark')
+    parser.add_argument('--users', type=int, default=20000, help='users and recipes to create')
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_test_app()
+    client = app.test_client()
+
+    from extensions import db
+    from models.review import Review
+    from services.rollups import backfill, rollup
+
+    with app.app_context():
+        seed_year(args.users, random.Random(42))
+        headers = auth_headers(1)
+        db.session.execute(db.text("UPDATE users SET role = 'admin' WHERE id = 1"))
+        db.session.commit()
+
+        written, backfill_ms = timed(backfill)
+        _, incremental_ms = timed(rollup)
+
+        start = (datetime.utcnow() - timedelta(days=DAYS - 1)).date()
+        day = db.func.date(Review.created_at)
+        live_query = db.select(day, db.func.count()).where(Review.created_at >= start).group_by(day)
+        live, live_ms = timed(lambda: db.session.execute(live_query).all(), args.requests)
+
+    endpoint = {}
+    for bucket in ('day', 'week', 'month'):
+        url = f'/api/admin/analytics?metric=reviews&bucket={bucket}&from={start.isoformat()}'
+        response, elapsed = timed(lambda: client.get(url, headers=headers), args.requests)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        endpoint[bucket] = (elapsed, response.get_json()['total'])
+
+    print(f"📈 Analytics over {DAYS} days ({args.users} users/recipes, {sum(c for _, c in live)} reviews)")
+    print("=" * 60)
+    print(f"{'backfill':<34}{backfill_ms:>10.1f} ms  ({written} rows)")
+    print(f"{'incremental rollup':<34}{incremental_ms:>10.1f} ms")
+    print(f"{'live GROUP BY (reviews, 1 year)':<34}{live_ms:>10.2f} ms")
+    for bucket, (elapsed, total) in endpoint.items():
+        print(f"{'GET analytics bucket=' + bucket:<34}{elapsed:>10.2f} ms  (total {total})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Concurrent-connection capacity: gunicorn sync workers vs the ASGI mode.
+
+Seeds a SQLite file, starts each server in a subprocess on the same data
+and drives GET /api/recipes/?view=card with N concurrent keep-alive
+connections for a fixed time per level. ``--slow-clients K`` additionally
+holds K connections that trickle their request headers (a slow mobile
+client or upload): each one ties up a sync worker, but only a socket
+under uvicorn.
+
+    python -m benchmarks.asgi_capacity --duration 5 --concurrency 1,16,64,256 --slow-clients 4
+
+Capacity is the highest level served without errors and with p99 under
+``--slo`` ms. The load generator runs on the same machine, so compare the
+two servers with each other rather than with production numbers.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import ROOT, create_test_app, seed_small_dataset
+
+PATH = '/api/recipes/?view=card'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_commands(port, workers):
+    bind = ['--bind', f'127.0.0.1:{port}']
+    return {
+        f'gunicorn sync x{workers}': [sys.executable, '-m', 'gunicorn', '--workers', str(workers),
+                                      '--worker-class', 'sync', '--threads', '1',
+                                      '--log-level', 'warning', *bind, 'app:app'],
+        'uvicorn asgi x1': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1',
+                            '--port', str(port), '--no-access-log', '--log-level', 'warning'],
+    }
+
+
+def wait_until_ready(base_url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('server exited during startup')
+        try:
+            if httpx.get(base_url + PATH, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('server did not start in time')
+
+
+async def slow_client(port, stop):
+    """Hold a connection by sending one header line per second"""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET {PATH} HTTP/1.1\r\nHost: localhost\r\n'.encode())
+        line = 0
+        while not stop.is_set():
+            writer.write(f'X-Slow-{line}: 1\r\n'.encode())
+            await writer.drain()
+            line += 1
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                pass
+        writer.close()
+    except OSError:
+        pass
+
+
+async def run_level(base_url, port, concurrency, duration, slow_clients):
+    """Requests/s, p50 and p99 latency (ms) and error count at one concurrency"""
+    latencies, errors = [], 0
+    stop = asyncio.Event()
+    holders = [asyncio.create_task(slow_client(port, stop)) for _ in range(slow_clients)]
+    await asyncio.sleep(0.5 if slow_clients else 0)  # let slow clients occupy their connection
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=10) as client:
+        deadline = time.monotonic() + duration
+
+        async def user():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(PATH)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.monotonic()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    stop.set()
+    await asyncio.gather(*holders)
+
+    latencies.sort()
+    if not latencies:
+        return 0, None, None, errors
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, p50, p99, errors
+
+
+def seed_database(path):
+    app = create_test_app(f'sqlite:///{path}')
+    from extensions import db
+    with app.app_context():
+        seed_small_dataset(users=20, recipes_per_user=10)
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync vs ASGI concurrent-connection capacity')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds per concurrency level')
+    parser.add_argument('--concurrency', default='1,16,64,256', help='Comma-separated connection counts')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn sync workers')
+    parser.add_argument('--slow-clients', type=int, default=0, help='Connections trickling headers')
+    parser.add_argument('--slo', type=float, default=1000, help='p99 latency limit in ms')
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    workdir = tempfile.mkdtemp(prefix='tastyshare-capacity-')
+    database = os.path.join(workdir, 'capacity.db')
+    seed_database(database)
+
+    env = dict(os.environ, FLASK_ENV='testing', TEST_DATABASE_URL=f'sqlite:///{database}',
+               PYTHONPATH=ROOT)
+
+    print(f"🚦 {PATH}, {args.duration:g}s per level, {args.slow_clients} slow clients")
+    print("=" * 72)
+    print(f"{'server':<20}{'conns':>7}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>9}")
+
+    capacity = {}
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    for label, command in server_commands(port, args.workers).items():
+        process = subprocess.Popen(command, cwd=ROOT, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_ready(base_url, process)
+            capacity[label] = 0
+            for level in levels:
+                rps, p50, p99, errors = asyncio.run(
+                    run_level(base_url, port, level, args.duration, args.slow_clients))
+                p50_text = f'{p50:.1f}' if p50 is not None else '-'
+                p99_text = f'{p99:.1f}' if p99 is not None else '-'
+                print(f"{label:<20}{level:>7}{rps:>10.1f}{p50_text:>10}{p99_text:>10}{errors:>9}")
+                if not errors and p99 is not None and p99 <= args.slo:
+                    capacity[label] = level
+        except RuntimeError as e:
+            print(f"❌ {label}: {e}")
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print("=" * 72)
+    for label, level in capacity.items():
+        print(f"📈 {label}: {level} concurrent connections within p99 {args.slo:g} ms")
+
+
+if __name__ == '__main__':
+    main()
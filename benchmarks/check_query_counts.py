@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Query count budgets for endpoints that were rewritten to a fixed number of
+statements.
+
+Calls each endpoint through the test client and counts the SQL statements
+it executes (transaction control like BEGIN is not counted). Exits non-zero
+when an endpoint exceeds its budget, so CI catches a reintroduced N+1 or a
+cache that stopped working.
+
+    python -m benchmarks.check_query_counts
+"""
+
+import os
+import sys
+
+from benchmarks.common import create_test_app, seed_small_dataset, auth_headers
+
+# (label, url, who is calling, max statements); runs in this order
+BUDGETS = [
+    # admin lookup + counters + top recipe lists + recent users
+    ('admin.get_admin_dashboard', '/api/admin/dashboard?refresh=true', 'admin', 4),
+    # served from the TTL cache: only the admin lookup
+    ('admin.get_admin_dashboard cached', '/api/admin/dashboard', 'admin', 1),
+]
+
+TRANSACTION_CONTROL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+def count_statements(app, client, url, headers):
+    """Run a request and return the statements it executed"""
+    from sqlalchemy import event
+    from extensions import db
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(TRANSACTION_CONTROL):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url, headers=headers or {})
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+    return statements
+
+
+def main():
+    app = create_test_app(os.environ.get('TEST_DATABASE_URL'))
+    client = app.test_client()
+
+    from models.user import User
+
+    with app.app_context():
+        users = seed_small_dataset()
+        admin = User.query.filter_by(role='admin').first()
+        headers = {'user': auth_headers(users[1].id), 'admin': auth_headers(admin.id)}
+
+    failures = 0
+    print("🔢 Checking query counts")
+    print("=" * 60)
+
+    for label, url, caller, budget in BUDGETS:
+        statements = count_statements(app, client, url, headers.get(caller))
+        if len(statements) > budget:
+            failures += 1
+            print(f"❌ {label}: {len(statements)} statements (budget {budget})")
+            for statement in statements:
+                print('   ' + ' '.join(statement.split())[:160])
+        else:
+            print(f"✅ {label}: {len(statements)} statements (budget {budget})")
+
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} endpoint(s) over their query budget")
+        return 1
+    print("🎉 All endpoints within their query budgets")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Query plan check for the hot endpoints.
+
+Calls each endpoint through the test client, captures every SELECT it runs
+and EXPLAINs it. Exits non-zero if a filtered or sorted statement needs a
+full table scan, so CI catches a dropped or mismatched index.
+
+    python -m benchmarks.check_query_plans
+    TEST_DATABASE_URL=postgresql://... python -m benchmarks.check_query_plans
+"""
+
+import os
+import re
+import sys
+
+from benchmarks.common import create_test_app, seed_small_dataset, auth_headers
+
+# (endpoint label, url, who is calling)
+ENDPOINTS = [
+    ('recipe.get_recipes', '/api/recipes/', None),
+    ('recipe.get_recipes category', '/api/recipes/?category=dinner', None),
+    ('recipe.get_recipes cuisine', '/api/recipes/?cuisine_type=italian', None),
+    ('recipe.get_recipes views', '/api/recipes/?sort_by=view_count', None),
+    ('recipe.get_recipes card', '/api/recipes/?view=card', None),
+    ('recipe.get_recipes trending', '/api/recipes/?sort_by=trending&view=card', None),
+    ('recipe.get_recipe_reviews', '/api/recipes/{recipe_id}/reviews', None),
+    ('recipe.get_similar_recipes', '/api/recipes/{recipe_id}/similar', None),
+    ('user.get_user_favorites', '/api/user/favorites', 'user'),
+    ('user.get_user_recipes', '/api/user/recipes', 'user'),
+    ('user.get_recommendations', '/api/user/recommendations', 'user'),
+    ('admin.get_admin_dashboard', '/api/admin/dashboard', 'admin'),
+    ('admin.get_all_users active', '/api/admin/users?status=active', 'admin'),
+    ('admin.get_reported_reviews', '/api/admin/reviews/reported', 'admin'),
+]
+
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (\w+)$')
+SQLITE_DERIVED = re.compile(r'\b(?:CO-ROUTINE|MATERIALIZE) (\w+)')
+AGGREGATE_FILTER = re.compile(r'FILTER \(WHERE [^()]*\)', re.IGNORECASE)
+
+
+def capture_statements(app, client, url, headers):
+    """Run a request and return the SELECT statements it executed"""
+    from sqlalchemy import event
+    from extensions import db
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url, headers=headers or {})
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+    return statements
+
+
+def needs_index(statement):
+    """Whole-table aggregates (no WHERE / ORDER BY) are allowed to scan"""
+    # count(*) FILTER (WHERE ...) is still a single pass over the whole table
+    upper = AGGREGATE_FILTER.sub('', statement).upper()
+    return ' WHERE ' in upper.replace('\n', ' ') or 'ORDER BY' in upper
+
+
+def full_scans(connection, statement, parameters):
+    """Tables a statement reads with a full scan, according to EXPLAIN"""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        details = [row[-1] for row in rows]
+        # Scanning a subquery's own result (co-routine / materialized) is not a table scan
+        derived = {m.group(1) for m in map(SQLITE_DERIVED.search, details) if m}
+        return [m.group(1) for m in map(SQLITE_FULL_SCAN.search, details)
+                if m and m.group(1) not in derived], details
+    if dialect == 'postgresql':
+        # Tiny test tables make seq scans cheapest, so ask the planner for the index plan
+        connection.exec_driver_sql('SET enable_seqscan = off')
+        rows = connection.exec_driver_sql('EXPLAIN ' + statement, parameters).fetchall()
+        details = [row[0] for row in rows]
+        return [line.split(' on ')[1].split()[0] for line in details if 'Seq Scan on' in line], details
+    raise RuntimeError(f'EXPLAIN check not supported for {dialect}')
+
+
+def main():
+    app = create_test_app(os.environ.get('TEST_DATABASE_URL'))
+    client = app.test_client()
+
+    from extensions import db
+    from models.user import User
+
+    with app.app_context():
+        users = seed_small_dataset()
+        app.extensions['trending'].rebuild()
+        admin = User.query.filter_by(role='admin').first()
+        headers = {'user': auth_headers(users[1].id), 'admin': auth_headers(admin.id)}
+        recipe_id = users[0].recipes[0].id
+
+    failures = 0
+    print("🔍 Checking query plans for hot endpoints")
+    print("=" * 60)
+
+    for label, url, caller in ENDPOINTS:
+        url = url.format(recipe_id=recipe_id)
+        statements = capture_statements(app, client, url, headers.get(caller))
+
+        with app.app_context(), db.engine.connect() as connection:
+            problems = []
+            for statement, parameters in statements:
+                if not needs_index(statement):
+                    continue
+                tables, plan = full_scans(connection, statement, parameters)
+                if tables:
+                    problems.append((tables, statement, plan))
+
+        if problems:
+            failures += 1
+            print(f"❌ {label} ({len(statements)} statements)")
+            for tables, statement, plan in problems:
+                print(f"   full scan of {', '.join(tables)}:")
+                print('   ' + ' '.join(statement.split())[:300])
+                for line in plan:
+                    print(f"      {line}")
+        else:
+            print(f"✅ {label} ({len(statements)} statements)")
+
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} endpoint(s) run full table scans")
+        return 1
+    print("🎉 No full table scans on hot paths")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
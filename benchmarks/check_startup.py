@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+CI check: importing app.py is fast and doesn't touch the database.
+
+Runs ``python -X importtime -c "import app"`` in fresh interpreters
+against a SQLite path that doesn't exist, then fails when
+
+- the median import time of ``app`` exceeds the budget,
+- the database file was created (startup opened a connection), or
+- a module that should only load on first use (alembic, Pillow,
+  email-validator) was imported.
+
+    python -m benchmarks.check_startup --runs 5 --budget-ms 900
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import ROOT
+
+# Generous for slow CI machines; ~470 ms on the 1-CPU dev box
+IMPORT_BUDGET_MS = 900
+
+LAZY_MODULES = ('alembic', 'flask_migrate', 'PIL', 'email_validator')
+
+PROBE = (
+    "import sys, app; "
+    "print(','.join(name for name in {lazy!r} if name in sys.modules))"
+)
+
+
+def parse_importtime(stderr):
+    """[(module, self µs, cumulative µs, depth)] in -X importtime order (children first)"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def direct_imports(modules, root):
+    """``(cumulative µs, module)`` of the top-level modules imported by ``root``"""
+    index = next(i for i, module in enumerate(modules) if module[0] == root and module[3] == 0)
+    children = []
+    for name, _, cumulative, depth in reversed(modules[:index]):
+        if depth == 0:
+            break  # the block before belongs to the previous top-level import
+        if depth == 1:
+            children.append((cumulative, name))
+    return sorted(children, reverse=True), modules[index][2]
+
+
+def run_probe(database):
+    env = dict(os.environ, FLASK_ENV='production', DATABASE_URL=f'sqlite:///{database}',
+               PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE.format(lazy=LAZY_MODULES)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return parse_importtime(result.stderr), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup import-time budget check')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imports to list')
+    args = parser.parse_args()
+
+    print("⏱️  Checking application startup")
+    print("=" * 60)
+
+    failures = []
+    timings = []
+    with tempfile.TemporaryDirectory() as workdir:
+        database = os.path.join(workdir, 'startup.db')
+        for _ in range(args.runs):
+            modules, loaded = run_probe(database)
+            children, cumulative = direct_imports(modules, 'app')
+            timings.append(cumulative / 1000)
+        if os.path.exists(database):
+            failures.append('importing app opened the database')
+    if loaded:
+        failures.append(f"imported at startup instead of on first use: {', '.join(loaded)}")
+
+    print("Heaviest imports under app (last run, cumulative ms):")
+    for cumulative, name in children[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+
+    median = statistics.median(timings)
+    print("-" * 60)
+    print(f"import app: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(timings):.0f}, max {max(timings):.0f}), budget {args.budget_ms:.0f} ms")
+    if median > args.budget_ms:
+        failures.append(f'import time {median:.0f} ms is over the {args.budget_ms:.0f} ms budget')
+
+    print("=" * 60)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("🎉 Startup within budget and free of side effects")
+
+
+if __name__ == '__main__':
+    main()
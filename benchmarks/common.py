@@ -0,0 +1,93 @@
+"""
+Shared helpers for the benchmark and check scripts.
+
+Run the scripts from the project root as modules, e.g.
+``python -m benchmarks.check_query_plans``.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def create_test_app(database_url=None, **overrides):
+    """Create the app with TestingConfig (in-memory SQLite unless overridden)"""
+    os.environ['FLASK_ENV'] = 'testing'
+    if database_url:
+        os.environ['TEST_DATABASE_URL'] = database_url
+
+    from config import config
+    if database_url:
+        overrides['SQLALCHEMY_DATABASE_URI'] = database_url
+    for key, value in overrides.items():
+        setattr(config['testing'], key, value)
+
+    from app import create_app
+    app = create_app()
+    # Schema and admin user, as `flask init-db` does on deploy
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    if result.exit_code != 0:
+        raise RuntimeError(f'init-db failed: {result.output}') from result.exception
+    return app
+
+
+def seed_small_dataset(users=5, recipes_per_user=4, reviews_per_recipe=3):
+    """Insert a small, predictable dataset; returns the created users"""
+    from extensions import db
+    from models.user import User
+    from models.recipe import Recipe
+    from models.review import Review
+    from models.favorite import Favorite
+
+    categories = ['breakfast', 'lunch', 'dinner', 'dessert']
+    cuisines = ['italian', 'indian', 'mexican', 'american']
+    now = datetime.utcnow()
+
+    created_users = []
+    for i in range(users):
+        user = User(username=f'bench_user_{i}', email=f'bench{i}@tastyshare.com',
+                    first_name='Bench', last_name=f'User{i}',
+                    created_at=now - timedelta(days=i))
+        user.set_password('password123')
+        db.session.add(user)
+        created_users.append(user)
+    db.session.flush()
+
+    recipes = []
+    for user in created_users:
+        for j in range(recipes_per_user):
+            recipe = Recipe(
+                title=f'Recipe {user.id}-{j}',
+                description='A benchmark recipe ' * 20,
+                ingredients=[f'ingredient {k}' for k in range(10)],
+                instructions=[f'step {k}' for k in range(8)],
+                category=categories[j % len(categories)],
+                cuisine_type=cuisines[(user.id + j) % len(cuisines)],
+                prep_time=10, cook_time=20, total_time=30,
+                view_count=(user.id * 7 + j * 13) % 100,
+                created_at=now - timedelta(hours=user.id * 10 + j),
+                user_id=user.id
+            )
+            db.session.add(recipe)
+            recipes.append(recipe)
+    db.session.flush()
+
+    for recipe in recipes:
+        reviewers = [u for u in created_users if u.id != recipe.user_id][:reviews_per_recipe]
+        for reviewer in reviewers:
+            db.session.add(Review(rating=(recipe.id + reviewer.id) % 5 + 1, comment='Tasty!',
+                                  user_id=reviewer.id, recipe_id=recipe.id,
+                                  is_reported=(recipe.id + reviewer.id) % 11 == 0))
+            db.session.add(Favorite(user_id=reviewer.id, recipe_id=recipe.id))
+
+    db.session.commit()
+    return created_users
+
+
+def auth_headers(user_id):
+    """Authorization header for a user id (requires an app context)"""
+    from flask_jwt_extended import create_access_token
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
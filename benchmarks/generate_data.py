@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for load tests and query-plan work.
+
+Fills an empty database (or one reset with ``--reset``) with users,
+recipes, reviews and favorites at any scale, e.g. ``--preset large`` for
+100k users, 1M recipes and 10M reviews and favorites. Popularity is
+skewed: recipes are picked with a Zipf distribution over a shuffled
+ranking, and how many recipes a user writes, reviews and favorites is
+lognormal, so a few heavy users and hit recipes carry most rows.
+
+Everything derives from ``--seed`` and ``--end-date`` (no wall clock, no
+string hashing), and explicit ids are written, so the same arguments give
+the same rows on SQLite and PostgreSQL; the per-table digests printed at
+the end can be compared between runs. Rows go in with batched Core
+executemany, or COPY on PostgreSQL with psycopg2, with the non-unique
+indexes dropped during the load and rebuilt afterwards.
+
+    python -m benchmarks.generate_data --database-url sqlite:////tmp/load.db --preset small --reset
+    python -m benchmarks.generate_data --database-url postgresql://... --preset large --seed 7
+
+All generated users have the password ``password123``; the admin is
+``admin@tastyshare.com`` / ``admin123`` as with ``flask init-db``.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import create_engine, func, insert, inspect, select
+from werkzeug.security import generate_password_hash
+
+from benchmarks.common import ROOT  # noqa: F401  (puts the project root on sys.path)
+
+# werkzeug hash of "password123", fixed so user rows are identical between runs (hashes are salted)
+PASSWORD_HASH = 'scrypt:32768:8:1$sdGT3Jn0ysRfkf6G$911cf942c4b2a4384eeedb9fb385f2cd2025c44e1e8c19be362c425363a288e0e3746b434fd410d170e86810c423a4f7c8c5387b125e9d75dc7f966972cf68c4'
+
+# users, recipes, reviews, favorites
+PRESETS = {
+    'tiny': (1_000, 5_000, 20_000, 20_000),
+    'small': (10_000, 50_000, 250_000, 250_000),
+    'medium': (50_000, 250_000, 2_000_000, 2_000_000),
+    'large': (100_000, 1_000_000, 10_000_000, 10_000_000),
+}
+
+CATEGORIES = (('dinner', 30), ('lunch', 20), ('dessert', 15), ('breakfast', 12), ('snack', 8),
+              ('appetizer', 6), ('soup', 5), ('salad', 4))
+CUISINES = (('italian', 22), ('indian', 16), ('mexican', 14), ('american', 13), ('chinese', 10),
+            ('japanese', 7), ('thai', 6), ('french', 5), ('mediterranean', 4), ('korean', 3))
+DIETS = (('non-vegetarian', 55), ('vegetarian', 30), ('vegan', 10), (None, 5))
+DIFFICULTIES = (('easy', 50), ('medium', 38), ('hard', 12))
+RATINGS = ((5, 40), (4, 33), (3, 15), (2, 7), (1, 5))
+
+ADJECTIVES = ('Classic', 'Spicy', 'Creamy', 'Quick', 'Rustic', 'Smoky', 'Crispy', 'Zesty', 'Hearty',
+              'Lemony', 'Garlic', 'Honey', 'Roasted', 'Grilled', 'Slow-Cooked', 'One-Pot', 'Easy')
+DISHES = ('Pasta', 'Curry', 'Tacos', 'Burger', 'Ramen', 'Risotto', 'Stir Fry', 'Salad', 'Soup', 'Pancakes',
+          'Lasagna', 'Biryani', 'Dumplings', 'Pizza', 'Stew', 'Brownies', 'Cheesecake', 'Noodles',
+          'Chili', 'Omelette', 'Paella', 'Tikka Masala', 'Pad Thai', 'Enchiladas', 'Gnocchi')
+INGREDIENTS = ('2 cups flour', '1 tbsp olive oil', '3 cloves garlic', '1 onion, diced', '400g chicken',
+               '1 can tomatoes', '1 tsp salt', '1/2 tsp pepper', '2 eggs', '1 cup milk', '200g pasta',
+               '1 tsp cumin', '1 tbsp butter', '1 cup rice', '2 carrots', '1 bell pepper', '100g cheese',
+               '1 lemon', 'fresh basil', '1 tsp chili flakes', '250ml stock', '1 tbsp soy sauce',
+               '1 tbsp honey', '2 potatoes', '1 cup spinach', '200g mushrooms', '1 tsp paprika')
+STEPS = ('Preheat the oven to 200C.', 'Chop the vegetables.', 'Heat the oil in a large pan.',
+         'Add the garlic and onion and cook until soft.', 'Stir in the spices.', 'Simmer for 20 minutes.',
+         'Season to taste.', 'Bring a pot of salted water to a boil.', 'Whisk the eggs and milk.',
+         'Fold in the cheese.', 'Bake until golden.', 'Rest for 5 minutes before serving.',
+         'Garnish with fresh herbs.', 'Serve hot.')
+WORDS = ('delicious', 'family', 'favorite', 'weeknight', 'dinner', 'flavor', 'simple', 'fresh', 'comfort',
+         'recipe', 'perfect', 'crowd', 'pleaser', 'ready', 'minutes', 'healthy', 'rich', 'tender',
+         'sauce', 'spices', 'kids', 'love', 'leftovers', 'make', 'ahead', 'authentic', 'homemade')
+COMMENTS = ('Tasty!', 'Made this twice already.', 'A bit too salty for me.', 'Family loved it.',
+            'Great weeknight dinner.', 'Needed more spice.', 'Perfect as written.', 'Will make again.',
+            'Took longer than stated.', None, None, None)
+TAGS = ('quick', 'healthy', 'spicy', 'comfort-food', 'kid-friendly', 'gluten-free', 'meal-prep',
+        'budget', 'party', 'summer', 'winter', 'one-pot')
+
+
+def weighted(options):
+    """``(values, cumulative weights)`` for ``rng.choices``"""
+    values, weights = zip(*options)
+    return values, list(accumulate(weights))
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative Zipf weights for ranks 1..n"""
+    return list(accumulate(1.0 / rank ** exponent for rank in range(1, n + 1)))
+
+
+def lognormal_counts(rng, n, total, sigma, cap):
+    """``n`` counts drawn from a lognormal, scaled to sum to about ``total``, each at most ``cap``"""
+    raw = [rng.lognormvariate(0, sigma) for _ in range(n)]
+    scale = total / sum(raw)
+    counts = array('i')
+    for value in raw:
+        expected = value * scale
+        count = int(expected) + (rng.random() < expected - int(expected))  # stochastic rounding
+        counts.append(min(count, cap))
+    return counts
+
+
+def pick_distinct(rng, population, cum_weights, k, allowed):
+    """Up to ``k`` distinct items drawn by weight that satisfy ``allowed``, in ascending order"""
+    chosen = set()
+    for _ in range(4):
+        needed = k - len(chosen)
+        if needed <= 0:
+            break
+        for item in rng.choices(population, cum_weights=cum_weights, k=needed * 2):
+            if item not in chosen and allowed(item):
+                chosen.add(item)
+                if len(chosen) == k:
+                    break
+    return sorted(chosen)
+
+
+class Loader:
+    """Batched inserts into one engine, with a digest of every row written"""
+
+    def __init__(self, engine, batch_size, method):
+        self.engine = engine
+        self.batch_size = batch_size
+        dialect = engine.dialect
+        if method == 'auto':
+            method = 'copy' if dialect.name == 'postgresql' and dialect.driver == 'psycopg2' else 'insert'
+        self.method = method
+        self.digests = {}
+
+    def load(self, table, rows):
+        """Insert an iterable of row dicts; returns the row count"""
+        digest = self.digests.setdefault(table.name, hashlib.sha256())
+        columns = [column.name for column in table.columns]
+        count = 0
+        batch = []
+        started = time.perf_counter()
+        for row in rows:
+            digest.update(repr([row.get(name) for name in columns]).encode())
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                count += self._write(table, columns, batch)
+                batch = []
+                rate = count / (time.perf_counter() - started)
+                print(f"  {table.name}: {count:,} rows ({rate:,.0f}/s)", end='\r', flush=True)
+        if batch:
+            count += self._write(table, columns, batch)
+        elapsed = time.perf_counter() - started
+        print(f"  {table.name}: {count:,} rows in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f}/s)")
+        return count
+
+    def _write(self, table, columns, batch):
+        with self.engine.begin() as conn:
+            if self.method == 'copy':
+                self._copy(conn, table, columns, batch)
+            else:
+                conn.execute(insert(table), batch)
+        return len(batch)
+
+    def _copy(self, conn, table, columns, batch):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow([_copy_value(row.get(name)) for name in columns])
+        buffer.seek(0)
+        cursor = conn.connection.dbapi_connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.close()
+
+
+def _copy_value(value):
+    if isinstance(value, list):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value  # None is written as an unquoted empty field, which COPY reads as NULL
+
+
+class DatasetGenerator:
+    """Deterministic users, recipes, reviews and favorites for one seed"""
+
+    def __init__(self, seed, users, recipes, reviews, favorites, end=datetime(2026, 1, 1), days=730,
+                 popularity_skew=1.1):
+        self.seed = seed
+        self.n_users = users
+        self.n_recipes = recipes
+        self.n_reviews = reviews
+        self.n_favorites = favorites
+        self.end = end
+        self.start = end - timedelta(days=days)
+        self.span = (self.end - self.start).total_seconds()
+        self.popularity_skew = popularity_skew
+
+    def rng(self, name):
+        """Independent stream per table, so changing one count doesn't reshuffle the others"""
+        return random.Random(f'{self.seed}:{name}')
+
+    def at(self, fraction):
+        return self.start + timedelta(seconds=fraction * self.span)
+
+    def users(self):
+        rng = self.rng('users')
+        # Signups grow over time: the n-th user signs up at (n/N)^0.7 of the span
+        self.user_created = array('d', ((i / self.n_users) ** 0.7 for i in range(1, self.n_users + 1)))
+        for user_id in range(1, self.n_users + 1):
+            created = self.at(self.user_created[user_id - 1])
+            yield {
+                'id': user_id,
+                'username': f'user{user_id}',
+                'email': f'user{user_id}@example.com',
+                'password_hash': PASSWORD_HASH,
+                'first_name': rng.choice(('Alex', 'Sam', 'Priya', 'Mario', 'Chen', 'Fatima', 'Olga', 'Kofi')),
+                'last_name': f'Tester{user_id % 997}',
+                'phone': None,
+                'bio': ' '.join(rng.choices(WORDS, k=rng.randint(4, 16))) if rng.random() < 0.4 else None,
+                'profile_image': 'default_avatar.png',
+                'role': 'user',
+                'is_active': rng.random() < 0.98,
+                'is_verified': rng.random() < 0.7,
+                'created_at': created,
+                'last_login': created + (self.end - created) * rng.random() if rng.random() < 0.8 else None,
+            }
+
+    def recipes(self):
+        rng = self.rng('recipes')
+        categories, category_weights = weighted(CATEGORIES)
+        cuisines, cuisine_weights = weighted(CUISINES)
+        diets, diet_weights = weighted(DIETS)
+        difficulties, difficulty_weights = weighted(DIFFICULTIES)
+
+        # Prolific authors: recipes per user is lognormal; ids are in creation order, authors shuffled
+        per_author = lognormal_counts(rng, self.n_users, self.n_recipes, sigma=1.5, cap=self.n_recipes)
+        authors = array('i', (user_id for user_id, count in enumerate(per_author, 1) for _ in range(count)))
+        while len(authors) < self.n_recipes:
+            authors.append(rng.randint(1, self.n_users))
+        del authors[self.n_recipes:]
+        rng.shuffle(authors)
+        self.authors = authors
+
+        # Hit recipes: a shuffled popularity ranking, drawn with Zipf weights
+        self.ranking = list(range(1, self.n_recipes + 1))
+        rng.shuffle(self.ranking)
+        self.popularity = zipf_cum_weights(self.n_recipes, self.popularity_skew)
+        rank_of = array('i', bytes(4 * (self.n_recipes + 1)))
+        for rank, recipe_id in enumerate(self.ranking):
+            rank_of[recipe_id] = rank
+        total_weight = self.popularity[-1]
+
+        self.recipe_created = array('d')
+        for recipe_id in range(1, self.n_recipes + 1):
+            author = authors[recipe_id - 1]
+            fraction = max(recipe_id / self.n_recipes, self.user_created[author - 1])
+            self.recipe_created.append(fraction)
+            created = self.at(fraction)
+            prep_time = rng.choice((5, 10, 15, 20, 30, 45))
+            cook_time = rng.choice((0, 10, 15, 20, 30, 45, 60, 90, 120))
+            rank = rank_of[recipe_id]
+            share = (1.0 / (rank + 1) ** self.popularity_skew) / total_weight
+            title = f'{rng.choice(ADJECTIVES)} {rng.choice(DISHES)}'
+            yield {
+                'id': recipe_id,
+                'title': title,
+                'description': f"{title}. " + ' '.join(rng.choices(WORDS, k=rng.randint(20, 120))),
+                'ingredients': rng.sample(INGREDIENTS, rng.randint(4, 14)),
+                'instructions': rng.sample(STEPS, rng.randint(3, 10)),
+                'category': rng.choices(categories, cum_weights=category_weights)[0],
+                'cuisine_type': rng.choices(cuisines, cum_weights=cuisine_weights)[0],
+                'dietary_preference': rng.choices(diets, cum_weights=diet_weights)[0],
+                'prep_time': prep_time,
+                'cook_time': cook_time,
+                'total_time': prep_time + cook_time,
+                'servings': rng.randint(1, 8),
+                'difficulty_level': rng.choices(difficulties, cum_weights=difficulty_weights)[0],
+                'calories_per_serving': rng.randint(150, 900),
+                'image_url': None,
+                'video_url': None,
+                'tags': json.dumps(rng.sample(TAGS, rng.randint(0, 4))),
+                'is_featured': rank < 50,
+                'is_published': rng.random() < 0.95,
+                'view_count': int(share * self.n_favorites * 25) + rng.randint(0, 40),
+                'created_at': created,
+                'updated_at': created,
+                'user_id': author,
+            }
+
+    def _interactions(self, name, total, make_row, own_recipes):
+        """Rows for ``total`` distinct (user, recipe) pairs: lognormal per user, Zipf per recipe"""
+        rng = self.rng(name)
+        population = self.ranking
+        per_user = lognormal_counts(rng, self.n_users, total, sigma=1.2, cap=max(1, self.n_recipes // 2))
+        row_id = 0
+        for user_id, count in enumerate(per_user, 1):
+            if not count:
+                continue
+            allowed = (lambda recipe_id: True) if own_recipes else \
+                (lambda recipe_id: self.authors[recipe_id - 1] != user_id)
+            for recipe_id in pick_distinct(rng, population, self.popularity, count, allowed):
+                row_id += 1
+                earliest = max(self.user_created[user_id - 1], self.recipe_created[recipe_id - 1])
+                created = self.at(earliest + (1 - earliest) * rng.random())
+                yield make_row(rng, row_id, user_id, recipe_id, created)
+
+    def reviews(self):
+        ratings, rating_weights = weighted(RATINGS)
+
+        def row(rng, row_id, user_id, recipe_id, created):
+            reported = rng.random() < 0.002
+            return {
+                'id': row_id,
+                'rating': rng.choices(ratings, cum_weights=rating_weights)[0],
+                'comment': rng.choice(COMMENTS),
+                'created_at': created,
+                'updated_at': created,
+                'is_reported': reported,
+                'report_reason': 'Spam' if reported else None,
+                'user_id': user_id,
+                'recipe_id': recipe_id,
+            }
+
+        return self._interactions('reviews', self.n_reviews, row, own_recipes=False)
+
+    def favorites(self):
+        def row(rng, row_id, user_id, recipe_id, created):
+            return {'id': row_id, 'created_at': created, 'user_id': user_id, 'recipe_id': recipe_id}
+
+        return self._interactions('favorites', self.n_favorites, row, own_recipes=True)
+
+
+def load_dataset(database_url, generator, reset=False, batch_size=10_000, method='auto', keep_indexes=False):
+    """Write the generator's rows into a database; returns ``(counts, digests, seconds)``"""
+    from extensions import db
+    from models import analytics, recommendation, similar, trending  # noqa: F401  (register every table for create_all)
+    from models.user import User
+    from models.recipe import Recipe
+    from models.review import Review
+    from models.favorite import Favorite
+    tables = [User.__table__, Recipe.__table__, Review.__table__, Favorite.__table__]
+
+    engine = create_engine(database_url)
+    if engine.dialect.name == 'sqlite':
+        from services.sqlite_tuning import DEFAULT_PRAGMAS, tune_engine
+        # Same file settings as the app (WAL), without fsyncs during the load
+        tune_engine(engine, {**DEFAULT_PRAGMAS, 'synchronous': 'OFF', 'foreign_keys': 'OFF'})
+
+    print(f"🧪 Generating dataset (seed {generator.seed}) into {engine.url.render_as_string(hide_password=True)}")
+    print("=" * 60)
+
+    if reset:
+        db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    with engine.connect() as conn:
+        existing = conn.scalar(select(func.count()).select_from(User.__table__))
+    if existing:
+        raise RuntimeError(f'users already has {existing} rows; use --reset or an empty database')
+
+    deferred = [] if keep_indexes else [index for table in tables for index in table.indexes]
+    existing_indexes = {index['name'] for table in tables for index in inspect(engine).get_indexes(table.name)}
+    with engine.begin() as conn:
+        for index in deferred:
+            if index.name in existing_indexes:
+                index.drop(conn)
+
+    loader = Loader(engine, batch_size, method)
+    print(f"Loading with {loader.method} in batches of {batch_size:,}")
+    started = time.perf_counter()
+    counts = {
+        'users': loader.load(User.__table__, generator.users()),
+        'recipes': loader.load(Recipe.__table__, generator.recipes()),
+        'reviews': loader.load(Review.__table__, generator.reviews()),
+        'favorites': loader.load(Favorite.__table__, generator.favorites()),
+    }
+
+    with engine.begin() as conn:
+        if deferred:
+            print(f"Rebuilding {len(deferred)} indexes...")
+            for index in deferred:
+                index.create(conn)
+        if engine.dialect.name == 'postgresql':
+            # Explicit ids were written; move the sequences past them
+            for table in tables:
+                conn.exec_driver_sql(f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                                     f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))")
+        conn.execute(insert(User.__table__), {
+            'username': 'admin', 'email': 'admin@tastyshare.com', 'password_hash': generate_password_hash('admin123'),
+            'first_name': 'Admin', 'last_name': 'User', 'profile_image': 'default_avatar.png', 'role': 'admin',
+            'is_active': True, 'is_verified': True, 'created_at': generator.start,
+        })
+        conn.exec_driver_sql('ANALYZE')
+
+    engine.dispose()
+    digests = {name: digest.hexdigest() for name, digest in loader.digests.items()}
+    return counts, digests, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic TastyShare dataset')
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--preset', choices=PRESETS, default='small')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--recipes', type=int)
+    parser.add_argument('--reviews', type=int)
+    parser.add_argument('--favorites', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end-date', default='2026-01-01', help='Newest timestamp (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=730, help='Days of history before --end-date')
+    parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of recipe popularity')
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--method', choices=('auto', 'insert', 'copy'), default='auto',
+                        help='auto: COPY on PostgreSQL with psycopg2, batched INSERT otherwise')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    parser.add_argument('--keep-indexes', action='store_true',
+                        help='Maintain secondary indexes during the load instead of rebuilding them after')
+    args = parser.parse_args()
+
+    users, recipes, reviews, favorites = PRESETS[args.preset]
+    generator = DatasetGenerator(
+        seed=args.seed,
+        users=args.users or users,
+        recipes=args.recipes or recipes,
+        reviews=args.reviews if args.reviews is not None else reviews,
+        favorites=args.favorites if args.favorites is not None else favorites,
+        end=datetime.strptime(args.end_date, '%Y-%m-%d'),
+        days=args.days,
+        popularity_skew=args.skew,
+    )
+
+    try:
+        counts, digests, elapsed = load_dataset(args.database_url, generator, reset=args.reset,
+                                                batch_size=args.batch_size, method=args.method,
+                                                keep_indexes=args.keep_indexes)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    print("=" * 60)
+    for name, count in counts.items():
+        print(f"{name:<10}{count:>14,}  sha256 {digests[name][:16]}")
+    print(f"🎉 {sum(counts.values()):,} rows in {elapsed:.1f}s "
+          f"(then `flask --app app analytics rollup --backfill` and `flask --app app trending rebuild`)")
+
+
+if __name__ == '__main__':
+    main()
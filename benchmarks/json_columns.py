@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Serialization CPU for ingredients/instructions per recipe list page.
+
+"legacy" reads both columns as TEXT and runs json.loads in Python, which is
+what Recipe.to_dict did for every row before the JSON column migration.
+"native" reads the JSONList columns and lets the type/driver decode them.
+Both are timed with process_time (CPU, not wall clock) over a 50-recipe
+page, plus the full ORM load + to_dict for context.
+
+    python -m benchmarks.json_columns --iterations 500
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.common import create_test_app
+
+PAGE_SIZE = 50
+
+
+def seed_recipes(count):
+    from extensions import db
+    from models.user import User
+    from models.recipe import Recipe
+
+    author = User(username='json_bench', email='json_bench@tastyshare.com')
+    author.set_password('password123')
+    db.session.add(author)
+    db.session.flush()
+    for i in range(count):
+        db.session.add(Recipe(
+            title=f'Benchmark recipe {i}',
+            description='Slow-cooked, weeknight friendly and freezer safe. ' * 6,
+            ingredients=[f'{k + 1} cups ingredient number {k}, finely chopped' for k in range(14)],
+            instructions=[f'Step {k + 1}: stir gently, then simmer for {k + 2} minutes until thickened.'
+                          for k in range(10)],
+            category='dinner', cuisine_type='italian', user_id=author.id
+        ))
+    db.session.commit()
+
+
+def cpu_per_page(fn, iterations):
+    """Average CPU microseconds per call"""
+    fn()  # warm up statement caches
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON column serialization benchmark')
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_test_app()
+    from extensions import db
+    from models.recipe import Recipe
+
+    with app.app_context():
+        seed_recipes(PAGE_SIZE)
+
+        legacy_query = db.select(
+            Recipe.id,
+            db.cast(Recipe.ingredients, db.Text),
+            db.cast(Recipe.instructions, db.Text),
+        ).limit(PAGE_SIZE)
+        native_query = db.select(Recipe.id, Recipe.ingredients, Recipe.instructions).limit(PAGE_SIZE)
+
+        def legacy():
+            return [(row[0], json.loads(row[1]), json.loads(row[2]))
+                    for row in db.session.execute(legacy_query)]
+
+        def native():
+            return [tuple(row) for row in db.session.execute(native_query)]
+
+        assert legacy() == native(), 'legacy and native decoding disagree'
+
+        def orm_page():
+            db.session.expunge_all()
+            return [recipe.to_dict() for recipe in Recipe.query.limit(PAGE_SIZE).all()]
+
+        results = {
+            'legacy (TEXT + json.loads)': cpu_per_page(legacy, args.iterations),
+            'native (JSON column)': cpu_per_page(native, args.iterations),
+            'ORM page + to_dict': cpu_per_page(orm_page, max(1, args.iterations // 10)),
+        }
+        dialect = db.engine.dialect.name
+
+    print(f"⏱️  CPU per {PAGE_SIZE}-recipe page ({dialect})")
+    print("=" * 50)
+    for label, micros in results.items():
+        print(f"{label:<30}{micros:>12.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
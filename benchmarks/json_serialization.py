@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+JSON serialization CPU for a 50-recipe list page.
+
+Builds the page payload once (full recipe dicts with author, lists and
+datetimes), then times only the encoding step:
+
+  flask default   Flask's stdlib provider on the payload with datetimes
+                  already isoformat()ed (what the models used to return)
+  stdlib fallback FastJSONProvider without orjson installed
+  orjson          FastJSONProvider with orjson
+
+    python -m benchmarks.json_serialization --iterations 500
+"""
+
+import argparse
+import time
+from datetime import date
+
+from benchmarks.common import create_test_app
+from benchmarks.json_columns import seed_recipes
+
+PAGE_SIZE = 50
+
+
+def with_isoformat(value):
+    """The payload as the models used to build it: datetimes pre-formatted"""
+    if isinstance(value, dict):
+        return {key: with_isoformat(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [with_isoformat(item) for item in value]
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def cpu_per_call(fn, iterations):
+    """Average CPU microseconds per call"""
+    fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON serialization benchmark')
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_test_app()
+
+    from flask.json.provider import DefaultJSONProvider
+    import services.json_provider as json_provider
+    from models.recipe import Recipe
+
+    with app.app_context():
+        seed_recipes(PAGE_SIZE)
+        payload = {
+            'recipes': [recipe.to_dict() for recipe in Recipe.query.limit(PAGE_SIZE).all()],
+            'pagination': {'page': 1, 'per_page': PAGE_SIZE, 'total': PAGE_SIZE, 'pages': 1,
+                           'has_next': False, 'has_prev': False}
+        }
+
+    flask_default = DefaultJSONProvider(app)
+    fast = json_provider.FastJSONProvider(app)
+
+    legacy_payload = with_isoformat(payload)
+
+    def legacy():
+        return flask_default.dumps(legacy_payload, separators=(',', ':'))
+
+    def orjson_dumps():
+        return fast.dumps(payload)
+
+    orjson_module = json_provider.orjson
+    json_provider.orjson = None
+    try:
+        fallback_body = fast.dumps(payload, separators=(',', ':'))
+        fallback = cpu_per_call(lambda: fast.dumps(payload, separators=(',', ':')), args.iterations)
+    finally:
+        json_provider.orjson = orjson_module
+
+    results = {
+        'flask default': (cpu_per_call(legacy, args.iterations), len(legacy())),
+        'stdlib fallback': (fallback, len(fallback_body)),
+    }
+    if orjson_module is not None:
+        assert fast.loads(orjson_dumps()) == fast.loads(legacy()), 'orjson and stdlib output differ'
+        results['orjson'] = (cpu_per_call(orjson_dumps, args.iterations), len(orjson_dumps()))
+
+    print(f"⏱️  JSON encoding CPU per {PAGE_SIZE}-recipe page")
+    print("=" * 56)
+    for label, (micros, size) in results.items():
+        print(f"{label:<28}{micros:>12.1f} µs{size:>10} chars")
+    if orjson_module is None:
+        print("\nℹ️  orjson is not installed; only the stdlib paths were measured")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Recipe list payload size and latency: full representation vs card view.
+
+Seeds recipes with realistic ingredient/instruction lists and long
+descriptions, then requests the same page with ``view=full`` and
+``view=card`` through the test client. Reports JSON bytes per page, SQL
+time per request (from cursor events) and total request time.
+
+    python -m benchmarks.list_projection --recipes 200 --requests 50
+"""
+
+import argparse
+import time
+
+from sqlalchemy import event
+
+from benchmarks.common import create_test_app
+from benchmarks.json_columns import seed_recipes
+
+PAGE_SIZE = 24
+
+
+class QueryTimer:
+    """Accumulate SQL execution time on an engine"""
+
+    def __init__(self, engine):
+        self.total = 0.0
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self.before)
+        event.listen(engine, 'after_cursor_execute', self.after)
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        context._bench_start = time.perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        self.total += time.perf_counter() - context._bench_start
+        self.count += 1
+
+
+def measure(client, timer, url, requests):
+    client.get(url)  # warm up statement caches
+    timer.total, timer.count = 0.0, 0
+    size = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        size = len(response.data)
+    elapsed = time.perf_counter() - start
+    return {
+        'bytes': size,
+        'queries': timer.count / requests,
+        'sql_ms': timer.total / requests * 1000,
+        'request_ms': elapsed / requests * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recipe list projection benchmark')
+    parser.add_argument('--recipes', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_test_app()
+    from extensions import db
+
+    with app.app_context():
+        seed_recipes(args.recipes)
+        timer = QueryTimer(db.engine)
+        client = app.test_client()
+        results = {
+            view: measure(client, timer, f'/api/recipes/?per_page={PAGE_SIZE}&view={view}', args.requests)
+            for view in ('full', 'card')
+        }
+
+    print(f"📦 Recipe list page ({PAGE_SIZE} recipes), {args.requests} requests per view")
+    print("=" * 60)
+    print(f"{'view':<8}{'bytes':>10}{'queries':>10}{'sql ms':>10}{'request ms':>14}")
+    for view, row in results.items():
+        print(f"{view:<8}{row['bytes']:>10}{row['queries']:>10.1f}"
+              f"{row['sql_ms']:>10.2f}{row['request_ms']:>14.2f}")
+    saved = 1 - results['card']['bytes'] / results['full']['bytes']
+    print(f"\n✂️  Card view payload is {saved:.0%} smaller")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+HTTP load tests for the API.
+
+Generates a dataset with ``benchmarks.generate_data`` (``--preset tiny``
+by default), starts the app on it under gunicorn (sized by
+gunicorn.conf.py unless ``--workers`` is given) or uvicorn, and runs each
+scenario for ``--duration`` seconds with ``--concurrency`` virtual users:
+
+- ``browse``: anonymous recipe lists with random filters, sorts and searches
+- ``recipe_detail``: a recipe and its reviews, popular recipes most often
+- ``favorite_toggle``: a logged-in user favoriting and unfavoriting recipes
+- ``post_review``: a logged-in user reviewing recipes they haven't reviewed
+- ``admin_dashboard``: the admin dashboard and the user search
+
+It reports requests/s and p50/p95/p99 latency per scenario, can save the
+results as JSON and compares them with a stored baseline:
+
+    python -m benchmarks.load_test --update-baseline     # on a quiet machine, once
+    python -m benchmarks.load_test --output results.json  # exit 1 on regression
+
+A scenario regresses when its requests/s drops, or its p95 grows, by more
+than ``--tolerance``. Baselines only compare runs on the same machine
+with the same options; the load generator shares the machine with the
+server.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import accumulate
+
+import httpx
+from sqlalchemy import create_engine, text
+
+from benchmarks.asgi_capacity import free_port, wait_until_ready
+from benchmarks.common import ROOT
+from benchmarks.generate_data import CATEGORIES, CUISINES, DISHES, PRESETS, DatasetGenerator, load_dataset
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baselines', 'load_test.json')
+JWT_SECRET = 'load-test-secret'
+SORTS = ('created_at', 'view_count', 'rating', 'trending')
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+class Recorder:
+    """Latencies and failures of one scenario"""
+
+    def __init__(self):
+        self.latencies = []
+        self.failures = Counter()  # status code or exception name -> count
+
+
+class VirtualUser:
+    """One simulated client: its own random stream, identity and bookkeeping"""
+
+    def __init__(self, client, recorder, rng, data, user_id=None, headers=None):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.data = data
+        self.user_id = user_id
+        self.headers = headers or {}
+        self.reviewed = set(data['reviewed'].get(user_id, ())) | set(data['authored'].get(user_id, ()))
+
+    async def request(self, method, url, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.failures[type(e).__name__] += 1
+            return None
+        if response.status_code not in expected:
+            self.recorder.failures[response.status_code] += 1
+            return None
+        self.recorder.latencies.append((time.perf_counter() - start) * 1000)
+        return response
+
+    def popular_recipe(self):
+        return self.rng.choices(self.data['recipes'], cum_weights=self.data['weights'])[0]
+
+
+async def browse(user):
+    rng = user.rng
+    params = {'view': 'card' if rng.random() < 0.8 else 'full', 'page': rng.choice((1, 1, 1, 2, 3)),
+              'sort_by': rng.choice(SORTS)}
+    if rng.random() < 0.4:
+        params['category'] = rng.choice(CATEGORIES)[0]
+    if rng.random() < 0.3:
+        params['cuisine_type'] = rng.choice(CUISINES)[0]
+    if rng.random() < 0.2:
+        params['search'] = rng.choice(DISHES).split()[0].lower()
+    await user.request('GET', '/api/recipes/', params=params)
+
+
+async def recipe_detail(user):
+    recipe_id = user.popular_recipe()
+    if await user.request('GET', f'/api/recipes/{recipe_id}'):
+        await user.request('GET', f'/api/recipes/{recipe_id}/reviews')
+
+
+async def favorite_toggle(user):
+    await user.request('POST', f'/api/recipes/{user.popular_recipe()}/favorite')
+
+
+async def post_review(user):
+    for _ in range(20):
+        recipe_id = user.popular_recipe()
+        if recipe_id not in user.reviewed:
+            break
+    else:
+        recipe_id = user.rng.choice(user.data['recipes'])  # fall back to the long tail
+        if recipe_id in user.reviewed:
+            return
+    user.reviewed.add(recipe_id)
+    await user.request('POST', f'/api/recipes/{recipe_id}/reviews', expected=(201,),
+                       json={'rating': user.rng.randint(1, 5), 'comment': 'Load test review'})
+
+
+async def admin_dashboard(user):
+    await user.request('GET', '/api/admin/dashboard')
+    if user.rng.random() < 0.3:
+        await user.request('GET', '/api/admin/users', params={'search': f'user{user.rng.randint(1, 999)}'})
+
+
+# name -> (scenario, who runs it); read-only scenarios first, they run in this order
+SCENARIOS = {
+    'browse': (browse, None),
+    'recipe_detail': (recipe_detail, None),
+    'admin_dashboard': (admin_dashboard, 'admin'),
+    'favorite_toggle': (favorite_toggle, 'user'),
+    'post_review': (post_review, 'user'),
+}
+
+
+def load_test_data(database_url, generator):
+    """Published recipes with popularity weights, and each user's reviewed and own recipes"""
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        published = set(conn.scalars(text('SELECT id FROM recipes WHERE is_published')))
+        admin_id = conn.scalar(text("SELECT id FROM users WHERE role = 'admin'"))
+        reviewed, authored = {}, {}
+        for user_id, recipe_id in conn.execute(text('SELECT user_id, recipe_id FROM reviews')):
+            reviewed.setdefault(user_id, []).append(recipe_id)
+        for user_id, recipe_id in conn.execute(text('SELECT user_id, id FROM recipes')):
+            authored.setdefault(user_id, []).append(recipe_id)
+    engine.dispose()
+
+    # The generator's popularity ranking, without unpublished recipes
+    weights = [generator.popularity[0]] + [b - a for a, b in zip(generator.popularity, generator.popularity[1:])]
+    ranked = [(recipe_id, weight) for recipe_id, weight in zip(generator.ranking, weights) if recipe_id in published]
+    return {
+        'recipes': [recipe_id for recipe_id, _ in ranked],
+        'weights': list(accumulate(weight for _, weight in ranked)),
+        'admin_id': admin_id,
+        'reviewed': reviewed,
+        'authored': authored,
+    }
+
+
+def access_tokens(user_ids):
+    """JWTs signed like the server's (same JWT_SECRET_KEY), without going through login"""
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        return {user_id: create_access_token(identity=str(user_id)) for user_id in user_ids}
+
+
+async def run_scenario(base_url, scenario, who, concurrency, duration, data, tokens, seed):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        users = []
+        for index in range(concurrency):
+            user_id = data['admin_id'] if who == 'admin' else index + 1 if who == 'user' else None
+            headers = {'Authorization': f'Bearer {tokens[user_id]}'} if user_id else None
+            users.append(VirtualUser(client, recorder, random.Random(f'{seed}:{scenario.__name__}:{index}'),
+                                     data, user_id, headers))
+        deadline = time.monotonic() + duration
+
+        async def loop(user):
+            while time.monotonic() < deadline:
+                await scenario(user)
+
+        started = time.monotonic()
+        await asyncio.gather(*(loop(user) for user in users))
+        elapsed = time.monotonic() - started
+
+    latencies = sorted(recorder.latencies)
+    result = {
+        'requests': len(latencies),
+        'errors': sum(recorder.failures.values()),
+        'failures': {str(key): count for key, count in recorder.failures.items()},
+        'rps': round(len(latencies) / elapsed, 1),
+    }
+    for q in (50, 95, 99):
+        result[f'p{q}_ms'] = round(percentile(latencies, q), 2) if latencies else None
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against the baseline; returns the regressed scenario names"""
+    for key in ('server', 'workers', 'concurrency', 'duration', 'preset', 'seed'):
+        if baseline['meta'].get(key) != results['meta'].get(key):
+            print(f"⚠️  baseline {key} was {baseline['meta'].get(key)!r}, now {results['meta'].get(key)!r}")
+
+    regressions = []
+    print(f"{'scenario':<18}{'req/s':>10}{'change':>9}{'p95 ms':>10}{'change':>9}")
+    for name, result in results['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if not base or not base['rps'] or not base['p95_ms'] or result['p95_ms'] is None:
+            print(f"{name:<18}{'(no baseline)':>38}")
+            continue
+        rps_change = result['rps'] / base['rps'] - 1
+        p95_change = result['p95_ms'] / base['p95_ms'] - 1
+        regressed = rps_change < -tolerance or p95_change > tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<18}{result['rps']:>10.1f}{rps_change:>+9.0%}{result['p95_ms']:>10.1f}{p95_change:>+9.0%}"
+              f"{'  ❌' if regressed else ''}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API load test with baseline comparison')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenario names')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='Virtual users per scenario')
+    parser.add_argument('--server', choices=('gunicorn', 'uvicorn'), default='gunicorn')
+    parser.add_argument('--workers', type=int, help='Server processes (default: gunicorn.conf.py sizing)')
+    parser.add_argument('--preset', choices=PRESETS, default='tiny')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed relative change (0.15 = 15%%)')
+    args = parser.parse_args()
+
+    names = args.scenarios.split(',')
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix='tastyshare-load-')
+    database_url = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    generator = DatasetGenerator(args.seed, *PRESETS[args.preset])
+    load_dataset(database_url, generator)
+    data = load_test_data(database_url, generator)
+
+    env = dict(os.environ, FLASK_ENV='testing', TEST_DATABASE_URL=database_url, JWT_SECRET_KEY=JWT_SECRET,
+               PYTHONPATH=ROOT, PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'))
+    os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+    os.environ.update(FLASK_ENV='testing', TEST_DATABASE_URL=database_url, JWT_SECRET_KEY=JWT_SECRET)
+    tokens = access_tokens([data['admin_id'], *range(1, args.concurrency + 1)])
+
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    if args.server == 'gunicorn':
+        if args.workers:
+            env['WEB_CONCURRENCY'] = str(args.workers)
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+                   'app:app']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(args.workers or 1), '--no-access-log', '--log-level', 'warning']
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'server': args.server,
+            'workers': args.workers,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'preset': args.preset,
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+        },
+        'scenarios': {},
+    }
+
+    print(f"🏋️  {args.server}, {args.concurrency} virtual users, {args.duration:g}s per scenario, "
+          f"{args.preset} dataset")
+    print("=" * 78)
+    print(f"{'scenario':<18}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    log_path = os.path.join(workdir, 'server.log')
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_until_ready(base_url, process)
+            for name in names:
+                scenario, who = SCENARIOS[name]
+                result = asyncio.run(run_scenario(base_url, scenario, who, args.concurrency, args.duration,
+                                                  data, tokens, args.seed))
+                results['scenarios'][name] = result
+                p = {q: f"{result[f'p{q}_ms']:.1f}" if result[f'p{q}_ms'] is not None else '-' for q in (50, 95, 99)}
+                print(f"{name:<18}{result['requests']:>10}{result['rps']:>10.1f}{p[50]:>10}{p[95]:>10}{p[99]:>10}"
+                      f"{result['errors']:>9}")
+        except RuntimeError as e:
+            print(f"❌ {e}; server log: {log_path}")
+            raise SystemExit(1)
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+    print("=" * 78)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    failed = [name for name, result in results['scenarios'].items() if result['errors']]
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline updated: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Compared with the baseline from {baseline['meta'].get('timestamp')} "
+              f"(commit {baseline['meta'].get('commit')}), tolerance {args.tolerance:.0%}:")
+        failed += compare(results, baseline, args.tolerance)
+    else:
+        print(f"No baseline at {args.baseline}; store one with --update-baseline")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    if failed:
+        print(f"❌ Errors or regressions in: {', '.join(dict.fromkeys(failed))}")
+        sys.exit(1)
+    print("🎉 Load test passed")
+
+
+if __name__ == '__main__':
+    main()
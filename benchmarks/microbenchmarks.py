@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for request hot paths, run in isolation from HTTP.
+
+- ``*.to_dict``: a page of recipes (full and card views), reviews and
+  users serialized from already loaded objects; the ``+load`` variants load
+  the page as the route does in a fresh session first, so lazy loads and
+  the per-row queries of the full recipe view are included
+- ``process_image``: uploads of representative sizes and modes, from a
+  small JPEG that isn't resized to a 12 MP phone photo
+- ``validate_password`` and password hashing/checking at the app's
+  werkzeug defaults
+
+Each benchmark is timed with process_time (CPU, not wall clock) in loops
+of at least ``--min-time`` seconds; the best of ``--repeat`` loops is
+reported, with the median for context. The database is TestingConfig's
+in-memory SQLite. Save a run and compare a later one against it:
+
+    python -m benchmarks.microbenchmarks --output before.json
+    python -m benchmarks.microbenchmarks --compare before.json --filter to_dict
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import timeit
+
+from benchmarks.common import create_test_app, seed_small_dataset
+
+# Largest page each list endpoint serves
+RECIPE_PAGE = 50
+REVIEW_PAGE = 50
+USER_PAGE = 100
+
+# name -> (size, mode, format)
+IMAGES = {
+    'small jpeg': ((640, 480), 'RGB', 'JPEG'),
+    'rgba png': ((1600, 1200), 'RGBA', 'PNG'),
+    'palette gif': ((1000, 750), 'P', 'GIF'),
+    'large jpeg': ((4032, 3024), 'RGB', 'JPEG'),
+}
+
+
+def sample_image(size, mode, fmt):
+    """An encoded photo-like image: a gradient with noise, so it compresses like a real one"""
+    from PIL import Image
+
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 40)
+    image = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    if mode == 'RGBA':
+        image.putalpha(Image.radial_gradient('L').resize(size))
+    elif mode == 'P':
+        image = image.quantize(256)
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def measure(fn, repeat, min_time):
+    """(best, median) CPU seconds per call over `repeat` loops of at least `min_time` each"""
+    timer = timeit.Timer(fn, timer=time.process_time)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    times = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+    return min(times), statistics.median(times)
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds / 1e-9:.0f} ns'
+
+
+def serialization_benchmarks():
+    """name -> fn for the model serializers"""
+    from extensions import db
+    from models.recipe import CARD_FIELDS, Recipe
+    from models.review import Review
+    from models.user import User
+
+    viewer_id = db.session.scalar(db.select(User.id).filter_by(role='user'))
+
+    def recipe_page():
+        return db.session.scalars(db.select(Recipe).filter_by(is_published=True)
+                                  .order_by(Recipe.created_at.desc()).limit(RECIPE_PAGE)).all()
+
+    def card_page():
+        return db.session.scalars(db.select(Recipe).filter_by(is_published=True)
+                                  .options(*Recipe.load_options(CARD_FIELDS))
+                                  .order_by(Recipe.created_at.desc()).limit(RECIPE_PAGE)).all()
+
+    def review_page():
+        return Review.query.order_by(Review.created_at.desc()).limit(REVIEW_PAGE).all()
+
+    def user_page():
+        return User.query.order_by(User.created_at.desc()).limit(USER_PAGE).all()
+
+    def serialize(page, fn):
+        """to_dict on objects loaded once (relationships warmed by the first call)"""
+        db.session.expunge_all()
+        objects = page()
+        for obj in objects:
+            fn(obj)
+        return lambda: [fn(obj) for obj in objects]
+
+    def load_and_serialize(page, fn):
+        """The route's work per request: load the page in a fresh session and serialize it"""
+        def run():
+            db.session.expunge_all()
+            return [fn(obj) for obj in page()]
+        return run
+
+    cases = {
+        f'Recipe.to_dict full x{RECIPE_PAGE}': (recipe_page, lambda recipe: recipe.to_dict()),
+        f'Recipe.to_dict card x{RECIPE_PAGE}': (card_page,
+                                                 lambda recipe: recipe.to_dict(viewer_id, fields=CARD_FIELDS)),
+        f'Review.to_dict x{REVIEW_PAGE}': (review_page, lambda review: review.to_dict()),
+        f'User.to_dict x{USER_PAGE}': (user_page, lambda user: user.to_dict()),
+    }
+    benchmarks = {}
+    for name, (page, fn) in cases.items():
+        benchmarks[name] = serialize(page, fn)
+        benchmarks[f'{name} +load'] = load_and_serialize(page, fn)
+    return benchmarks
+
+
+def image_benchmarks(upload_folder):
+    """name -> fn for process_image on each sample image"""
+    from werkzeug.datastructures import FileStorage
+    from routes.recipe_routes import process_image
+
+    benchmarks = {}
+    for label, (size, mode, fmt) in IMAGES.items():
+        data = sample_image(size, mode, fmt)
+        filename = f'upload.{fmt.lower()}'
+
+        def run(data=data, filename=filename):
+            saved = process_image(FileStorage(io.BytesIO(data), filename=filename), upload_folder)
+            os.remove(os.path.join(upload_folder, saved))
+
+        benchmarks[f'process_image {label} {size[0]}x{size[1]}'] = run
+    return benchmarks
+
+
+def password_benchmarks():
+    """name -> fn for password validation and hashing"""
+    from werkzeug.security import check_password_hash, generate_password_hash
+    from routes.auth_routes import validate_password
+
+    password_hash = generate_password_hash('correct horse 42')
+    return {
+        'validate_password': lambda: validate_password('correct horse 42'),
+        'generate_password_hash': lambda: generate_password_hash('correct horse 42'),
+        'check_password_hash': lambda: check_password_hash(password_hash, 'correct horse 42'),
+    }
+
+
+def compare(results, previous):
+    """Print each benchmark's change against a previous run"""
+    print(f"\nCompared with {previous['meta'].get('timestamp')}:")
+    for name, result in results.items():
+        before = previous['benchmarks'].get(name)
+        if before:
+            change = result['best'] / before['best'] - 1
+            print(f"{name:<42}{format_time(before['best']):>12} -> {format_time(result['best']):>10}"
+                  f"{change:>+9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serialization, image processing and hashing microbenchmarks')
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per timed loop')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='A previous --output file to compare with')
+    args = parser.parse_args()
+
+    app = create_test_app()
+    upload_folder = tempfile.mkdtemp(prefix='tastyshare-microbench-')
+    with app.app_context():
+        seed_small_dataset(users=USER_PAGE, recipes_per_user=1, reviews_per_recipe=3)
+        benchmarks = {
+            **serialization_benchmarks(),
+            **image_benchmarks(upload_folder),
+            **password_benchmarks(),
+        }
+
+        print(f"⏱️  CPU per call, best (median) of {args.repeat}")
+        print("=" * 68)
+        results = {}
+        try:
+            for name, fn in benchmarks.items():
+                if args.filter.lower() not in name.lower():
+                    continue
+                best, median = measure(fn, args.repeat, args.min_time)
+                results[name] = {'best': best, 'median': median}
+                print(f"{name:<42}{format_time(best):>12} ({format_time(median)})")
+        finally:
+            shutil.rmtree(upload_folder, ignore_errors=True)
+
+    if not results:
+        print(f"❌ No benchmark matches {args.filter!r}")
+        raise SystemExit(1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}, 'benchmarks': results}, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+SQLite concurrency benchmark: default journaling vs performance mode.
+
+Starts several worker processes (like gunicorn sync workers) against one
+SQLite file. Each worker loops over recipe list reads, recipe detail reads
+(which write the view count) and favorite toggles for a fixed duration.
+Reports read/write throughput and failed requests for both modes.
+
+    python -m benchmarks.sqlite_concurrency --workers 4 --duration 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import create_test_app, seed_small_dataset, auth_headers
+
+
+def worker(database_url, tuned, duration, seed, results):
+    app = create_test_app(database_url, SQLITE_PERFORMANCE_MODE=tuned)
+    client = app.test_client()
+    rng = random.Random(seed)
+
+    from models.recipe import Recipe
+    from models.user import User
+
+    with app.app_context():
+        recipe_ids = [r.id for r in Recipe.query.with_entities(Recipe.id).all()]
+        user_ids = [u.id for u in User.query.with_entities(User.id).all()]
+        headers = [auth_headers(user_id) for user_id in user_ids]
+
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < 0.6:
+            response = client.get(f'/api/recipes/?page={rng.randint(1, 3)}')
+            kind = 'reads'
+        elif roll < 0.85:
+            response = client.get(f'/api/recipes/{rng.choice(recipe_ids)}')
+            kind = 'writes'
+        else:
+            response = client.post(f'/api/recipes/{rng.choice(recipe_ids)}/favorite',
+                                   headers=rng.choice(headers))
+            kind = 'writes'
+
+        if response.status_code == 200:
+            counts[kind] += 1
+        else:
+            counts['errors'] += 1
+
+    results.put(counts)
+
+
+def run_mode(tuned, workers, duration):
+    directory = tempfile.mkdtemp(prefix='tastyshare-bench-')
+    database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+
+    # Seed in the parent with the matching journal mode (WAL persists in the file)
+    app = create_test_app(database_url, SQLITE_PERFORMANCE_MODE=tuned)
+    with app.app_context():
+        seed_small_dataset(users=20, recipes_per_user=5, reviews_per_recipe=3)
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(database_url, tuned, duration, seed, results))
+        for seed in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = {'reads': 0, 'writes': 0, 'errors': 0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for process in processes:
+        process.join()
+    shutil.rmtree(directory, ignore_errors=True)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite concurrency benchmark')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per mode')
+    args = parser.parse_args()
+
+    print(f"🏁 SQLite concurrency: {args.workers} workers, {args.duration:.0f}s per mode")
+    print("=" * 60)
+    print(f"{'mode':<14}{'reads/s':>10}{'writes/s':>10}{'errors':>10}")
+    for label, tuned in (('default', False), ('performance', True)):
+        totals = run_mode(tuned, args.workers, args.duration)
+        print(f"{label:<14}{totals['reads'] / args.duration:>10.1f}"
+              f"{totals['writes'] / args.duration:>10.1f}{totals['errors']:>10}")
+
+
+if __name__ == '__main__':
+    main()
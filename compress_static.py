@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Precompress static assets for TastyShare
+Writes .gz (and .br when brotli is installed) next to every CSS/JS/SVG/HTML
+file so the static view can serve them without compressing per request.
+Run at build time (Railway build command, deploy.py).
+"""
+
+import argparse
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+EXTENSIONS = ('.css', '.js', '.svg', '.html', '.json', '.txt', '.xml', '.map')
+SKIP_DIRS = ('uploads',)  # user content changes at runtime
+MIN_SIZE = 500  # bytes; matches COMPRESS_MIN_SIZE
+
+
+def compressors():
+    """Suffix -> compress function, best compression (this runs once per build)"""
+    result = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        result['.br'] = lambda data: brotli.compress(data, quality=11)
+    return result
+
+
+def iter_assets(root):
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = [name for name in subdirs if name not in SKIP_DIRS]
+        for name in files:
+            if name.endswith(EXTENSIONS):
+                yield os.path.join(directory, name)
+
+
+def compress_assets(root, force=False):
+    """Write missing or stale siblings; returns (skipped, {suffix: [files, bytes before, bytes after]})"""
+    skipped = 0
+    totals = {}
+    for path in iter_assets(root):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < MIN_SIZE:
+            continue
+        for suffix, compress in compressors().items():
+            target = path + suffix
+            if not force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                skipped += 1
+                continue
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            with open(target, 'wb') as f:
+                f.write(compressed)
+            stats = totals.setdefault(suffix, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += len(data)
+            stats[2] += len(compressed)
+    return skipped, totals
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Precompress TastyShare static assets')
+    parser.add_argument('--root', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'),
+                        help='Static folder to process')
+    parser.add_argument('--force', action='store_true', help='Rewrite up-to-date files too')
+    args = parser.parse_args()
+
+    print("🗜️  Precompressing static assets...")
+    if brotli is None:
+        print("ℹ️  brotli is not installed; writing .gz files only")
+
+    skipped, totals = compress_assets(args.root, args.force)
+    for suffix, (files, before, after) in totals.items():
+        print(f"✅ {suffix}: {files} files ({before / 1024:.1f} KB -> {after / 1024:.1f} KB)")
+    if not totals:
+        print("✅ Nothing to compress")
+    if skipped:
+        print(f"⏭️  {skipped} files already up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
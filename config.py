@@ -10,6 +10,109 @@ class Config:
     UPLOAD_FOLDER = 'static/uploads/recipes'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Login/registration throttling: (burst size, seconds to refill the burst)
+    AUTH_RATE_LIMIT_ENABLED = os.environ.get('AUTH_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    AUTH_RATE_LIMIT_PER_IP = (20, 60)
+    AUTH_RATE_LIMIT_PER_ACCOUNT = (5, 300)
+    # memory:// keeps buckets per worker, redis://host:6379/0 shares them
+    AUTH_RATE_LIMIT_STORAGE_URL = os.environ.get('AUTH_RATE_LIMIT_STORAGE_URL', 'memory://')
+    # Number of reverse proxies in front of the app whose X-Forwarded-For is trusted
+    AUTH_RATE_LIMIT_PROXY_HOPS = int(os.environ.get('AUTH_RATE_LIMIT_PROXY_HOPS', 0))
+
+    # Email syntax is always checked offline; DNS deliverability runs in the background
+    EMAIL_DELIVERABILITY_CHECK = os.environ.get('EMAIL_DELIVERABILITY_CHECK', 'false').lower() == 'true'
+    EMAIL_DOMAIN_CACHE_TTL = 3600  # seconds
+    EMAIL_DNS_TIMEOUT = 5  # seconds
+
+    # Optional read replica for GET requests (e.g. sqlite:///tastyshare_replica.db locally)
+    SQLALCHEMY_REPLICA_URI = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 5))  # seconds
+    SQLALCHEMY_REPLICA_CHECK_INTERVAL = 10  # seconds between health/lag checks
+
+    # SQLite: WAL + pragmas on connect, BEGIN IMMEDIATE for write requests
+    SQLITE_PERFORMANCE_MODE = os.environ.get('SQLITE_PERFORMANCE_MODE', 'true').lower() == 'true'
+    SQLITE_PRAGMAS = {}  # overrides for services.sqlite_tuning.DEFAULT_PRAGMAS
+    SQLITE_WRITE_RETRIES = 5
+    SQLITE_RETRY_BASE_DELAY = 0.05  # seconds, doubled per retry
+
+    # Trending ranking: activity weights decayed with a half-life, refreshed periodically
+    TRENDING_ENABLED = os.environ.get('TRENDING_ENABLED', 'true').lower() == 'true'
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24))
+    TRENDING_WEIGHTS = {'view': 1.0, 'favorite': 5.0, 'review': 8.0}
+    TRENDING_FLUSH_INTERVAL = 30  # seconds a worker buffers events before writing them
+    # Seconds between automatic refreshes; 0 = only `flask trending refresh`
+    TRENDING_REFRESH_INTERVAL = int(os.environ.get('TRENDING_REFRESH_INTERVAL', 300))
+    TRENDING_MIN_SCORE = 0.05  # rows decayed below this drop out of the ranking
+
+    # Similar recipes: `flask similar rebuild` from a scheduler; edits refresh one recipe in the background
+    SIMILAR_RECIPES_ENABLED = os.environ.get('SIMILAR_RECIPES_ENABLED', 'true').lower() == 'true'
+    SIMILAR_K = int(os.environ.get('SIMILAR_K', 10))  # neighbors stored per recipe
+    SIMILAR_MIN_SCORE = 0.05  # cosine similarity below which recipes aren't related
+    SIMILAR_FIELD_WEIGHTS = {'ingredients': 1.0, 'tags': 1.0, 'cuisine': 0.8, 'category': 0.4, 'text': 0.4}
+    SIMILAR_CHUNK_SIZE = 2000  # recipes per similarity block and write transaction
+    SIMILAR_BLOCK_MB = int(os.environ.get('SIMILAR_BLOCK_MB', 256))  # memory for one block of scores
+    SIMILAR_MODEL_PATH = os.environ.get('SIMILAR_MODEL_PATH')  # default: instance/similar_model.npz
+
+    # Personalized recommendations: `flask recommendations train` from a scheduler
+    RECOMMENDATIONS_N = int(os.environ.get('RECOMMENDATIONS_N', 50))  # stored per user
+    RECOMMENDATIONS_NEIGHBORS = 50  # most similar recipes kept per recipe
+    RECOMMENDATIONS_MIN_SIMILARITY = 0.01
+    RECOMMENDATION_WEIGHTS = {'favorite': 1.0, 'rating_5': 1.0, 'rating_4': 0.7, 'rating_3': 0.3}
+    RECOMMENDATIONS_CHUNK_SIZE = 2000  # users per write transaction
+    RECOMMENDATIONS_BLOCK_MB = int(os.environ.get('RECOMMENDATIONS_BLOCK_MB', 256))  # memory for one block of similarities
+
+    ADMIN_DASHBOARD_CACHE_TTL = 30  # seconds; ?refresh=true bypasses the cache
+
+    # gzip/brotli for dynamic responses; static files use compress_static.py output
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = 500  # bytes
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))  # gzip 1-9
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))  # brotli 0-11
+    
+    # ASGI mode (asgi.py): async engine for the API reads, thread pool for the Flask app
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')  # default: DATABASE_URL with an async driver
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 10))
+    ASYNC_DB_MAX_OVERFLOW = int(os.environ.get('ASYNC_DB_MAX_OVERFLOW', 10))
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 8))
+    
+    # Per-request query count/DB time (X-Query-Count, Server-Timing) and N+1 warnings
+    QUERY_STATS_ENABLED = os.environ.get('QUERY_STATS_ENABLED', 'false').lower() == 'true'
+    QUERY_STATS_HEADERS = os.environ.get('QUERY_STATS_HEADERS', 'true').lower() == 'true'
+    QUERY_STATS_REPEAT_THRESHOLD = int(os.environ.get('QUERY_STATS_REPEAT_THRESHOLD', 10))
+    
+    # Slow query log with background EXPLAIN capture (/api/admin/slow-queries)
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+    SLOW_QUERY_EXPLAIN_INTERVAL = 300  # seconds before the same statement shape is explained again
+    SLOW_QUERY_MAX_SHAPES = 200  # per worker
+    
+    # Request profiling: admins send the X-Profile header, or a share of requests is sampled
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILING_HEADER = 'X-Profile'
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))  # 0.01 = 1% of requests
+    PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 1))
+    PROFILING_DIR = os.environ.get('PROFILING_DIR')  # default: instance/profiles
+    PROFILING_MAX_FILES = 50
+    
+    # Request tracing: spans exported as OTLP/JSON to a collector or a local file (`flask traces show`)
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() == 'true'
+    TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE', 1.0))
+    # Follow the sampled flag of incoming traceparent headers (only behind a gateway that sets them)
+    TRACING_TRUST_TRACEPARENT = os.environ.get('TRACING_TRUST_TRACEPARENT', 'false').lower() == 'true'
+    TRACING_HEADER = 'X-Trace-Id'
+    TRACING_SERVICE_NAME = os.environ.get('TRACING_SERVICE_NAME', 'tastyshare')
+    TRACING_OTLP_ENDPOINT = os.environ.get('TRACING_OTLP_ENDPOINT')  # e.g. http://localhost:4318/v1/traces
+    TRACING_FILE = os.environ.get('TRACING_FILE')  # default: instance/traces.jsonl
+    TRACING_FILE_MAX_MB = 50  # rotated to <file>.1 beyond this
+    TRACING_BATCH_SIZE = 512  # spans
+    TRACING_EXPORT_INTERVAL = 5  # seconds a worker buffers spans before exporting them
+    
+    # Prometheus /metrics (gunicorn.conf.py sets PROMETHEUS_MULTIPROC_DIR for the workers)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # require "Authorization: Bearer <token>" when set
+    METRICS_REQUIRE_TOKEN = False  # never serve /metrics unauthenticated
     
     # Security headers
     SECURITY_HEADERS = {
@@ -24,19 +127,24 @@ class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or 'sqlite:///tastyshare_dev.db'
     PREFERRED_URL_SCHEME = 'http'
+    QUERY_STATS_ENABLED = os.environ.get('QUERY_STATS_ENABLED', 'true').lower() == 'true'
+    TRACING_EXPORT_INTERVAL = 0  # export after every request, so `flask traces show` is current
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     PREFERRED_URL_SCHEME = 'https'
+    AUTH_RATE_LIMIT_PROXY_HOPS = int(os.environ.get('AUTH_RATE_LIMIT_PROXY_HOPS', 1))
+    METRICS_REQUIRE_TOKEN = True
     
     # Additional production settings
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
-        'pool_size': 10,
-        'max_overflow': 20
+        # Set per worker by gunicorn.conf.py from DB_MAX_CONNECTIONS
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20))
     }
 
 class TestingConfig(Config):
@@ -44,6 +152,7 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    TRENDING_REFRESH_INTERVAL = 0  # no background thread on the in-memory database
 
 class RailwayConfig(ProductionConfig):
     """Railway-specific configuration"""
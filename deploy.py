@@ -57,6 +57,10 @@ def setup_production():
     if not run_command("pip install -r requirements.txt", "Installing dependencies"):
         return False
     
+    # Precompress static assets
+    if not run_command("python compress_static.py", "Precompressing static assets"):
+        return False
+    
     # Initialize migrations
     if not run_command("python manage_db.py init", "Initializing migrations"):
         return False
@@ -75,7 +79,7 @@ def setup_production():
     
     print("✅ Production environment ready!")
     print("\n📋 Next steps:")
-    print("   1. Run: gunicorn -w 4 -b 0.0.0.0:8000 app:app")
+    print("   1. Run: gunicorn app:app  (settings in gunicorn.conf.py)")
     print("   2. Or use your preferred WSGI server")
     
     return True
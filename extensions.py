@@ -1,10 +1,34 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
-from flask_migrate import Migrate
+from services.lazy_migrate import LazyMigrate
+from services.rate_limit import AuthThrottle
+from services.email_checks import EmailDeliverabilityChecker
+from services.db_routing import RoutingSession, ReplicaRouter
+from services.trending import TrendingTracker
+from services.compression import Compressor
+from services.query_stats import QueryStats
+from services.metrics import Metrics
+from services.slow_queries import SlowQueryLog
+from services.profiling import RequestProfiler
+from services.tracing import Tracer
+from services.similar import SimilarRecipes
+from services.recommendations import Recommender
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 bcrypt = Bcrypt()
-migrate = Migrate()
+migrate = LazyMigrate()
+auth_throttle = AuthThrottle()
+email_checker = EmailDeliverabilityChecker()
+db_router = ReplicaRouter()
+trending = TrendingTracker()
+compressor = Compressor()
+query_stats = QueryStats()
+metrics = Metrics()
+slow_queries = SlowQueryLog()
+profiler = RequestProfiler()
+tracer = Tracer()
+similar_recipes = SimilarRecipes()
+recommender = Recommender()
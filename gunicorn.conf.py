@@ -0,0 +1,97 @@
+"""
+gunicorn settings for TastyShare (read automatically from the project root)
+
+    gunicorn app:app
+
+Workers, threads and each worker's database pool are sized from the
+container's CPU and memory limits (services/server_tuning.py); pin them
+with WEB_CONCURRENCY / GUNICORN_THREADS. The app is imported once in the
+master (preload_app) and shared copy-on-write with the workers, which are
+recycled after a jittered number of requests and drain in-flight requests
+on SIGTERM.
+"""
+
+import glob
+import os
+import tempfile
+
+from services.server_tuning import size_server
+
+
+def _env_int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+sizing = size_server(
+    workers=_env_int('WEB_CONCURRENCY'),
+    threads=_env_int('GUNICORN_THREADS'),
+    worker_memory_mb=_env_int('GUNICORN_WORKER_MEMORY_MB', 150),
+    max_connections=_env_int('DB_MAX_CONNECTIONS', 100),
+    reserved_connections=_env_int('DB_RESERVED_CONNECTIONS', 5),
+    replicas=_env_int('WEB_REPLICAS', 1),
+)
+
+# Read by ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS when the app is preloaded below
+os.environ['DB_POOL_SIZE'] = str(sizing['pool_size'])
+os.environ['DB_MAX_OVERFLOW'] = str(sizing['max_overflow'])
+
+# Workers write Prometheus samples here and /metrics merges them (services/metrics.py).
+# Set before the app is preloaded; samples of the previous run are removed.
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'tastyshare-metrics'))
+os.makedirs(metrics_dir, exist_ok=True)
+for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+    os.remove(path)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = sizing['workers']
+threads = sizing['threads']
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = True
+
+# Recycle workers so slow leaks can't grow forever; jitter avoids restarting them all at once
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = 5
+
+# Heartbeat files on tmpfs: a slow container disk can't stall workers into timeouts
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')  # '-' for stdout
+
+
+def on_starting(server):
+    server.log.info('Sizing: %(cpus)s CPUs, %(memory_mb)s MB -> %(workers)s workers x %(threads)s threads, '
+                    'db pool %(pool_size)s + %(max_overflow)s overflow per worker', sizing)
+
+
+def post_fork(server, worker):
+    # Connections the preloaded app opened in the master must not be shared by workers
+    from extensions import db
+    with server.app.wsgi().app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges (connections in use) from /metrics
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    # Write buffered trending events and spans, and let background checks finish before the worker goes
+    from extensions import email_checker, similar_recipes, slow_queries, tracer, trending
+    with server.app.wsgi().app_context():
+        trending.flush()
+        trending.shutdown()
+        email_checker.shutdown()
+        slow_queries.shutdown()
+        similar_recipes.shutdown()
+        tracer.shutdown()
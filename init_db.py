@@ -19,11 +19,24 @@ from models.recipe import Recipe
 from models.review import Review
 from models.favorite import Favorite
 
+# Schema that db.create_all() built before deploys ran the migrations
+INITIAL_REVISION = '3f2a9c1d7b10'
+
 def create_tables():
-    """Create all database tables"""
-    print("Creating database tables...")
-    db.create_all()
-    print("✅ Database tables created successfully!")
+    """Create or upgrade the database tables by running the migrations"""
+    from flask import current_app
+    from flask_migrate import stamp, upgrade
+    from sqlalchemy import inspect
+    from extensions import migrate
+
+    migrate.load(current_app._get_current_object())
+    tables = inspect(db.engine).get_table_names()
+    if tables and 'alembic_version' not in tables:
+        print(f"Stamping the existing schema as revision {INITIAL_REVISION}...")
+        stamp(revision=INITIAL_REVISION)
+    print("Running database migrations...")
+    upgrade()
+    print("✅ Database tables up to date!")
 
 def seed_admin_user():
     """Create admin user if it doesn't exist"""
@@ -0,0 +1,58 @@
+"""hot path indexes
+
+Revision ID: 8c4e1b27d5a3
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-19 14:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e1b27d5a3'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # get_recipes: is_published + optional category/cuisine, sorted by created_at or view_count
+    ('ix_recipes_published_created', 'recipes', ['is_published', 'created_at'], {}),
+    ('ix_recipes_published_views', 'recipes', ['is_published', 'view_count'], {}),
+    ('ix_recipes_published_category_created', 'recipes', ['is_published', 'category', 'created_at'], {}),
+    ('ix_recipes_published_cuisine_created', 'recipes', ['is_published', 'cuisine_type', 'created_at'], {}),
+    # user recipes, public profiles and the user.recipes relationship
+    ('ix_recipes_user_created', 'recipes', ['user_id', 'created_at'], {}),
+    # admin dashboard "new this week/month" and admin recipe list
+    ('ix_recipes_created_at', 'recipes', ['created_at'], {}),
+    # get_recipe_reviews and per-recipe rating aggregates
+    ('ix_reviews_recipe_created', 'reviews', ['recipe_id', 'created_at'], {}),
+    ('ix_reviews_created_at', 'reviews', ['created_at'], {}),
+    # admin reported reviews: partial, only reported rows are indexed
+    ('ix_reviews_reported_created', 'reviews', ['created_at'], {
+        'postgresql_where': sa.text('is_reported'),
+        'sqlite_where': sa.text('is_reported = 1'),
+    }),
+    # get_user_favorites and favorite lookups/cascades by recipe
+    ('ix_favorites_user_created', 'favorites', ['user_id', 'created_at'], {}),
+    ('ix_favorites_recipe_id', 'favorites', ['recipe_id'], {}),
+    # admin user list and dashboard
+    ('ix_users_created_at', 'users', ['created_at'], {}),
+    ('ix_users_active_created', 'users', ['is_active', 'created_at'], {}),
+]
+
+
+def upgrade():
+    # CONCURRENTLY can't run inside a transaction on PostgreSQL; it is
+    # ignored on SQLite, where the autocommit block is harmless
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, **kwargs)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""user recommendations
+
+Revision ID: a9e4f27c0d65
+Revises: f3c8d1a6b492
+Create Date: 2026-10-19 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e4f27c0d65'
+down_revision = 'f3c8d1a6b492'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_recommendations',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'recipe_id')
+    )
+    op.create_index('ix_user_recommendations_user_score', 'user_recommendations', ['user_id', 'score'], unique=False)
+    op.create_index('ix_user_recommendations_recipe', 'user_recommendations', ['recipe_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_recommendations_recipe', table_name='user_recommendations')
+    op.drop_index('ix_user_recommendations_user_score', table_name='user_recommendations')
+    op.drop_table('user_recommendations')
@@ -0,0 +1,91 @@
+"""json recipe columns
+
+Revision ID: b7d03e5a9f42
+Revises: 8c4e1b27d5a3
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d03e5a9f42'
+down_revision = '8c4e1b27d5a3'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+COLUMNS = ('ingredients', 'instructions')
+
+
+def to_json_list(raw):
+    """Canonical JSON list text for a legacy value (kept in sync with models.types)"""
+    if raw is None or not raw.strip():
+        return '[]'
+    try:
+        value = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        value = [line.strip() for line in raw.splitlines() if line.strip()]
+    if not isinstance(value, list):
+        value = [value] if isinstance(value, str) else []
+    return json.dumps(value)
+
+
+def normalize_rows():
+    """Rewrite malformed rows as JSON lists, in primary-key batches"""
+    connection = op.get_bind()
+    recipes = sa.table('recipes', sa.column('id', sa.Integer),
+                       *[sa.column(name, sa.Text) for name in COLUMNS])
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(recipes.c.id, *[recipes.c[name] for name in COLUMNS])
+            .where(recipes.c.id > last_id)
+            .order_by(recipes.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for row in rows:
+            values = {name: to_json_list(getattr(row, name)) for name in COLUMNS}
+            if any(values[name] != getattr(row, name) for name in COLUMNS):
+                updates.append({'row_id': row.id, **values})
+        if updates:
+            connection.execute(
+                recipes.update()
+                .where(recipes.c.id == sa.bindparam('row_id'))
+                .values({name: sa.bindparam(name) for name in COLUMNS}),
+                updates
+            )
+        last_id = rows[-1].id
+
+
+def upgrade():
+    normalize_rows()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in COLUMNS:
+            op.execute(f'ALTER TABLE recipes ALTER COLUMN {name} TYPE JSONB USING {name}::jsonb')
+    else:
+        # SQLite stores JSON as text either way; this only updates the declared type
+        with op.batch_alter_table('recipes') as batch_op:
+            for name in COLUMNS:
+                batch_op.alter_column(name, existing_type=sa.Text(), type_=sa.JSON(),
+                                      existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in COLUMNS:
+            op.execute(f'ALTER TABLE recipes ALTER COLUMN {name} TYPE TEXT USING {name}::text')
+    else:
+        with op.batch_alter_table('recipes') as batch_op:
+            for name in COLUMNS:
+                batch_op.alter_column(name, existing_type=sa.JSON(), type_=sa.Text(),
+                                      existing_nullable=False)
@@ -0,0 +1,27 @@
+"""trending event kind
+
+Revision ID: c6f2b8d4e913
+Revises: a9e4f27c0d65
+Create Date: 2026-10-19 20:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f2b8d4e913'
+down_revision = 'a9e4f27c0d65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Pending events written before this have no kind; they are folded in by the next refresh
+    with op.batch_alter_table('trending_events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('kind', sa.String(length=16), server_default='view', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('trending_events', schema=None) as batch_op:
+        batch_op.drop_column('kind')
@@ -0,0 +1,40 @@
+"""trending ranking
+
+Revision ID: d41a6c8e2f57
+Revises: b7d03e5a9f42
+Create Date: 2026-10-19 16:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a6c8e2f57'
+down_revision = 'b7d03e5a9f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('trending_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('recipe_trending',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+    op.create_index('ix_recipe_trending_score', 'recipe_trending', ['score', 'recipe_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_recipe_trending_score', table_name='recipe_trending')
+    op.drop_table('recipe_trending')
+    op.drop_table('trending_events')
@@ -0,0 +1,36 @@
+"""daily metric rollups
+
+Revision ID: e5b9a2c7d318
+Revises: d41a6c8e2f57
+Create Date: 2026-10-19 17:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9a2c7d318'
+down_revision = 'd41a6c8e2f57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_metrics',
+    sa.Column('metric', sa.String(length=30), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('metric', 'day')
+    )
+    # The rollup job reads favorites by creation date; built without locking writes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_favorites_created_at', 'favorites', ['created_at'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_favorites_created_at', table_name='favorites', postgresql_concurrently=True)
+    op.drop_table('daily_metrics')
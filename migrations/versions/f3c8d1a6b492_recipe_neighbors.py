@@ -0,0 +1,35 @@
+"""recipe neighbors
+
+Revision ID: f3c8d1a6b492
+Revises: e5b9a2c7d318
+Create Date: 2026-10-19 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8d1a6b492'
+down_revision = 'e5b9a2c7d318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('recipe_neighbors',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('neighbor_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['neighbor_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id', 'neighbor_id')
+    )
+    op.create_index('ix_recipe_neighbors_recipe_score', 'recipe_neighbors', ['recipe_id', 'score'], unique=False)
+    op.create_index('ix_recipe_neighbors_neighbor', 'recipe_neighbors', ['neighbor_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_recipe_neighbors_neighbor', table_name='recipe_neighbors')
+    op.drop_index('ix_recipe_neighbors_recipe_score', table_name='recipe_neighbors')
+    op.drop_table('recipe_neighbors')
@@ -0,0 +1,23 @@
+from datetime import datetime
+from extensions import db
+
+class DailyMetric(db.Model):
+    """Count of one metric for one UTC day, maintained by ``flask analytics rollup``"""
+    __tablename__ = 'daily_metrics'
+
+    # Primary key order makes "one metric over a date range" a single index range read
+    metric = db.Column(db.String(30), primary_key=True)  # 'signups', 'recipes', 'reviews', 'favorites', 'views'
+    day = db.Column(db.Date, primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert metric row to dictionary"""
+        return {
+            'metric': self.metric,
+            'day': self.day,
+            'value': self.value
+        }
+
+    def __repr__(self):
+        return f'<DailyMetric {self.metric} {self.day}: {self.value}>'
@@ -12,16 +12,26 @@ class Favorite(db.Model):
     recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False)
     
     # Unique constraint to prevent duplicate favorites
-    __table_args__ = (db.UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe_favorite'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe_favorite'),
+        db.Index('ix_favorites_user_created', 'user_id', 'created_at'),
+        db.Index('ix_favorites_recipe_id', 'recipe_id'),
+        db.Index('ix_favorites_created_at', 'created_at'),
+    )
     
-    def to_dict(self):
-        """Convert favorite object to dictionary"""
+    def to_dict(self, fields=None):
+        """Convert favorite object to dictionary (the recipe is favorited by definition)"""
+        recipe = None
+        if self.recipe:
+            recipe = self.recipe.to_dict(fields=fields)
+            if 'is_favorited' in recipe:
+                recipe['is_favorited'] = True
         return {
             'id': self.id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
             'user_id': self.user_id,
             'recipe_id': self.recipe_id,
-            'recipe': self.recipe.to_dict() if self.recipe else None
+            'recipe': recipe
         }
     
     def __repr__(self):
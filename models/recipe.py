@@ -1,7 +1,7 @@
 from datetime import datetime
 from sqlalchemy import func
 from extensions import db
-import json
+from models.types import JSONList
 
 class Recipe(db.Model):
     __tablename__ = 'recipes'
@@ -9,8 +9,8 @@ class Recipe(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    ingredients = db.Column(db.Text, nullable=False)  # JSON string of ingredients list
-    instructions = db.Column(db.Text, nullable=False)  # JSON string of step-by-step instructions
+    ingredients = db.Column(JSONList, nullable=False)  # list of ingredients
+    instructions = db.Column(JSONList, nullable=False)  # list of step-by-step instructions
     category = db.Column(db.String(50), nullable=False)  # e.g., 'breakfast', 'dinner', 'dessert'
     cuisine_type = db.Column(db.String(50), nullable=True)  # e.g., 'italian', 'indian', 'mexican'
     dietary_preference = db.Column(db.String(50), nullable=True)  # 'vegan', 'vegetarian', 'non-vegetarian'
@@ -26,6 +26,9 @@ class Recipe(db.Model):
     is_featured = db.Column(db.Boolean, default=False)
     is_published = db.Column(db.Boolean, default=True)
     view_count = db.Column(db.Integer, default=0)
+    summary = db.query_expression()  # truncated description, only loaded by card projections
+    rating_average = db.query_expression()  # loaded with sparse projections instead of lazy-loading reviews
+    rating_total = db.query_expression()
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -36,6 +39,16 @@ class Recipe(db.Model):
     reviews = db.relationship('Review', backref='recipe', lazy=True, cascade='all, delete-orphan')
     favorites = db.relationship('Favorite', backref='recipe', lazy=True, cascade='all, delete-orphan')
     
+    # Indexes matched to the listing filters and sort orders
+    __table_args__ = (
+        db.Index('ix_recipes_published_created', 'is_published', 'created_at'),
+        db.Index('ix_recipes_published_views', 'is_published', 'view_count'),
+        db.Index('ix_recipes_published_category_created', 'is_published', 'category', 'created_at'),
+        db.Index('ix_recipes_published_cuisine_created', 'is_published', 'cuisine_type', 'created_at'),
+        db.Index('ix_recipes_user_created', 'user_id', 'created_at'),
+        db.Index('ix_recipes_created_at', 'created_at'),
+    )
+    
     def get_average_rating(self):
         """Calculate average rating for this recipe"""
         if not self.reviews:
@@ -63,55 +76,112 @@ class Recipe(db.Model):
     
     def increment_view_count(self):
         """Increment view count"""
-        self.view_count = (self.view_count or 0) + 1
-        db.session.commit()
-    
-    def to_dict(self, user_id=None):
-        """Convert recipe object to dictionary"""
-        # Parse JSON strings for ingredients and instructions
-        try:
-            ingredients = json.loads(self.ingredients) if self.ingredients else []
-        except (json.JSONDecodeError, TypeError):
-            ingredients = []
+        from services.sqlite_tuning import run_with_retry
         
-        try:
-            instructions = json.loads(self.instructions) if self.instructions else []
-        except (json.JSONDecodeError, TypeError):
-            instructions = []
+        def increment():
+            # Increment in SQL so a stale (replica) read can't lose concurrent views
+            self.view_count = func.coalesce(Recipe.view_count, 0) + 1
+            db.session.commit()
         
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'ingredients': ingredients,
-            'instructions': instructions,
-            'category': self.category,
-            'cuisine_type': self.cuisine_type,
-            'dietary_preference': self.dietary_preference,
-            'prep_time': self.prep_time,
-            'cook_time': self.cook_time,
-            'total_time': self.get_total_time(),
-            'servings': self.servings,
-            'difficulty_level': self.difficulty_level,
-            'calories_per_serving': self.calories_per_serving,
-            'image_url': self.image_url,
-            'video_url': self.video_url,
-            'tags': self.tags,
-            'is_featured': self.is_featured,
-            'is_published': self.is_published,
-            'view_count': self.view_count,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'user_id': self.user_id,
-            'author': {
-                'id': self.author.id,
-                'username': self.author.username,
-                'profile_image': self.author.profile_image
-            },
-            'average_rating': round(self.get_average_rating(), 1),
-            'rating_count': self.get_rating_count(),
-            'is_favorited': self.is_favorited_by(user_id) if user_id else False
-        }
+        run_with_retry(increment)
+    
+    def to_dict(self, user_id=None, fields=None):
+        """Convert recipe object to dictionary (optionally only the given fields)"""
+        return {name: RECIPE_FIELDS[name](self, user_id) for name in (fields or DEFAULT_FIELDS)}
+    
+    @classmethod
+    def load_options(cls, fields):
+        """Loader options that fetch only the columns needed for the given fields"""
+        columns = {'id'}
+        for name in fields:
+            columns.update(FIELD_COLUMNS.get(name, (name,)))
+        options = [db.load_only(*[getattr(cls, column) for column in columns])]
+        if 'summary' in fields:
+            preview = func.substr(cls.description, 1, SUMMARY_LENGTH)
+            options.append(db.with_expression(cls.summary, preview))
+        if 'average_rating' in fields or 'rating_count' in fields:
+            from models.review import Review
+            ratings = db.select(Review.rating).where(Review.recipe_id == cls.id)
+            options.append(db.with_expression(cls.rating_average, func.coalesce(
+                ratings.with_only_columns(func.avg(Review.rating)).scalar_subquery(), 0)))
+            options.append(db.with_expression(cls.rating_total,
+                ratings.with_only_columns(func.count()).scalar_subquery()))
+        if 'author' in fields:
+            from models.user import User
+            options.append(db.selectinload(cls.author).load_only(User.id, User.username, User.profile_image))
+        return options
     
     def __repr__(self):
         return f'<Recipe {self.title}>'
+
+
+SUMMARY_LENGTH = 200
+
+
+def _author(recipe, user_id):
+    return {
+        'id': recipe.author.id,
+        'username': recipe.author.username,
+        'profile_image': recipe.author.profile_image
+    }
+
+
+def _column(name):
+    return lambda recipe, user_id: getattr(recipe, name)
+
+
+def _average_rating(recipe, user_id):
+    average = recipe.rating_average
+    if average is None:
+        average = recipe.get_average_rating()
+    return round(float(average), 1)
+
+
+def _rating_count(recipe, user_id):
+    total = recipe.rating_total
+    return recipe.get_rating_count() if total is None else total
+
+
+# Field name -> serializer(recipe, user_id)
+RECIPE_FIELDS = {
+    **{name: _column(name) for name in (
+        'id', 'title', 'description', 'category', 'cuisine_type', 'dietary_preference',
+        'prep_time', 'cook_time', 'servings', 'difficulty_level', 'calories_per_serving',
+        'image_url', 'video_url', 'tags', 'is_featured', 'is_published', 'view_count', 'user_id'
+    )},
+    'summary': _column('summary'),
+    'ingredients': lambda recipe, user_id: recipe.ingredients or [],
+    'instructions': lambda recipe, user_id: recipe.instructions or [],
+    'total_time': lambda recipe, user_id: recipe.get_total_time(),
+    'created_at': _column('created_at'),
+    'updated_at': _column('updated_at'),
+    'author': _author,
+    'average_rating': _average_rating,
+    'rating_count': _rating_count,
+    'is_favorited': lambda recipe, user_id: recipe.is_favorited_by(user_id) if user_id else False,
+}
+
+# Fields returned when none are requested (summary is card-only)
+DEFAULT_FIELDS = tuple(name for name in RECIPE_FIELDS if name != 'summary')
+
+# Columns a field needs when it isn't simply the column of the same name
+FIELD_COLUMNS = {
+    'summary': (),
+    'total_time': ('prep_time', 'cook_time'),
+    'author': ('user_id',),
+    'average_rating': (),
+    'rating_count': (),
+    'is_favorited': (),
+}
+
+# Lightweight projection for recipe cards (recipes.js / home.js)
+CARD_FIELDS = (
+    'id', 'title', 'summary', 'image_url', 'category', 'difficulty_level',
+    'dietary_preference', 'total_time', 'author', 'average_rating', 'rating_count',
+    'is_favorited'
+)
+
+RECIPE_VIEWS = {
+    'full': DEFAULT_FIELDS,
+    'card': CARD_FIELDS,
+}
@@ -0,0 +1,18 @@
+from extensions import db
+
+class UserRecommendation(db.Model):
+    """A recipe recommended to a user by the collaborative-filtering job, with its score"""
+    __tablename__ = 'user_recommendations'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+
+    # The read path walks one user's entries best first; deleting a recipe looks it up in reverse
+    __table_args__ = (
+        db.Index('ix_user_recommendations_user_score', 'user_id', 'score'),
+        db.Index('ix_user_recommendations_recipe', 'recipe_id'),
+    )
+
+    def __repr__(self):
+        return f'<UserRecommendation {self.user_id}->{self.recipe_id}:{self.score:.2f}>'
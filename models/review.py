@@ -17,7 +17,15 @@ class Review(db.Model):
     recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False)
     
     # Unique constraint to prevent multiple reviews from same user on same recipe
-    __table_args__ = (db.UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe_review'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe_review'),
+        db.Index('ix_reviews_recipe_created', 'recipe_id', 'created_at'),
+        db.Index('ix_reviews_created_at', 'created_at'),
+        # Partial index: only the handful of reported reviews are indexed
+        db.Index('ix_reviews_reported_created', 'created_at',
+                 postgresql_where=db.text('is_reported'),
+                 sqlite_where=db.text('is_reported = 1')),
+    )
     
     def to_dict(self):
         """Convert review object to dictionary"""
@@ -25,8 +33,8 @@ class Review(db.Model):
             'id': self.id,
             'rating': self.rating,
             'comment': self.comment,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'is_reported': self.is_reported,
             'report_reason': self.report_reason,
             'user_id': self.user_id,
@@ -0,0 +1,18 @@
+from extensions import db
+
+class RecipeNeighbor(db.Model):
+    """A recipe's precomputed content neighbor and their cosine similarity"""
+    __tablename__ = 'recipe_neighbors'
+
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True)
+    neighbor_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+
+    # The read path walks one recipe's entries best first; refreshes look neighbors up in reverse
+    __table_args__ = (
+        db.Index('ix_recipe_neighbors_recipe_score', 'recipe_id', 'score'),
+        db.Index('ix_recipe_neighbors_neighbor', 'neighbor_id'),
+    )
+
+    def __repr__(self):
+        return f'<RecipeNeighbor {self.recipe_id}->{self.neighbor_id}:{self.score:.2f}>'
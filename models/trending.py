@@ -0,0 +1,39 @@
+from datetime import datetime
+from extensions import db
+
+class TrendingEvent(db.Model):
+    """Buffered activity (views, favorites, reviews) not yet folded into the ranking"""
+    __tablename__ = 'trending_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipe_id = db.Column(db.Integer, nullable=False)  # no FK: the refresh drops events of deleted recipes
+    kind = db.Column(db.String(16), nullable=False, server_default='view')  # 'view', 'favorite' or 'review'
+    weight = db.Column(db.Float, nullable=False)  # summed event weights for one flush window
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<TrendingEvent {self.recipe_id}:{self.kind}:{self.weight}>'
+
+class RecipeTrending(db.Model):
+    """Materialized trending score per recipe, decayed to ``updated_at``"""
+    __tablename__ = 'recipe_trending'
+
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True)
+    score = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Read path walks this index in order and stops after one page
+    __table_args__ = (
+        db.Index('ix_recipe_trending_score', 'score', 'recipe_id'),
+    )
+
+    def to_dict(self):
+        """Convert trending row to dictionary"""
+        return {
+            'recipe_id': self.recipe_id,
+            'score': round(self.score, 3),
+            'updated_at': self.updated_at
+        }
+
+    def __repr__(self):
+        return f'<RecipeTrending {self.recipe_id}:{self.score:.2f}>'
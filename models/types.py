@@ -0,0 +1,38 @@
+import json
+from sqlalchemy.dialects.postgresql import JSONB
+from extensions import db
+
+
+def coerce_json_list(value):
+    """Turn a list, JSON string or plain multi-line text into a list"""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value) if value.strip() else []
+        except (json.JSONDecodeError, TypeError):
+            # Plain text from older clients: one item per line (same as edit-recipe.js)
+            return [line.strip() for line in value.splitlines() if line.strip()]
+        if isinstance(parsed, list):
+            return parsed
+        return [parsed] if isinstance(parsed, str) else []
+    return []
+
+
+class JSONList(db.TypeDecorator):
+    """JSON list column (JSONB on PostgreSQL), (de)serialized by the driver"""
+    impl = db.JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(db.JSON())
+
+    def process_bind_param(self, value, dialect):
+        return coerce_json_list(value)
+
+    def process_result_value(self, value, dialect):
+        return value if isinstance(value, list) else coerce_json_list(value)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from services.tracing import span
 from extensions import db
 
 class User(db.Model):
@@ -25,13 +26,21 @@ class User(db.Model):
     reviews = db.relationship('Review', backref='user', lazy=True, cascade='all, delete-orphan')
     favorites = db.relationship('Favorite', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    # Admin listings sort by signup date, optionally filtered by status
+    __table_args__ = (
+        db.Index('ix_users_created_at', 'created_at'),
+        db.Index('ix_users_active_created', 'is_active', 'created_at'),
+    )
+    
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        with span('password.hash'):
+            self.password_hash = generate_password_hash(password)
     
     def check_password(self, password):
         """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        with span('password.check'):
+            return check_password_hash(self.password_hash, password)
     
     def get_full_name(self):
         """Get user's full name"""
@@ -53,8 +62,8 @@ class User(db.Model):
             'role': self.role,
             'is_active': self.is_active,
             'is_verified': self.is_verified,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'created_at': self.created_at,
+            'last_login': self.last_login,
             'recipe_count': len(self.recipes)
         }
     
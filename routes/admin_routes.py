@@ -1,14 +1,42 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from models.recipe import Recipe
 from models.review import Review
-from extensions import db
+from models.trending import RecipeTrending
+from models.analytics import DailyMetric
+from extensions import db, auth_throttle, db_router, slow_queries, profiler
+from services.cache import TTLCache
+from services.rollups import METRICS
+from services.slow_queries import SORT_KEYS
+from services.profiling import PROFILE_FORMATS
 from datetime import datetime, timedelta
 from sqlalchemy import func
+import os
 
 admin_bp = Blueprint('admin', __name__)
 
+# Per-worker cache of the dashboard aggregates
+dashboard_cache = TTLCache(name='admin_dashboard')
+
+ANALYTICS_BUCKETS = ('day', 'week', 'month')
+ANALYTICS_MAX_DAYS = 5 * 366
+
+def bucket_start(day, bucket):
+    """First day of the day/week (Monday)/month bucket containing ``day``"""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+def next_bucket(day, bucket):
+    if bucket == 'week':
+        return day + timedelta(days=7)
+    if bucket == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
 def admin_required(f):
     """Decorator to require admin privileges"""
     from functools import wraps
@@ -24,89 +52,267 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def build_dashboard():
+    """Dashboard statistics in three queries: counters, recipe top lists, recent users"""
+    today = datetime.utcnow().date()
+    week_ago = today - timedelta(days=7)
+    month_ago = today - timedelta(days=30)
+    count = func.count()
+    
+    # One pass per table with conditional aggregation, all in a single statement
+    user_stats = db.select(
+        count.label('total'),
+        count.filter(User.is_active == True).label('active'),
+        count.filter(User.created_at >= week_ago).label('new_this_week'),
+        count.filter(User.created_at >= month_ago).label('new_this_month')
+    ).subquery()
+    recipe_stats = db.select(
+        count.label('total'),
+        count.filter(Recipe.is_published == True).label('published'),
+        count.filter(Recipe.is_published == False).label('drafts'),
+        count.filter(Recipe.created_at >= week_ago).label('new_this_week'),
+        count.filter(Recipe.created_at >= month_ago).label('new_this_month')
+    ).subquery()
+    review_stats = db.select(
+        count.label('total'),
+        count.filter(Review.is_reported == True).label('reported'),
+        count.filter(Review.created_at >= week_ago).label('new_this_week')
+    ).subquery()
+    counters = db.session.execute(
+        db.select(user_stats, recipe_stats, review_stats).select_from(
+            user_stats.join(recipe_stats, db.true()).join(review_stats, db.true())
+        )
+    ).one()
+    
+    # Top 5 by views and top 5 trending, with author names joined in
+    def top_recipes(label, *order_by, join=None):
+        query = db.select(
+            Recipe.id, Recipe.title, Recipe.view_count, Recipe.created_at,
+            User.username.label('author'), db.literal(label).label('list')
+        ).join(User, User.id == Recipe.user_id).where(Recipe.is_published == True)
+        if join is not None:
+            query = query.join(join, join.recipe_id == Recipe.id)
+        return query.order_by(*order_by).limit(5).subquery().select()
+    
+    top_rows = db.session.execute(db.union_all(
+        top_recipes('popular', Recipe.view_count.desc()),
+        top_recipes('trending', RecipeTrending.score.desc(), RecipeTrending.recipe_id.desc(),
+                    join=RecipeTrending)
+    )).all()
+    top_lists = {'popular': [], 'trending': []}
+    for row in top_rows:
+        top_lists[row.list].append({
+            'id': row.id,
+            'title': row.title,
+            'view_count': row.view_count,
+            'author': row.author,
+            'created_at': row.created_at
+        })
+    
+    # Recent users
+    recent_users = db.session.execute(
+        db.select(User.id, User.username, User.email, User.created_at, User.is_active)
+        .order_by(User.created_at.desc())
+        .limit(5)
+    ).all()
+    recent_users_data = [
+        {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'created_at': user.created_at,
+            'is_active': user.is_active
+        }
+        for user in recent_users
+    ]
+    
+    # Column order follows the three subqueries above
+    (users_total, users_active, users_week, users_month,
+     recipes_total, recipes_published, recipes_drafts, recipes_week, recipes_month,
+     reviews_total, reviews_reported, reviews_week) = counters
+    
+    return {
+        'users': {
+            'total': users_total,
+            'active': users_active,
+            'new_this_week': users_week,
+            'new_this_month': users_month
+        },
+        'recipes': {
+            'total': recipes_total,
+            'published': recipes_published,
+            'drafts': recipes_drafts,
+            'new_this_week': recipes_week,
+            'new_this_month': recipes_month
+        },
+        'reviews': {
+            'total': reviews_total,
+            'reported': reviews_reported,
+            'new_this_week': reviews_week
+        },
+        'popular_recipes': top_lists['popular'],
+        'trending_recipes': top_lists['trending'],
+        'recent_users': recent_users_data,
+        'generated_at': datetime.utcnow()
+    }
+
 @admin_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
 @admin_required
 def get_admin_dashboard():
-    """Get admin dashboard statistics"""
+    """Get admin dashboard statistics (cached for ADMIN_DASHBOARD_CACHE_TTL seconds)"""
     try:
-        # Get current date ranges
-        today = datetime.utcnow().date()
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
-        
-        # User statistics
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        new_users_this_week = User.query.filter(User.created_at >= week_ago).count()
-        new_users_this_month = User.query.filter(User.created_at >= month_ago).count()
-        
-        # Recipe statistics
-        total_recipes = Recipe.query.count()
-        published_recipes = Recipe.query.filter_by(is_published=True).count()
-        draft_recipes = Recipe.query.filter_by(is_published=False).count()
-        new_recipes_this_week = Recipe.query.filter(Recipe.created_at >= week_ago).count()
-        new_recipes_this_month = Recipe.query.filter(Recipe.created_at >= month_ago).count()
-        
-        # Review statistics
-        total_reviews = Review.query.count()
-        reported_reviews = Review.query.filter_by(is_reported=True).count()
-        new_reviews_this_week = Review.query.filter(Review.created_at >= week_ago).count()
-        
-        # Popular recipes (top 5 by views)
-        popular_recipes = Recipe.query.filter_by(is_published=True)\
-            .order_by(Recipe.view_count.desc())\
-            .limit(5).all()
-        
-        popular_recipes_data = [
-            {
-                'id': recipe.id,
-                'title': recipe.title,
-                'view_count': recipe.view_count,
-                'author': recipe.author.username,
-                'created_at': recipe.created_at.isoformat()
-            }
-            for recipe in popular_recipes
-        ]
-        
-        # Recent users
-        recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-        recent_users_data = [
-            {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'created_at': user.created_at.isoformat(),
-                'is_active': user.is_active
-            }
-            for user in recent_users
-        ]
+        if request.args.get('refresh', '').lower() == 'true':
+            dashboard_cache.delete('dashboard')
+        
+        dashboard = dashboard_cache.get_or_set(
+            'dashboard', build_dashboard, ttl=current_app.config.get('ADMIN_DASHBOARD_CACHE_TTL', 30)
+        )
+        return jsonify(dashboard), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get admin dashboard', 'details': str(e)}), 500
+
+@admin_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_analytics():
+    """Get a time series of one metric from the daily rollups"""
+    try:
+        metric = request.args.get('metric', 'signups').strip()
+        bucket = request.args.get('bucket', 'day').strip()
+        
+        if metric not in METRICS:
+            return jsonify({'error': f"Unknown metric. Use one of: {', '.join(METRICS)}"}), 400
+        if bucket not in ANALYTICS_BUCKETS:
+            return jsonify({'error': f"Unknown bucket. Use one of: {', '.join(ANALYTICS_BUCKETS)}"}), 400
+        
+        try:
+            end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() \
+                if request.args.get('to') else datetime.utcnow().date()
+            start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() \
+                if request.args.get('from') else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+        
+        if start > end:
+            return jsonify({'error': '"from" must not be after "to"'}), 400
+        if (end - start).days >= ANALYTICS_MAX_DAYS:
+            return jsonify({'error': f'Range is limited to {ANALYTICS_MAX_DAYS} days'}), 400
+        
+        # Primary key (metric, day) range read; days without activity have no row
+        rows = db.session.execute(
+            db.select(DailyMetric.day, DailyMetric.value, DailyMetric.updated_at)
+            .where(DailyMetric.metric == metric, DailyMetric.day.between(start, end))
+        ).all()
+        
+        totals = {}
+        for row in rows:
+            key = bucket_start(row.day, bucket)
+            totals[key] = totals.get(key, 0) + row.value
+        
+        series = []
+        day = bucket_start(start, bucket)
+        while day <= end:
+            series.append({'date': day, 'value': totals.get(day, 0)})
+            day = next_bucket(day, bucket)
+        
+        last_rollup = max((row.updated_at for row in rows if row.updated_at), default=None)
         
         return jsonify({
-            'users': {
-                'total': total_users,
-                'active': active_users,
-                'new_this_week': new_users_this_week,
-                'new_this_month': new_users_this_month
-            },
-            'recipes': {
-                'total': total_recipes,
-                'published': published_recipes,
-                'drafts': draft_recipes,
-                'new_this_week': new_recipes_this_week,
-                'new_this_month': new_recipes_this_month
-            },
-            'reviews': {
-                'total': total_reviews,
-                'reported': reported_reviews,
-                'new_this_week': new_reviews_this_week
-            },
-            'popular_recipes': popular_recipes_data,
-            'recent_users': recent_users_data
+            'metric': metric,
+            'bucket': bucket,
+            'from': start,
+            'to': end,
+            'total': sum(row.value for row in rows),
+            'series': series,
+            'last_rollup': last_rollup
         }), 200
         
     except Exception as e:
-        return jsonify({'error': 'Failed to get admin dashboard', 'details': str(e)}), 500
+        return jsonify({'error': 'Failed to get analytics', 'details': str(e)}), 500
+
+@admin_bp.route('/auth-throttle', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_auth_throttle_stats():
+    """Get login/registration throttling counters"""
+    try:
+        return jsonify({'auth_throttle': auth_throttle.stats()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get throttle stats', 'details': str(e)}), 500
+
+@admin_bp.route('/db-replica', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_replica_status():
+    """Get read-replica routing status"""
+    try:
+        return jsonify({'replica': db_router.status()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get replica status', 'details': str(e)}), 500
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_slow_queries():
+    """Get the slowest statement shapes seen by this worker, with their plans"""
+    try:
+        sort = request.args.get('sort', 'total').strip()
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        
+        if sort not in SORT_KEYS:
+            return jsonify({'error': f"Unknown sort. Use one of: {', '.join(SORT_KEYS)}"}), 400
+        
+        return jsonify({
+            'worker_pid': os.getpid(),
+            'threshold_ms': current_app.config.get('SLOW_QUERY_THRESHOLD_MS'),
+            'slow_queries': slow_queries.stats(limit=limit, sort=sort)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get slow queries', 'details': str(e)}), 500
+
+@admin_bp.route('/profiles', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_profiles():
+    """List captured request profiles, newest first"""
+    try:
+        return jsonify({
+            'profiles': profiler.list_profiles(),
+            'formats': list(PROFILE_FORMATS)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to list profiles', 'details': str(e)}), 500
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+@admin_required
+def download_profile(profile_id):
+    """Download a profile as collapsed stacks or speedscope JSON"""
+    try:
+        fmt = request.args.get('format', 'speedscope').strip()
+        
+        if fmt not in PROFILE_FORMATS:
+            return jsonify({'error': f"Unknown format. Use one of: {', '.join(PROFILE_FORMATS)}"}), 400
+        
+        try:
+            path = profiler.path(profile_id, fmt)
+        except ValueError:
+            return jsonify({'error': 'Profile not found'}), 404
+        if not os.path.exists(path):
+            return jsonify({'error': 'Profile not found'}), 404
+        
+        mimetype = 'application/json' if fmt == 'speedscope' else 'text/plain'
+        return send_file(path, mimetype=mimetype, as_attachment=True,
+                         download_name=os.path.basename(path))
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to download profile', 'details': str(e)}), 500
 
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
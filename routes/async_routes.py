@@ -0,0 +1,409 @@
+"""
+Async API handlers for the ASGI entry point (``asgi.py``).
+
+The read endpoints of /api/recipes, /api/user and /api/auth run here on
+the async engine, so a request waiting on the database yields the event
+loop instead of holding a worker. Responses match the Flask routes: the
+same query helpers and ``to_dict`` methods are used, with every
+relationship they touch eager-loaded because an AsyncSession can't lazy
+load. Writes, uploads, login/registration, admin and pages fall through
+to the Flask app mounted after these routes.
+"""
+
+from functools import wraps
+from math import ceil
+
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import NoAuthorizationError
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import load_only, selectinload
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_accept_header
+
+from extensions import trending
+from models.recipe import Recipe, DEFAULT_FIELDS
+from models.review import Review
+from models.favorite import Favorite
+from models.user import User
+from routes.recipe_routes import parse_recipe_fields, recipe_list_query
+
+
+def json_response(request, payload, status=200):
+    """JSON response with the Flask app's encoder, compression and security headers"""
+    flask_app = request.app.state.flask_app
+    body = flask_app.json.dumps(payload).encode()
+    headers = dict(flask_app.config.get('SECURITY_HEADERS') or {})
+
+    compressor = flask_app.extensions.get('compressor')
+    if compressor is not None and compressor.enabled:
+        headers['Vary'] = 'Accept-Encoding'
+        body, encoding = compressor.compress_body(
+            body, parse_accept_header(request.headers.get('accept-encoding')))
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+    return Response(body, status, headers=headers, media_type='application/json')
+
+
+def token_identity(request):
+    """User id of the request's Bearer token; raises like flask_jwt_extended"""
+    header = request.headers.get('authorization', '')
+    if not header.startswith('Bearer '):
+        raise NoAuthorizationError('Missing Authorization Header')
+    with request.app.state.flask_app.app_context():
+        return int(decode_token(header[len('Bearer '):])['sub'])
+
+
+def jwt_required(optional=False):
+    """Set ``request.state.user_id`` from the token (None if optional and absent/invalid)"""
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(request):
+            try:
+                request.state.user_id = token_identity(request)
+            except NoAuthorizationError as e:
+                if not optional:
+                    return json_response(request, {'msg': str(e)}, 401)
+                request.state.user_id = None
+            except Exception as e:
+                if not optional:
+                    return json_response(request, {'msg': str(e)}, 422)
+                request.state.user_id = None
+            return await handler(request)
+        return wrapper
+    return decorator
+
+
+def int_arg(params, name, default):
+    """Integer query parameter, ``default`` when missing or malformed"""
+    try:
+        return int(params.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+async def paginate(session, query, page, per_page):
+    """``(items, pagination dict)`` matching Flask-SQLAlchemy's paginate(error_out=False)"""
+    offset_page = max(page, 1)
+    limit = per_page if per_page > 0 else 20
+    items = (await session.scalars(query.limit(limit).offset((offset_page - 1) * limit))).all()
+    total = await session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    pages = ceil(total / limit) if total else 0
+    return items, {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_next': offset_page < pages,
+        'has_prev': offset_page > 1
+    }
+
+
+async def favorited_ids(session, user_id, recipes):
+    """Ids of ``recipes`` the user has favorited, in one query"""
+    if not user_id or not recipes:
+        return set()
+    result = await session.scalars(select(Favorite.recipe_id).where(
+        Favorite.user_id == user_id, Favorite.recipe_id.in_([recipe.id for recipe in recipes])))
+    return set(result)
+
+
+def serialize_recipes(recipes, fields=None, favorited=()):
+    """Recipe dicts; is_favorited comes from ``favorited`` instead of a query per recipe"""
+    result = []
+    for recipe in recipes:
+        data = recipe.to_dict(fields=fields)
+        if 'is_favorited' in data:
+            data['is_favorited'] = recipe.id in favorited
+        result.append(data)
+    return result
+
+
+def user_options():
+    """Eager loads for User.to_dict (recipe_count)"""
+    return [selectinload(User.recipes).load_only(Recipe.id)]
+
+
+@jwt_required(optional=True)
+async def get_recipes(request):
+    """Get all recipes with optional filtering and pagination"""
+    try:
+        params = request.query_params
+        page = int_arg(params, 'page', 1)
+        per_page = min(int_arg(params, 'per_page', 12), 50)
+
+        try:
+            fields = parse_recipe_fields(params)
+        except ValueError as e:
+            return json_response(request, {'error': str(e)}, 400)
+
+        query = recipe_list_query(params).options(*Recipe.load_options(fields or DEFAULT_FIELDS))
+        user_id = request.state.user_id
+
+        async with request.app.state.async_session() as session:
+            recipes, pagination = await paginate(session, query, page, per_page)
+            favorited = await favorited_ids(session, user_id, recipes)
+
+        return json_response(request, {
+            'recipes': serialize_recipes(recipes, fields, favorited),
+            'pagination': pagination
+        })
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get recipes', 'details': str(e)}, 500)
+
+
+@jwt_required(optional=True)
+async def get_recipe(request):
+    """Get a specific recipe by ID"""
+    try:
+        recipe_id = request.path_params['recipe_id']
+        user_id = request.state.user_id
+
+        async with request.app.state.async_session() as session:
+            # Increment view count (in SQL, like Recipe.increment_view_count)
+            result = await session.execute(
+                update(Recipe)
+                .where(Recipe.id == recipe_id, Recipe.is_published == True)
+                .values(view_count=func.coalesce(Recipe.view_count, 0) + 1)
+                .execution_options(synchronize_session=False)
+            )
+            if not result.rowcount:
+                return json_response(request, {'error': 'Recipe not found'}, 404)
+            await session.commit()
+            trending.record(recipe_id, 'view')
+
+            recipe = await session.scalar(
+                select(Recipe).where(Recipe.id == recipe_id).options(*Recipe.load_options(DEFAULT_FIELDS)))
+            favorited = await favorited_ids(session, user_id, [recipe])
+
+        return json_response(request, {'recipe': serialize_recipes([recipe], favorited=favorited)[0]})
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get recipe', 'details': str(e)}, 500)
+
+
+async def get_recipe_reviews(request):
+    """Get reviews for a specific recipe"""
+    try:
+        recipe_id = request.path_params['recipe_id']
+        page = int_arg(request.query_params, 'page', 1)
+        per_page = min(int_arg(request.query_params, 'per_page', 10), 50)
+
+        async with request.app.state.async_session() as session:
+            if await session.get(Recipe, recipe_id) is None:
+                return json_response(request, {'error': 'Recipe not found'}, 404)
+
+            query = select(Review).filter_by(recipe_id=recipe_id)\
+                .order_by(Review.created_at.desc())\
+                .options(selectinload(Review.user).load_only(User.id, User.username, User.profile_image))
+            reviews, pagination = await paginate(session, query, page, per_page)
+
+        return json_response(request, {
+            'reviews': [review.to_dict() for review in reviews],
+            'pagination': pagination
+        })
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get reviews', 'details': str(e)}, 500)
+
+
+@jwt_required()
+async def get_user_favorites(request):
+    """Get user's favorite recipes"""
+    try:
+        user_id = request.state.user_id
+        page = int_arg(request.query_params, 'page', 1)
+        per_page = min(int_arg(request.query_params, 'per_page', 12), 50)
+
+        async with request.app.state.async_session() as session:
+            if await session.get(User, user_id) is None:
+                return json_response(request, {'error': 'User not found'}, 404)
+
+            query = select(Favorite).filter_by(user_id=user_id)\
+                .join(Recipe)\
+                .filter(Recipe.is_published == True)\
+                .order_by(Favorite.created_at.desc())\
+                .options(selectinload(Favorite.recipe).options(*Recipe.load_options(DEFAULT_FIELDS)))
+            favorites, pagination = await paginate(session, query, page, per_page)
+
+        return json_response(request, {
+            'favorites': [favorite.to_dict() for favorite in favorites],
+            'pagination': pagination
+        })
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get favorites', 'details': str(e)}, 500)
+
+
+@jwt_required()
+async def get_user_recipes(request):
+    """Get user's own recipes"""
+    try:
+        user_id = request.state.user_id
+        page = int_arg(request.query_params, 'page', 1)
+        per_page = min(int_arg(request.query_params, 'per_page', 12), 50)
+        status = request.query_params.get('status', 'all')  # 'all', 'published', 'draft'
+
+        async with request.app.state.async_session() as session:
+            if await session.get(User, user_id) is None:
+                return json_response(request, {'error': 'User not found'}, 404)
+
+            query = select(Recipe).filter_by(user_id=user_id)
+            if status == 'published':
+                query = query.filter_by(is_published=True)
+            elif status == 'draft':
+                query = query.filter_by(is_published=False)
+            query = query.order_by(Recipe.created_at.desc()).options(*Recipe.load_options(DEFAULT_FIELDS))
+
+            recipes, pagination = await paginate(session, query, page, per_page)
+            favorited = await favorited_ids(session, user_id, recipes)
+
+        return json_response(request, {
+            'recipes': serialize_recipes(recipes, favorited=favorited),
+            'pagination': pagination
+        })
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get user recipes', 'details': str(e)}, 500)
+
+
+@jwt_required()
+async def get_user_dashboard(request):
+    """Get user dashboard data"""
+    try:
+        user_id = request.state.user_id
+
+        async with request.app.state.async_session() as session:
+            if await session.get(User, user_id) is None:
+                return json_response(request, {'error': 'User not found'}, 404)
+
+            # Recipe counts and views in one pass over the user's recipes
+            stats = (await session.execute(
+                select(
+                    func.count(),
+                    func.count().filter(Recipe.is_published == True),
+                    func.count().filter(Recipe.is_published == False),
+                    func.coalesce(func.sum(Recipe.view_count), 0)
+                ).where(Recipe.user_id == user_id)
+            )).one()
+            total_favorites = await session.scalar(
+                select(func.count()).select_from(Favorite).where(Favorite.user_id == user_id))
+
+            recent_recipes = (await session.scalars(
+                select(Recipe).filter_by(user_id=user_id)
+                .order_by(Recipe.created_at.desc())
+                .limit(5)
+                .options(*Recipe.load_options(DEFAULT_FIELDS))
+            )).all()
+            favorited = await favorited_ids(session, user_id, recent_recipes)
+
+        return json_response(request, {
+            'stats': {
+                'total_recipes': stats[0],
+                'published_recipes': stats[1],
+                'draft_recipes': stats[2],
+                'total_favorites': total_favorites,
+                'total_views': stats[3]
+            },
+            'recent_recipes': serialize_recipes(recent_recipes, favorited=favorited)
+        })
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get dashboard data', 'details': str(e)}, 500)
+
+
+async def get_public_profile(request):
+    """Get public profile of a user"""
+    try:
+        username = request.path_params['username']
+        page = int_arg(request.query_params, 'page', 1)
+        per_page = min(int_arg(request.query_params, 'per_page', 12), 50)
+
+        async with request.app.state.async_session() as session:
+            user = await session.scalar(select(User).filter_by(username=username))
+            if not user or not user.is_active:
+                return json_response(request, {'error': 'User not found'}, 404)
+
+            query = select(Recipe).filter_by(user_id=user.id, is_published=True)\
+                .order_by(Recipe.created_at.desc())\
+                .options(*Recipe.load_options(DEFAULT_FIELDS))
+            recipes, pagination = await paginate(session, query, page, per_page)
+
+            recipe_count, total_views = (await session.execute(
+                select(func.count(), func.coalesce(func.sum(Recipe.view_count), 0))
+                .where(Recipe.user_id == user.id)
+            )).one()
+
+        # Public profile data
+        profile_data = {
+            'id': user.id,
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'bio': user.bio,
+            'profile_image': user.profile_image,
+            'created_at': user.created_at,
+            'recipe_count': recipe_count,
+            'total_views': total_views
+        }
+
+        return json_response(request, {
+            'user': profile_data,
+            'recipes': serialize_recipes(recipes),
+            'pagination': pagination
+        })
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get user profile', 'details': str(e)}, 500)
+
+
+@jwt_required()
+async def get_profile(request):
+    """Get current user profile"""
+    try:
+        async with request.app.state.async_session() as session:
+            user = await session.get(User, request.state.user_id, options=user_options())
+
+        if not user:
+            return json_response(request, {'error': 'User not found'}, 404)
+
+        return json_response(request, {'user': user.to_dict()})
+
+    except Exception as e:
+        return json_response(request, {'error': 'Failed to get profile', 'details': str(e)}, 500)
+
+
+@jwt_required()
+async def verify_token(request):
+    """Verify if token is valid"""
+    try:
+        async with request.app.state.async_session() as session:
+            user = await session.get(User, request.state.user_id, options=user_options())
+
+        if not user or not user.is_active:
+            return json_response(request, {'error': 'Invalid token'}, 401)
+
+        return json_response(request, {
+            'valid': True,
+            'user': user.to_dict()
+        })
+
+    except Exception as e:
+        return json_response(request, {'error': 'Token verification failed', 'details': str(e)}, 401)
+
+
+# Matched before the mounted Flask app; other methods on these paths fall through to it
+async_routes = [
+    Route('/api/recipes', get_recipes, methods=['GET']),
+    Route('/api/recipes/', get_recipes, methods=['GET']),
+    Route('/api/recipes/{recipe_id:int}', get_recipe, methods=['GET']),
+    Route('/api/recipes/{recipe_id:int}/reviews', get_recipe_reviews, methods=['GET']),
+    Route('/api/user/favorites', get_user_favorites, methods=['GET']),
+    Route('/api/user/recipes', get_user_recipes, methods=['GET']),
+    Route('/api/user/dashboard', get_user_dashboard, methods=['GET']),
+    Route('/api/user/profile/{username}', get_public_profile, methods=['GET']),
+    Route('/api/auth/profile', get_profile, methods=['GET']),
+    Route('/api/auth/verify-token', verify_token, methods=['GET']),
+]
@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
-from email_validator import validate_email, EmailNotValidError
 from models.user import User
-from extensions import db
+from extensions import db, auth_throttle, email_checker
+from services.rate_limit import throttled_response
+from services.email_checks import normalize_email
+from services.db_routing import use_primary
 import re
 from datetime import datetime
 
@@ -35,21 +37,15 @@ def register():
         email = data['email'].strip().lower()
         password = data['password']
         
-        # Validate email format
-        try:
-            # Try with email-validator first
-            validated_email = validate_email(email)
-            email = validated_email.email  # Use normalized email
-        except EmailNotValidError:
-            # Fallback to regex validation
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, email):
-                return jsonify({'error': 'Invalid email format'}), 400
-        except Exception:
-            # If email-validator fails for any reason, use regex
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, email):
-                return jsonify({'error': 'Invalid email format'}), 400
+        # Throttle before any validation or hashing work
+        retry_after = auth_throttle.hit('register', account=email)
+        if retry_after:
+            return throttled_response(retry_after)
+        
+        # Validate email format (offline, deliverability is checked after signup)
+        email = normalize_email(email)
+        if not email:
+            return jsonify({'error': 'Invalid email format'}), 400
         
         # Validate username
         if len(username) < 3 or len(username) > 80:
@@ -83,6 +79,9 @@ def register():
         db.session.add(user)
         db.session.commit()
         
+        # Verify the email domain in the background
+        email_checker.schedule(user.id, user.email)
+        
         # Create access token
         access_token = create_access_token(identity=str(user.id))
         
@@ -109,8 +108,13 @@ def login():
         email = data['email'].strip().lower()
         password = data['password']
         
-        # Find user by email
-        user = User.query.filter_by(email=email).first()
+        # Throttle before the password hash is checked
+        retry_after = auth_throttle.hit('login', account=email)
+        if retry_after:
+            return throttled_response(retry_after)
+        
+        # Find user by email, normalized as registration stored it
+        user = User.query.filter_by(email=normalize_email(email) or email).first()
         
         if not user or not user.check_password(password):
             return jsonify({'error': 'Invalid email or password'}), 401
@@ -136,6 +140,7 @@ def login():
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@use_primary
 def get_profile():
     """Get current user profile"""
     try:
@@ -174,22 +179,24 @@ def update_profile():
             user.bio = data['bio'].strip()
         
         # Validate and update email if provided
+        email_changed = False
         if 'email' in data:
-            new_email = data['email'].strip().lower()
+            new_email = normalize_email(data['email'].strip().lower())
+            if not new_email:
+                return jsonify({'error': 'Invalid email format'}), 400
             if new_email != user.email:
-                try:
-                    validate_email(new_email)
-                except EmailNotValidError:
-                    return jsonify({'error': 'Invalid email format'}), 400
-                
                 # Check if email is already taken
                 if User.query.filter_by(email=new_email).first():
                     return jsonify({'error': 'Email already registered'}), 400
                 
                 user.email = new_email
+                email_changed = True
         
         db.session.commit()
         
+        if email_changed:
+            email_checker.schedule(user.id, user.email)
+        
         return jsonify({
             'message': 'Profile updated successfully',
             'user': user.to_dict()
@@ -240,6 +247,7 @@ def change_password():
 
 @auth_bp.route('/verify-token', methods=['GET'])
 @jwt_required()
+@use_primary
 def verify_token():
     """Verify if token is valid"""
     try:
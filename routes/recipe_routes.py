@@ -1,15 +1,20 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
-from models.recipe import Recipe
+from models.recipe import Recipe, RECIPE_FIELDS, RECIPE_VIEWS, CARD_FIELDS
 from models.review import Review
 from models.favorite import Favorite
+from models.trending import RecipeTrending
+from models.similar import RecipeNeighbor
 from models.user import User
-from extensions import db
+from models.types import coerce_json_list
+from extensions import db, trending, similar_recipes
+from services.sqlite_tuning import run_with_retry
+from services.metrics import IMAGE_PROCESSING
+from services.tracing import span
 import os
 import json
 from datetime import datetime
-from PIL import Image
 import uuid
 
 recipe_bp = Blueprint('recipe', __name__)
@@ -23,27 +28,115 @@ def allowed_file(filename):
 
 def process_image(file, upload_folder):
     """Process and save uploaded image"""
+    from PIL import Image  # Pillow is only needed for uploads; keep it out of startup
+    
     if file and allowed_file(file.filename):
         # Generate unique filename
         filename = str(uuid.uuid4()) + '.' + file.filename.rsplit('.', 1)[1].lower()
         filepath = os.path.join(upload_folder, filename)
         
-        # Open and resize image
-        image = Image.open(file)
-        
-        # Convert to RGB if necessary
-        if image.mode in ('RGBA', 'LA', 'P'):
-            image = image.convert('RGB')
-        
-        # Resize image while maintaining aspect ratio
-        image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
-        
-        # Save processed image
-        image.save(filepath, 'JPEG', quality=85, optimize=True)
+        with IMAGE_PROCESSING.time(), span('process_image') as image_span:
+            # Open and resize image
+            image = Image.open(file)
+            if image_span:
+                image_span.attributes.update({'image.format': image.format, 'image.mode': image.mode,
+                                              'image.width': image.width, 'image.height': image.height})
+            
+            # Convert to RGB if necessary
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGB')
+            
+            # Resize image while maintaining aspect ratio
+            image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+            
+            # Save processed image
+            image.save(filepath, 'JPEG', quality=85, optimize=True)
         
         return filename
     return None
 
+def parse_recipe_fields(args=None):
+    """
+    Fields requested with ?fields=a,b or ?view=card|full.
+
+    Returns None for the full representation; raises ValueError for an
+    unknown field or view.
+    """
+    args = request.args if args is None else args
+    fields = args.get('fields', '').strip()
+    view = args.get('view', 'full').strip()
+    
+    if fields:
+        names = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = [name for name in names if name not in RECIPE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return tuple(dict.fromkeys(['id'] + names))
+    
+    if view not in RECIPE_VIEWS:
+        raise ValueError(f"Unknown view: {view}")
+    return None if view == 'full' else RECIPE_VIEWS[view]
+
+def recipe_list_query(args):
+    """Select statement for published recipes filtered and sorted by the list query parameters"""
+    search = args.get('search', '').strip()
+    category = args.get('category', '').strip()
+    cuisine_type = args.get('cuisine_type', '').strip()
+    dietary_preference = args.get('dietary_preference', '').strip()
+    difficulty_level = args.get('difficulty_level', '').strip()
+    sort_by = args.get('sort_by', 'created_at').strip()
+    sort_order = args.get('sort_order', 'desc').strip()
+    
+    query = db.select(Recipe).filter_by(is_published=True)
+    
+    # Apply filters
+    if search:
+        query = query.filter(
+            db.or_(
+                Recipe.title.ilike(f'%{search}%'),
+                Recipe.description.ilike(f'%{search}%'),
+                db.cast(Recipe.ingredients, db.Text).ilike(f'%{search}%')
+            )
+        )
+    
+    if category:
+        query = query.filter_by(category=category)
+    
+    if cuisine_type:
+        query = query.filter_by(cuisine_type=cuisine_type)
+    
+    if dietary_preference:
+        query = query.filter_by(dietary_preference=dietary_preference)
+    
+    if difficulty_level:
+        query = query.filter_by(difficulty_level=difficulty_level)
+    
+    # Apply sorting
+    if sort_by == 'trending':
+        # Only recipes with recent activity; the ranking index yields one page in order
+        query = query.join(RecipeTrending, RecipeTrending.recipe_id == Recipe.id)\
+            .order_by(RecipeTrending.score.desc(), RecipeTrending.recipe_id.desc())
+    elif sort_by == 'rating':
+        # Sort by average rating (this would need a subquery in real implementation)
+        query = query.order_by(Recipe.created_at.desc())
+    elif sort_by == 'view_count':
+        if sort_order == 'asc':
+            query = query.order_by(Recipe.view_count.asc())
+        else:
+            query = query.order_by(Recipe.view_count.desc())
+    elif sort_by == 'title':
+        if sort_order == 'asc':
+            query = query.order_by(Recipe.title.asc())
+        else:
+            query = query.order_by(Recipe.title.desc())
+    else:  # Default: created_at
+        if sort_order == 'asc':
+            query = query.order_by(Recipe.created_at.asc())
+        else:
+            query = query.order_by(Recipe.created_at.desc())
+    
+    return query
+
 @recipe_bp.route('/', methods=['GET'])
 def get_recipes():
     """Get all recipes with optional filtering and pagination"""
@@ -51,58 +144,17 @@ def get_recipes():
         # Get query parameters
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 12, type=int), 50)  # Max 50 per page
-        search = request.args.get('search', '').strip()
-        category = request.args.get('category', '').strip()
-        cuisine_type = request.args.get('cuisine_type', '').strip()
-        dietary_preference = request.args.get('dietary_preference', '').strip()
-        difficulty_level = request.args.get('difficulty_level', '').strip()
-        sort_by = request.args.get('sort_by', 'created_at').strip()
-        sort_order = request.args.get('sort_order', 'desc').strip()
         
-        # Build query
-        query = Recipe.query.filter_by(is_published=True)
-        
-        # Apply filters
-        if search:
-            query = query.filter(
-                db.or_(
-                    Recipe.title.ilike(f'%{search}%'),
-                    Recipe.description.ilike(f'%{search}%'),
-                    Recipe.ingredients.ilike(f'%{search}%')
-                )
-            )
-        
-        if category:
-            query = query.filter_by(category=category)
-        
-        if cuisine_type:
-            query = query.filter_by(cuisine_type=cuisine_type)
-        
-        if dietary_preference:
-            query = query.filter_by(dietary_preference=dietary_preference)
-        
-        if difficulty_level:
-            query = query.filter_by(difficulty_level=difficulty_level)
+        try:
+            fields = parse_recipe_fields()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Apply sorting
-        if sort_by == 'rating':
-            # Sort by average rating (this would need a subquery in real implementation)
-            query = query.order_by(Recipe.created_at.desc())
-        elif sort_by == 'view_count':
-            if sort_order == 'asc':
-                query = query.order_by(Recipe.view_count.asc())
-            else:
-                query = query.order_by(Recipe.view_count.desc())
-        elif sort_by == 'title':
-            if sort_order == 'asc':
-                query = query.order_by(Recipe.title.asc())
-            else:
-                query = query.order_by(Recipe.title.desc())
-        else:  # Default: created_at
-            if sort_order == 'asc':
-                query = query.order_by(Recipe.created_at.asc())
-            else:
-                query = query.order_by(Recipe.created_at.desc())
+        # Build query
+        query = recipe_list_query(request.args)
+        if fields:
+            # Sparse fieldset: skip the large text columns nobody asked for
+            query = query.options(*Recipe.load_options(fields))
         
         # Get current user for favorites
         current_user_id = None
@@ -114,11 +166,12 @@ def get_recipes():
             pass
         
         # Paginate results
-        recipes_pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        recipes_pagination = db.paginate(
+            query, page=page, per_page=per_page, error_out=False
         )
         
-        recipes = [recipe.to_dict(current_user_id) for recipe in recipes_pagination.items]
+        with span('serialize', count=len(recipes_pagination.items)):
+            recipes = [recipe.to_dict(current_user_id, fields=fields) for recipe in recipes_pagination.items]
         
         return jsonify({
             'recipes': recipes,
@@ -146,6 +199,7 @@ def get_recipe(recipe_id):
         
         # Increment view count
         recipe.increment_view_count()
+        trending.record(recipe.id, 'view')
         
         # Get current user for favorites
         current_user_id = None
@@ -156,7 +210,9 @@ def get_recipe(recipe_id):
         except:
             pass
         
-        return jsonify({'recipe': recipe.to_dict(current_user_id)}), 200
+        with span('serialize'):
+            recipe_data = recipe.to_dict(current_user_id)
+        return jsonify({'recipe': recipe_data}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to get recipe', 'details': str(e)}), 500
@@ -173,7 +229,8 @@ def create_recipe():
             return jsonify({'error': 'User not found'}), 404
         
         # Get form data
-        data = request.form.to_dict()
+        with span('parse_form'):
+            data = request.form.to_dict()
         
         # Validate required fields
         required_fields = ['title', 'description', 'ingredients', 'instructions', 'category']
@@ -192,8 +249,9 @@ def create_recipe():
         
         # Parse JSON strings for ingredients and instructions
         try:
-            ingredients = json.loads(data['ingredients']) if data.get('ingredients') else []
-            instructions = json.loads(data['instructions']) if data.get('instructions') else []
+            with span('parse_json'):
+                ingredients = json.loads(data['ingredients']) if data.get('ingredients') else []
+                instructions = json.loads(data['instructions']) if data.get('instructions') else []
         except (json.JSONDecodeError, TypeError):
             return jsonify({'error': 'Invalid ingredients or instructions format'}), 400
         
@@ -201,8 +259,8 @@ def create_recipe():
         recipe = Recipe(
             title=data['title'].strip(),
             description=data['description'].strip(),
-            ingredients=json.dumps(ingredients),  # Store as JSON string
-            instructions=json.dumps(instructions),  # Store as JSON string
+            ingredients=ingredients,
+            instructions=instructions,
             category=data['category'].strip(),
             cuisine_type=data.get('cuisine_type', '').strip(),
             dietary_preference=data.get('dietary_preference', '').strip(),
@@ -226,11 +284,15 @@ def create_recipe():
             recipe.total_time = recipe.cook_time
         
         db.session.add(recipe)
-        db.session.commit()
+        with span('db.commit'):
+            db.session.commit()
         
+        with span('serialize'):
+            recipe_data = recipe.to_dict(user_id)
+        similar_recipes.schedule(recipe.id)
         return jsonify({
             'message': 'Recipe created successfully',
-            'recipe': recipe.to_dict(user_id)
+            'recipe': recipe_data
         }), 201
         
     except Exception as e:
@@ -258,7 +320,8 @@ def update_recipe(recipe_id):
             return jsonify({'error': 'Permission denied'}), 403
         
         # Get form data
-        data = request.form.to_dict()
+        with span('parse_form'):
+            data = request.form.to_dict()
         
         # Update fields
         if 'title' in data:
@@ -266,19 +329,10 @@ def update_recipe(recipe_id):
         if 'description' in data:
             recipe.description = data['description'].strip()
         if 'ingredients' in data:
-            # Parse ingredients JSON string
-            try:
-                ingredients = json.loads(data['ingredients']) if data['ingredients'] else []
-                recipe.ingredients = json.dumps(ingredients)
-            except (json.JSONDecodeError, TypeError):
-                recipe.ingredients = data['ingredients'].strip()
+            # JSON list string, or plain text with one ingredient per line
+            recipe.ingredients = coerce_json_list(data['ingredients'])
         if 'instructions' in data:
-            # Parse instructions JSON string
-            try:
-                instructions = json.loads(data['instructions']) if data['instructions'] else []
-                recipe.instructions = json.dumps(instructions)
-            except (json.JSONDecodeError, TypeError):
-                recipe.instructions = data['instructions'].strip()
+            recipe.instructions = coerce_json_list(data['instructions'])
         if 'category' in data:
             recipe.category = data['category'].strip()
         if 'cuisine_type' in data:
@@ -324,11 +378,15 @@ def update_recipe(recipe_id):
             recipe.total_time = recipe.cook_time
         
         recipe.updated_at = datetime.utcnow()
-        db.session.commit()
+        with span('db.commit'):
+            db.session.commit()
         
+        with span('serialize'):
+            recipe_data = recipe.to_dict(user_id)
+        similar_recipes.schedule(recipe.id)
         return jsonify({
             'message': 'Recipe updated successfully',
-            'recipe': recipe.to_dict(user_id)
+            'recipe': recipe_data
         }), 200
         
     except Exception as e:
@@ -371,6 +429,45 @@ def delete_recipe(recipe_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to delete recipe', 'details': str(e)}), 500
 
+@recipe_bp.route('/<int:recipe_id>/similar', methods=['GET'])
+def get_similar_recipes(recipe_id):
+    """Get recipes similar to a recipe (precomputed by `flask similar rebuild`)"""
+    try:
+        recipe = Recipe.query.get(recipe_id)
+        
+        if not recipe or not recipe.is_published:
+            return jsonify({'error': 'Recipe not found'}), 404
+        
+        limit = max(1, min(request.args.get('limit', 6, type=int), current_app.config.get('SIMILAR_K', 10)))
+        
+        # Get current user for favorites
+        current_user_id = None
+        try:
+            from flask_jwt_extended import verify_jwt_in_request
+            verify_jwt_in_request(optional=True)
+            current_user_id = int(get_jwt_identity())
+        except:
+            pass
+        
+        rows = db.session.execute(
+            db.select(Recipe, RecipeNeighbor.score)
+            .join(RecipeNeighbor, RecipeNeighbor.neighbor_id == Recipe.id)
+            .where(RecipeNeighbor.recipe_id == recipe_id, Recipe.is_published.is_(True))
+            .options(*Recipe.load_options(CARD_FIELDS))
+            .order_by(RecipeNeighbor.score.desc(), Recipe.id)
+            .limit(limit)
+        ).all()
+        
+        similar = [
+            {**similar_recipe.to_dict(current_user_id, fields=CARD_FIELDS), 'similarity': round(score, 3)}
+            for similar_recipe, score in rows
+        ]
+        
+        return jsonify({'recipe_id': recipe_id, 'similar': similar}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get similar recipes', 'details': str(e)}), 500
+
 @recipe_bp.route('/<int:recipe_id>/reviews', methods=['GET'])
 def get_recipe_reviews(recipe_id):
     """Get reviews for a specific recipe"""
@@ -449,6 +546,7 @@ def add_review(recipe_id):
         
         db.session.add(review)
         db.session.commit()
+        trending.record(recipe_id, 'review')
         
         return jsonify({
             'message': 'Review added successfully',
@@ -475,26 +573,31 @@ def toggle_favorite(recipe_id):
         if not recipe:
             return jsonify({'error': 'Recipe not found'}), 404
         
-        # Check if already favorited
-        favorite = Favorite.query.filter_by(user_id=user_id, recipe_id=recipe_id).first()
-        
-        if favorite:
-            # Remove from favorites
-            db.session.delete(favorite)
-            db.session.commit()
-            return jsonify({
-                'message': 'Recipe removed from favorites',
-                'is_favorited': False
-            }), 200
-        else:
+        def toggle():
+            # Check if already favorited
+            favorite = Favorite.query.filter_by(user_id=user_id, recipe_id=recipe_id).first()
+            
+            if favorite:
+                # Remove from favorites
+                db.session.delete(favorite)
+                db.session.commit()
+                return False
+            
             # Add to favorites
-            favorite = Favorite(user_id=user_id, recipe_id=recipe_id)
-            db.session.add(favorite)
+            db.session.add(Favorite(user_id=user_id, recipe_id=recipe_id))
             db.session.commit()
+            return True
+        
+        if run_with_retry(toggle):
+            trending.record(recipe_id, 'favorite')
             return jsonify({
                 'message': 'Recipe added to favorites',
                 'is_favorited': True
             }), 200
+        return jsonify({
+            'message': 'Recipe removed from favorites',
+            'is_favorited': False
+        }), 200
         
     except Exception as e:
         db.session.rollback()
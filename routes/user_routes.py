@@ -1,8 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
-from models.recipe import Recipe
+from models.recipe import Recipe, CARD_FIELDS
 from models.favorite import Favorite
+from models.review import Review
+from models.recommendation import UserRecommendation
+from models.trending import RecipeTrending
 from extensions import db
 
 user_bp = Blueprint('user', __name__)
@@ -28,14 +31,7 @@ def get_user_favorites():
             .order_by(Favorite.created_at.desc())\
             .paginate(page=page, per_page=per_page, error_out=False)
         
-        favorites = []
-        for favorite in favorites_pagination.items:
-            recipe_data = favorite.recipe.to_dict(user_id)
-            favorites.append({
-                'id': favorite.id,
-                'created_at': favorite.created_at.isoformat(),
-                'recipe': recipe_data
-            })
+        favorites = [favorite.to_dict() for favorite in favorites_pagination.items]
         
         return jsonify({
             'favorites': favorites,
@@ -138,6 +134,67 @@ def get_user_dashboard():
     except Exception as e:
         return jsonify({'error': 'Failed to get dashboard data', 'details': str(e)}), 500
 
+@user_bp.route('/recommendations', methods=['GET'])
+@jwt_required()
+def get_recommendations():
+    """Get personalized recipe recommendations (trending recipes for new users)"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        limit = max(1, min(request.args.get('limit', 12, type=int), current_app.config.get('RECOMMENDATIONS_N', 50)))
+        card_options = Recipe.load_options(CARD_FIELDS)
+        # Including anything favorited or reviewed since the lists were trained
+        unseen = (
+            ~db.exists().where(Favorite.user_id == user_id, Favorite.recipe_id == Recipe.id),
+            ~db.exists().where(Review.user_id == user_id, Review.recipe_id == Recipe.id),
+        )
+        
+        # Precomputed by `flask recommendations train`: one indexed range per user
+        source = 'personalized'
+        rows = db.session.execute(
+            db.select(Recipe, UserRecommendation.score)
+            .join(UserRecommendation, UserRecommendation.recipe_id == Recipe.id)
+            .where(UserRecommendation.user_id == user_id, Recipe.is_published == True, *unseen)
+            .options(*card_options)
+            .order_by(UserRecommendation.score.desc(), Recipe.id)
+            .limit(limit)
+        ).all()
+        
+        # Cold start: what's trending, or the most viewed recipes before anything trends
+        if not rows:
+            source = 'trending'
+            rows = db.session.execute(
+                db.select(Recipe, RecipeTrending.score)
+                .join(RecipeTrending, RecipeTrending.recipe_id == Recipe.id)
+                .where(Recipe.is_published == True, Recipe.user_id != user_id, *unseen)
+                .options(*card_options)
+                .order_by(RecipeTrending.score.desc(), RecipeTrending.recipe_id.desc())
+                .limit(limit)
+            ).all()
+        if not rows:
+            source = 'popular'
+            rows = db.session.execute(
+                db.select(Recipe, db.literal(0.0))
+                .where(Recipe.is_published == True, Recipe.user_id != user_id, *unseen)
+                .options(*card_options)
+                .order_by(Recipe.view_count.desc())
+                .limit(limit)
+            ).all()
+        
+        recommendations = [
+            {**recipe.to_dict(user_id, fields=CARD_FIELDS), 'score': round(float(score or 0), 3)}
+            for recipe, score in rows
+        ]
+        
+        return jsonify({'source': source, 'recommendations': recommendations}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get recommendations', 'details': str(e)}), 500
+
 @user_bp.route('/profile/<username>', methods=['GET'])
 def get_public_profile(username):
     """Get public profile of a user"""
@@ -174,7 +231,7 @@ def get_public_profile(username):
             'last_name': user.last_name,
             'bio': user.bio,
             'profile_image': user.profile_image,
-            'created_at': user.created_at.isoformat() if user.created_at else None,
+            'created_at': user.created_at,
             'recipe_count': len(user.recipes),
             'total_views': db.session.query(db.func.sum(Recipe.view_count))\
                 .filter_by(user_id=user.id).scalar() or 0
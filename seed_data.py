@@ -4,7 +4,6 @@ Seed script to populate the database with sample recipes and images
 """
 
 import os
-import json
 from datetime import datetime
 from app import app
 from extensions import db
@@ -477,8 +476,8 @@ def create_sample_recipes(users):
         recipe = Recipe(
             title=recipe_data['title'],
             description=recipe_data['description'],
-            ingredients=json.dumps(recipe_data['ingredients']),
-            instructions=json.dumps(recipe_data['instructions']),
+            ingredients=recipe_data['ingredients'],
+            instructions=recipe_data['instructions'],
             category=recipe_data['category'],
             cuisine_type=recipe_data['cuisine_type'],
             dietary_preference=recipe_data['dietary_preference'],
@@ -0,0 +1,56 @@
+"""
+Async SQLAlchemy engine for the ASGI entry point (``asgi.py``).
+
+It connects to the same database as the Flask app: the resolved sync URL
+gets the async driver (sqlite -> aiosqlite, postgresql -> asyncpg) unless
+``ASYNC_DATABASE_URL`` is set. SQLite connections get the same pragmas and
+explicit BEGIN handling as the sync engine.
+"""
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from services.sqlite_tuning import sqlite_pragmas, tune_engine
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url):
+    """The async-driver equivalent of a sync database URL"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend}')
+    if 'sslmode' in url.query:
+        # libpq's sslmode is called ssl by asyncpg
+        url = url.difference_update_query(['sslmode']).update_query_dict({'ssl': url.query['sslmode']})
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_db(app):
+    """Create ``(engine, session factory)`` for the app's primary database"""
+    url = app.config.get('ASYNC_DATABASE_URL')
+    if not url:
+        from extensions import db
+        with app.app_context():
+            url = db.engine.url  # relative SQLite paths resolved to the instance folder
+    url = async_database_url(url)
+
+    options = {}
+    if url.get_backend_name() == 'postgresql':
+        options = {
+            'pool_size': app.config.get('ASYNC_DB_POOL_SIZE', 10),
+            'max_overflow': app.config.get('ASYNC_DB_MAX_OVERFLOW', 10),
+            'pool_pre_ping': True,
+            'pool_recycle': 300,
+        }
+    engine = create_async_engine(url, **options)
+
+    if url.get_backend_name() == 'sqlite' and app.config.get('SQLITE_PERFORMANCE_MODE', True):
+        tune_engine(engine.sync_engine, sqlite_pragmas(app, url))
+
+    # Objects stay readable after commit; handlers serialize them afterwards
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
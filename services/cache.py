@@ -0,0 +1,56 @@
+"""
+Small in-process TTL cache.
+
+Each worker keeps its own copy, so this suits values that are expensive to
+compute and may be a few seconds stale (dashboard aggregates), not data
+that must be consistent across workers.
+"""
+
+import threading
+import time
+
+from services.metrics import record_cache
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, ttl=30, name=None):
+        self.ttl = ttl
+        self.name = name  # hits/misses of get_or_set are exported as metrics under this name
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Return the cached value, computing and storing ``factory()`` on a miss"""
+        value = self.get(key)
+        if self.name:
+            record_cache(self.name, value is not None)
+        if value is None:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,129 @@
+"""
+Response compression.
+
+Dynamic responses (JSON, HTML) larger than ``COMPRESS_MIN_SIZE`` bytes are
+compressed in ``after_request`` with brotli (if installed) or gzip,
+whichever the client prefers in ``Accept-Encoding``. Static files are
+never compressed per request: the ``static`` endpoint serves the ``.br``
+or ``.gz`` sibling written by ``compress_static.py`` at build time when it
+exists and is newer than the original, and the plain file otherwise.
+"""
+
+import gzip
+import mimetypes
+import os
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json', 'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'image/svg+xml', 'application/xml', 'text/xml',
+)
+
+# Precompressed sibling extension per content coding
+STATIC_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    """Content codings this process can produce, best first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings, encodings):
+    """Best of ``encodings`` acceptable to the client, or None"""
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept_encodings[encoding]  # '*' and q=0 are handled by werkzeug
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class Compressor:
+    """gzip/brotli negotiation for dynamic responses and precompressed static files"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.gzip_level = app.config.get('COMPRESS_LEVEL', 6)
+        self.brotli_level = app.config.get('COMPRESS_BR_LEVEL', 4)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES') or COMPRESSIBLE_MIMETYPES)
+        self._app = app
+        app.extensions['compressor'] = self
+
+        if not self.enabled:
+            return
+        app.after_request(self._compress_response)
+        if app.has_static_folder and 'static' in app.view_functions:
+            app.view_functions['static'] = self._send_static
+
+    def _compress_response(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.mimetypes):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data, encoding = self.compress_body(response.get_data(), request.accept_encodings)
+        if encoding is None:
+            return response
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
+
+    def compress_body(self, data, accept_encodings):
+        """``(body, encoding)`` for a client's accepted encodings; encoding is None if left as-is"""
+        if len(data) < self.min_size:
+            return data, None
+        encoding = choose_encoding(accept_encodings, available_encodings())
+        if encoding is None:
+            return data, None
+        level = self.brotli_level if encoding == 'br' else self.gzip_level
+        return compress(data, encoding, level), encoding
+
+    def _send_static(self, filename):
+        """Flask's static view, preferring a fresh precompressed sibling"""
+        app = self._app
+        max_age = app.get_send_file_max_age(filename)
+        original = safe_join(app.static_folder, filename)
+        if not original or not os.path.isfile(original):
+            return send_from_directory(app.static_folder, filename, max_age=max_age)
+
+        modified = os.path.getmtime(original)
+        fresh = tuple(
+            encoding for encoding, suffix in STATIC_SUFFIXES.items()
+            if os.path.isfile(original + suffix) and os.path.getmtime(original + suffix) >= modified
+        )
+        encoding = choose_encoding(request.accept_encodings, fresh) if fresh else None
+
+        if encoding is None:
+            response = send_from_directory(app.static_folder, filename, max_age=max_age)
+        else:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(app.static_folder, filename + STATIC_SUFFIXES[encoding],
+                                           mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+        if fresh:
+            response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,159 @@
+"""
+Read-replica routing for the SQLAlchemy session.
+
+SELECTs issued while handling a GET/HEAD request go to the replica
+configured by ``SQLALCHEMY_REPLICA_URI``. Everything else goes to the
+primary: writes, reads in the same session after a flush, handlers marked
+with ``@use_primary``, and (read-after-write) any request from a client
+that wrote within the last ``SQLALCHEMY_REPLICA_MAX_LAG`` seconds.
+
+The replica is health checked at most every
+``SQLALCHEMY_REPLICA_CHECK_INTERVAL`` seconds; if it is unreachable or lags
+more than the budget, reads fall back to the primary until the next check.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+REPLICA_BIND = 'replica'
+PRIMARY_COOKIE = 'ts_read_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Seconds the replica is behind; 0 when it is fully caught up or not a standby
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class RoutingSession(Session):
+    """Session that sends safe reads to the replica engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or (clause is not None and not getattr(clause, 'is_select', False)):
+                # Later reads in this session must see what we just wrote
+                self.info['use_primary'] = True
+            elif not self.info.get('use_primary'):
+                router = current_app.extensions.get('db_router')
+                engine = router.replica_for_read() if router else None
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_primary(f):
+    """Decorator forcing every query of a GET handler onto the primary"""
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.db_use_primary = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+class ReplicaRouter:
+    """Decides per read whether the replica may serve it"""
+
+    def __init__(self, app=None):
+        self._lock = threading.RLock()
+        self.healthy = False
+        self.lag = None
+        self._checked_at = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        replica_uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+        self.enabled = bool(replica_uri)
+        self.max_lag = app.config.get('SQLALCHEMY_REPLICA_MAX_LAG', 5)
+        self.check_interval = app.config.get('SQLALCHEMY_REPLICA_CHECK_INTERVAL', 10)
+        app.extensions['db_router'] = self
+
+        if not self.enabled:
+            return
+
+        # Flask-SQLAlchemy creates an engine per bind; no models use this
+        # bind key, so create_all() never touches the replica
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = replica_uri
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+        app.after_request(self._remember_write)
+
+    def _replica_engine(self):
+        from extensions import db
+
+        engine = db.engines.get(REPLICA_BIND)
+        if engine is not None and not getattr(engine, '_tastyshare_routed', False):
+            event.listen(engine, 'handle_error', self._on_replica_error)
+            engine._tastyshare_routed = True
+        return engine
+
+    def replica_for_read(self):
+        """The replica engine if the current read may use it, else None"""
+        if not self.enabled or not has_request_context():
+            return None
+        if request.method not in SAFE_METHODS or g.get('db_use_primary'):
+            return None
+        if request.cookies.get(PRIMARY_COOKIE, type=float, default=0) > time.time():
+            return None
+        if not self._check_health():
+            return None
+        return self._replica_engine()
+
+    def _check_health(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self.healthy
+
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self.healthy
+            self._checked_at = now
+            try:
+                engine = self._replica_engine()
+                with engine.connect() as connection:
+                    if connection.dialect.name == 'postgresql':
+                        lag = float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0)
+                    else:
+                        connection.execute(text('SELECT 1'))
+                        lag = 0.0
+                self.lag = lag
+                self.healthy = lag <= self.max_lag
+                if not self.healthy:
+                    current_app.logger.warning('Replica lag %.1fs exceeds budget, reading from primary', lag)
+            except Exception as e:
+                self.lag = None
+                self.healthy = False
+                current_app.logger.warning('Replica health check failed, reading from primary: %s', e)
+        return self.healthy
+
+    def _on_replica_error(self, context):
+        """Stop routing to a replica whose connections are failing"""
+        if context.is_disconnect or context.connection is None:
+            with self._lock:
+                self.healthy = False
+                self._checked_at = time.monotonic()
+
+    def _remember_write(self, response):
+        """Pin this client to the primary for the lag budget after a write"""
+        from extensions import db
+
+        if request.method not in SAFE_METHODS and db.session.info.get('use_primary'):
+            response.set_cookie(PRIMARY_COOKIE, str(time.time() + self.max_lag),
+                                max_age=int(self.max_lag) + 1, httponly=True, samesite='Lax')
+        return response
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'healthy': self.healthy,
+            'lag_seconds': self.lag,
+            'max_lag_seconds': self.max_lag,
+        }
@@ -0,0 +1,159 @@
+"""
+Email validation that never blocks a request on DNS.
+
+Syntax is validated offline on the request path. Deliverability (MX/A
+lookups for the domain) is optional and runs on a small background pool;
+results are cached per domain and written to ``User.is_verified``.
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.metrics import record_cache
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+def normalize_email(email):
+    """Validate email syntax offline, returns the normalized address or None"""
+    from email_validator import validate_email, EmailNotValidError  # imported on first use, not at startup
+
+    try:
+        return validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        # email-validator rejects some reserved domains the old regex accepted
+        if EMAIL_PATTERN.match(email):
+            return email
+        return None
+
+
+class DomainCache:
+    """Thread-safe TTL cache of domain -> deliverable"""
+
+    def __init__(self, ttl=3600, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, domain):
+        """Cached result for a domain, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None:
+                return None
+            deliverable, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[domain]
+                return None
+            return deliverable
+
+    def set(self, domain, deliverable, ttl=None):
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                now = time.monotonic()
+                self._entries = {
+                    key: entry for key, entry in self._entries.items() if entry[1] >= now
+                }
+                if len(self._entries) >= self.max_size:
+                    self._entries.clear()
+            self._entries[domain] = (deliverable, time.monotonic() + (ttl or self.ttl))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class EmailDeliverabilityChecker:
+    """Background deliverability checks that update ``User.is_verified``"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.cache = DomainCache()
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('EMAIL_DELIVERABILITY_CHECK', False)
+        self.timeout = app.config.get('EMAIL_DNS_TIMEOUT', 5)
+        self.cache = DomainCache(ttl=app.config.get('EMAIL_DOMAIN_CACHE_TTL', 3600))
+        self._app = app
+        app.extensions['email_checker'] = self
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email-check')
+        return self._executor
+
+    def is_deliverable(self, email):
+        """
+        Check whether the email's domain accepts mail (blocking, cached).
+
+        Returns True/False, or None when DNS could not be reached. Unknown
+        results are not cached so a network blip doesn't stick.
+        """
+        import dns.resolver
+        from email_validator import validate_email, EmailNotValidError, EmailUndeliverableError
+        from email_validator.deliverability import validate_email_deliverability
+
+        domain = email.rsplit('@', 1)[-1].lower()
+        cached = self.cache.get(domain)
+        record_cache('email_domain', cached is not None)
+        if cached is not None:
+            return cached
+
+        try:
+            validated = validate_email(email, check_deliverability=False)
+            # Called directly: validate_email() drops the 'unknown-deliverability' of timeouts
+            info = validate_email_deliverability(validated.ascii_domain, validated.domain, timeout=self.timeout)
+        except EmailUndeliverableError as e:
+            # NXDOMAIN, no MX/A/AAAA or a null MX; other resolver errors arrive wrapped
+            if e.__cause__ is not None and not isinstance(e.__cause__, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+                return None
+            deliverable = False
+        except EmailNotValidError:
+            return False
+        except Exception:
+            return None
+        else:
+            if info.get('unknown-deliverability'):  # 'timeout' or 'no_nameservers'
+                return None
+            deliverable = True
+
+        self.cache.set(domain, deliverable)
+        return deliverable
+
+    def schedule(self, user_id, email):
+        """Queue a deliverability check for a user; returns the future or None"""
+        if not self.enabled:
+            return None
+        return self.executor.submit(self._check_user, user_id, email)
+
+    def _check_user(self, user_id, email):
+        deliverable = self.is_deliverable(email)
+        if deliverable is None:
+            return None
+
+        from extensions import db
+        from models.user import User
+
+        with self._app.app_context():
+            try:
+                user = db.session.get(User, user_id)
+                # Skip if the user changed their email while we were checking
+                if user and user.email == email and user.is_verified != deliverable:
+                    user.is_verified = deliverable
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self._app.logger.exception('Email deliverability update failed for user %s', user_id)
+        return deliverable
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
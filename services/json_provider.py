@@ -0,0 +1,80 @@
+"""
+Flask JSON provider backed by orjson when it is installed.
+
+orjson serializes ``datetime``/``date`` natively as ISO 8601 (the same
+text ``isoformat()`` produces for the naive UTC datetimes stored here), so
+models can return datetime objects from ``to_dict``. Without orjson the
+stdlib fallback encodes dates the same way instead of Flask's RFC 822
+default, so responses don't change shape between the two.
+"""
+
+import json
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+from services.tracing import span
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _iso_default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)  # Decimal, UUID, dataclasses, __html__
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson-backed JSON provider with an ISO-datetime stdlib fallback"""
+
+    default = staticmethod(_iso_default)
+    # Keep keys sorted like Flask's default so responses stay byte-stable for caches
+    sort_keys = True
+    # orjson writes UTF-8 as is; the stdlib fallback must not escape it to \uXXXX
+    ensure_ascii = False
+
+    @property
+    def backend(self):
+        return 'orjson' if orjson is not None else 'json'
+
+    def _orjson_options(self, indent=None):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        """Serialize ``obj`` to a JSON string"""
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            # Unusual json.dumps arguments (cls=..., ensure_ascii=...) go to the stdlib
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            if not kwargs.get('indent'):
+                kwargs.setdefault('separators', (',', ':'))  # compact, like orjson
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default,
+                            option=self._orjson_options(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """JSON response; skips the bytes -> str -> bytes round trip with orjson"""
+        with span('json.encode'):
+            if orjson is None:
+                return super().response(*args, **kwargs)
+
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            body = orjson.dumps(obj, default=self.default,
+                                option=self._orjson_options(indent) | orjson.OPT_APPEND_NEWLINE)
+            return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,41 @@
+"""
+Flask-Migrate, set up on first use of the ``flask db`` command.
+
+Importing flask_migrate imports alembic (~100 ms), which every gunicorn
+worker and script would pay at startup for a command only deployments
+run. ``LazyMigrate.init_app`` registers a placeholder ``db`` group; when
+``flask db ...`` is invoked, the real ``Migrate`` is initialized and its
+group parses and runs the command. Code calling ``flask_migrate`` directly
+(``flask init-db``) calls ``load`` first.
+"""
+
+import click
+
+
+class _LazyMigrateGroup(click.Group):
+    """``flask db`` placeholder; parsing its arguments hands over to the real group"""
+
+    def __init__(self, loader, **kwargs):
+        super().__init__(**kwargs)
+        self._loader = loader
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        return self._loader().make_context(info_name, args, parent=parent, **extra)
+
+
+class LazyMigrate:
+    """Drop-in for ``flask_migrate.Migrate`` that defers the alembic import"""
+
+    def init_app(self, app, db, **kwargs):
+        def load():
+            if 'migrate' not in app.extensions:
+                from flask_migrate import Migrate
+                Migrate(app, db, **kwargs)  # replaces the placeholder with the real group
+            return app.cli.commands['db']
+
+        app.extensions['lazy_migrate'] = load
+        app.cli.add_command(_LazyMigrateGroup(load, name='db', help='Perform database migrations.'))
+
+    def load(self, app):
+        """Initialize the real Flask-Migrate for `app` now"""
+        app.extensions['lazy_migrate']()
@@ -0,0 +1,144 @@
+"""
+Prometheus metrics, served in text format at ``/metrics``.
+
+Recorded per process:
+
+- request count and latency histogram per endpoint (``recipe.get_recipes``,
+  ``admin.get_admin_dashboard``, ...), method and status; unknown URLs
+  share the ``unmatched`` endpoint so 404 scans can't add series
+- time spent waiting for a pooled database connection, and connections
+  in use, per bind
+- cache hits and misses (``TTLCache(name=...)``, email domain cache)
+- image processing time for uploads
+
+With several gunicorn workers each one only sees its own requests, so
+``gunicorn.conf.py`` sets ``PROMETHEUS_MULTIPROC_DIR``: every worker writes
+its samples to files there and ``/metrics`` merges them, whichever worker
+answers the scrape. Set ``METRICS_TOKEN`` to require
+``Authorization: Bearer <token>`` on the endpoint; with
+``METRICS_REQUIRE_TOKEN`` (production) metrics stay off without one.
+"""
+
+import os
+import tempfile
+import time
+
+from flask import Response, g, jsonify, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest)
+from sqlalchemy import event
+
+# prometheus_client turns on multiprocess mode when the variable merely exists;
+# empty, it would write the sample files into the working directory
+for _name in ('PROMETHEUS_MULTIPROC_DIR', 'prometheus_multiproc_dir'):
+    if _name in os.environ and not os.environ[_name]:
+        os.environ[_name] = os.path.join(tempfile.gettempdir(), 'tastyshare-metrics')
+        os.makedirs(os.environ[_name], exist_ok=True)
+
+REQUESTS = Counter('http_requests', 'HTTP requests', ['endpoint', 'method', 'status'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency',
+                            ['endpoint', 'method'])
+DB_POOL_WAIT = Histogram('db_pool_checkout_wait_seconds', 'Time waiting for a pooled database connection',
+                         ['bind'], buckets=(.0005, .001, .005, .01, .05, .1, .5, 1, 5, 30))
+DB_POOL_IN_USE = Gauge('db_pool_connections_in_use', 'Database connections checked out of the pool',
+                       ['bind'], multiprocess_mode='livesum')
+CACHE_REQUESTS = Counter('cache_requests', 'Cache lookups', ['cache', 'result'])
+IMAGE_PROCESSING = Histogram('image_processing_seconds', 'Time to resize and save an uploaded image',
+                             buckets=(.01, .025, .05, .1, .25, .5, 1, 2.5, 5))
+
+
+def record_cache(cache, hit):
+    """Count a lookup in the named cache"""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def metrics_registry():
+    """Registry to export: all workers' samples in multiprocess mode, else this process's"""
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    from prometheus_client import multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def _time_checkouts(engine, bind):
+    wait = DB_POOL_WAIT.labels(bind)
+    connect = engine.pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            wait.observe(time.perf_counter() - start)
+
+    engine.pool.connect = timed_connect
+
+
+def instrument_engine(engine, bind):
+    """Record pool checkout waits and connections in use for an engine"""
+    in_use = DB_POOL_IN_USE.labels(bind)
+    _time_checkouts(engine, bind)
+    # dispose() (e.g. after a gunicorn fork) replaces the pool; pool events carry over, the wrapper doesn't
+    event.listen(engine, 'engine_disposed', lambda engine: _time_checkouts(engine, bind))
+    event.listen(engine, 'checkout', lambda *args: in_use.inc())
+    event.listen(engine, 'checkin', lambda *args: in_use.dec())
+
+
+class Metrics:
+    """Request, database pool, cache and image metrics with a ``/metrics`` endpoint"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.token = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Instrument the engines and requests (call after db.init_app)"""
+        from extensions import db
+
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.token = app.config.get('METRICS_TOKEN')
+        if self.enabled and not self.token and app.config.get('METRICS_REQUIRE_TOKEN'):
+            app.logger.warning('Metrics disabled: set METRICS_TOKEN to serve /metrics')
+            self.enabled = False
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            for bind, engine in db.engines.items():
+                instrument_engine(engine, bind or 'default')
+
+        app.before_request(self._start_request)
+        app.after_request(self._record_response)
+        app.teardown_request(self._record_error)
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'), 'metrics', self.export)
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+
+    def _record_response(self, response):
+        self._observe(response.status_code)
+        return response
+
+    def _record_error(self, exc):
+        # Unhandled exceptions skip after_request; Flask answers them with a 500
+        if exc is not None:
+            self._observe(500)
+
+    def _observe(self, status):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(endpoint, request.method, str(status)).inc()
+
+    def export(self):
+        """Prometheus text exposition of all metrics"""
+        if self.token and request.headers.get('Authorization') != f'Bearer {self.token}':
+            return jsonify({'error': 'Unauthorized'}), 401
+        return Response(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
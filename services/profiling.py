@@ -0,0 +1,221 @@
+"""
+On-demand request profiling.
+
+A request is profiled when an admin sends the ``X-Profile`` header, or at
+random with probability ``PROFILING_SAMPLE_RATE``. A background thread
+samples the request thread's Python stack every ``PROFILING_INTERVAL_MS``
+(CPython's GIL switch interval, 5 ms, caps how often it actually gets to
+run) and the samples are saved to ``PROFILING_DIR`` in two formats:
+
+- ``<id>.collapsed``: one ``frame;frame;frame count`` line per stack, the
+  input of flamegraph.pl and most flamegraph viewers
+- ``<id>.speedscope.json``: open at https://www.speedscope.app
+
+The profile id is returned in the ``X-Profile-Id`` response header; the
+admin API lists and downloads profiles. Files are shared by all workers
+and only the newest ``PROFILING_MAX_FILES`` profiles are kept.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+PROFILE_FORMATS = {'collapsed': '.collapsed', 'speedscope': '.speedscope.json'}
+PROFILE_ID = re.compile(r'^[\w.-]+$')
+
+
+def frame_label(code, root):
+    """``qualname (path:line)`` with paths relative to the project or site-packages"""
+    filename = code.co_filename
+    if filename.startswith(root):
+        filename = os.path.relpath(filename, root)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread"""
+
+    def __init__(self, thread_id, interval, root):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()  # tuple of frame labels, outermost first -> samples
+        self.duration = 0.0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = frame_label(code, self.root)
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self):
+        """Stacks in collapsed format (Brendan Gregg's flamegraph input)"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self, name):
+        """Stacks as a speedscope sampled profile; each sample weighs one interval"""
+        frames = {}
+        samples = []
+        for stack in self.stacks:
+            samples.append([frames.setdefault(label, len(frames)) for label in stack])
+        interval_ms = self.interval * 1000
+        weights = [count * interval_ms for count in self.stacks.values()]
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'exporter': 'tastyshare',
+            'name': name,
+            'activeProfileIndex': 0,
+            'shared': {'frames': [{'name': label} for label in frames]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+class RequestProfiler:
+    """Samples stacks of admin-requested or randomly chosen requests"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILING_ENABLED', True)
+        self.header = app.config.get('PROFILING_HEADER', 'X-Profile')
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.interval = app.config.get('PROFILING_INTERVAL_MS', 1) / 1000
+        self.max_files = app.config.get('PROFILING_MAX_FILES', 50)
+        self.directory = app.config.get('PROFILING_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.root = app.root_path + os.sep
+        app.extensions['profiler'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    def _requested_by_admin(self):
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+        from extensions import db
+        from models.user import User
+
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            return False
+        user = db.session.get(User, int(identity)) if identity else None
+        return user is not None and user.role == 'admin'
+
+    def _start_request(self):
+        if request.headers.get(self.header):
+            if not self._requested_by_admin():
+                return
+        elif not (self.sample_rate and random.random() < self.sample_rate):
+            return
+        g.profiler = StackSampler(threading.get_ident(), self.interval, self.root)
+        g.profiler.start()
+
+    def _finish_request(self, response):
+        sampler = g.pop('profiler', None)
+        if sampler is not None:
+            response.headers['X-Profile-Id'] = self._save(sampler, response.status_code)
+        return response
+
+    def _teardown_request(self, exc):
+        sampler = g.pop('profiler', None)
+        if sampler is not None:  # an unhandled exception skipped after_request
+            self._save(sampler, 500)
+
+    def _save(self, sampler, status):
+        sampler.stop()
+        endpoint = request.endpoint or 'unmatched'
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{endpoint}-{uuid.uuid4().hex[:8]}"
+        name = f'{request.method} {request.full_path.rstrip("?")} -> {status} in {sampler.duration * 1000:.0f} ms'
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(profile_id, 'collapsed'), 'w') as f:
+            f.write(sampler.collapsed())
+        with open(self.path(profile_id, 'speedscope'), 'w') as f:
+            json.dump(sampler.speedscope(name), f)
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        profiles = self.list_profiles()
+        for profile in profiles[self.max_files:]:
+            for fmt in PROFILE_FORMATS:
+                try:
+                    os.remove(self.path(profile['id'], fmt))
+                except OSError:
+                    pass
+
+    def path(self, profile_id, fmt):
+        """File of a profile in the given format; ValueError for ids that aren't file names"""
+        if not PROFILE_ID.match(profile_id):
+            raise ValueError('Invalid profile id')
+        return os.path.join(self.directory, profile_id + PROFILE_FORMATS[fmt])
+
+    def list_profiles(self):
+        """Saved profiles, newest first"""
+        suffix = PROFILE_FORMATS['speedscope']
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(suffix)]
+        except FileNotFoundError:
+            return []
+        profiles = []
+        for name in sorted(names, reverse=True):  # ids start with the UTC timestamp
+            profile_id = name[:-len(suffix)]
+            created, _, rest = profile_id.partition('-')
+            try:
+                created_at = datetime.strptime(created, '%Y%m%dT%H%M%S%f').isoformat()
+            except ValueError:
+                continue  # not saved by the profiler
+            profiles.append({
+                'id': profile_id,
+                'endpoint': rest.rpartition('-')[0],
+                'created_at': created_at,
+                'size': os.path.getsize(os.path.join(self.directory, name)),
+            })
+        return profiles
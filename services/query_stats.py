@@ -0,0 +1,121 @@
+"""
+Per-request SQL statistics.
+
+With ``QUERY_STATS_ENABLED`` every statement a request runs is counted and
+timed with cursor events on the app's engines (primary and replica), and
+statements are grouped by shape: the SQL text with expanded ``IN (...)``
+lists collapsed, so the same query with different parameters is one shape.
+A shape that repeats more than ``QUERY_STATS_REPEAT_THRESHOLD`` times in
+one request is logged as a likely N+1. With ``QUERY_STATS_HEADERS`` the
+numbers are returned as ``X-Query-Count`` and ``Server-Timing``. When
+disabled no listener is registered, so there is no per-query cost.
+Transaction control (BEGIN/COMMIT...) is not counted.
+"""
+
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+TRANSACTION_CONTROL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+# "IN (?, ?, ?)" / "IN (%(id_1)s, %(id_2)s)" -> "IN (?)"
+EXPANDED_LIST = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s)\s*,)+\s*(?:\?|%\(\w+\)s)\s*\)')
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement):
+    """Statement text with parameter lists collapsed and whitespace normalized"""
+    return ' '.join(EXPANDED_LIST.sub('(?)', statement).split())
+
+
+class RequestQueryStats:
+    """Statements run by one request"""
+
+    __slots__ = ('count', 'duration', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold):
+        """``[(shape, count)]`` of statements run more than ``threshold`` times"""
+        repeated = {}
+        for statement, count in self.shapes.items():
+            shape = statement_shape(statement)
+            repeated[shape] = repeated.get(shape, 0) + count
+        return sorted(((shape, count) for shape, count in repeated.items() if count > threshold),
+                      key=lambda item: -item[1])
+
+
+def current_query_stats():
+    """Stats of the current request, or None outside a request or when disabled"""
+    if not has_request_context():
+        return None
+    return g.get('query_stats')
+
+
+class QueryStats:
+    """Per-request query counter, timer and N+1 detector"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register engine listeners and request hooks (call after db.init_app)"""
+        from extensions import db
+
+        self.enabled = app.config.get('QUERY_STATS_ENABLED', False)
+        self.headers = app.config.get('QUERY_STATS_HEADERS', True)
+        self.threshold = app.config.get('QUERY_STATS_REPEAT_THRESHOLD', 10)
+        app.extensions['query_stats'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_stats_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_stats_start'].pop()
+        stats = current_query_stats()
+        if stats is not None and not statement.lstrip()[:9].upper().startswith(TRANSACTION_CONTROL):
+            stats.record(statement, duration)
+
+    def _start_request(self):
+        g.query_stats = RequestQueryStats()
+        g.query_stats_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+        total = time.perf_counter() - g.pop('query_stats_started')
+
+        for shape, count in stats.repeated(self.threshold):
+            current_app.logger.warning('Possible N+1: %d x "%s" in %s %s',
+                                       count, shape[:200], request.method, request.path)
+
+        if self.headers:
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers.add('Server-Timing', f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"')
+            response.headers.add('Server-Timing', f'app;dur={total * 1000:.1f}')
+        return response
@@ -0,0 +1,202 @@
+"""
+Token-bucket throttling for the authentication endpoints.
+
+Login and registration both run a deliberately slow password hash, so every
+attempt is rejected here *before* any hashing happens once a client or an
+account has used up its budget.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request
+
+
+class MemoryBucketStore:
+    """In-process bucket store (local stand-in, one set of buckets per worker)"""
+
+    def __init__(self, max_keys=10000, prune_interval=60):
+        self.max_keys = max_keys
+        self.prune_interval = prune_interval
+        self._buckets = OrderedDict()  # least recently used first
+        self._counters = {}
+        self._pruned_at = 0
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, now):
+        """Take one token from a bucket, returns (allowed, tokens_left)"""
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now, capacity, refill_rate))[:2]
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, capacity, refill_rate)
+            self._buckets.move_to_end(key)
+            if now - self._pruned_at >= self.prune_interval:
+                self._prune(now)
+            # A flood of distinct keys evicts the least recently used buckets
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, tokens
+
+    def _prune(self, now):
+        """Drop buckets that have refilled completely (same as not existing)"""
+        self._pruned_at = now
+        refilled = [key for key, bucket in self._buckets.items()
+                    if bucket[0] + (now - bucket[1]) * bucket[3] >= bucket[2]]
+        for key in refilled:
+            del self._buckets[key]
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._counters.clear()
+
+
+class RedisBucketStore:
+    """Redis-backed bucket store shared by every gunicorn worker"""
+
+    # Refill and take atomically so concurrent workers can't overspend a bucket
+    TAKE_SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url, prefix='tastyshare:throttle:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('The redis package is required for a redis:// AUTH_RATE_LIMIT_STORAGE_URL')
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.TAKE_SCRIPT)
+
+    def take(self, key, capacity, refill_rate, now):
+        allowed, tokens = self._take(keys=[self.prefix + key], args=[capacity, refill_rate, now])
+        return bool(allowed), float(tokens)
+
+    def incr(self, name, amount=1):
+        self._client.hincrby(self.prefix + 'counters', name, amount)
+
+    def counters(self):
+        raw = self._client.hgetall(self.prefix + 'counters')
+        return {key.decode(): int(value) for key, value in raw.items()}
+
+    def reset(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            self._client.delete(key)
+
+
+def create_store(url):
+    """Build a bucket store from a storage URL (memory:// or redis://...)"""
+    if not url or url.startswith('memory://'):
+        return MemoryBucketStore()
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBucketStore(url)
+    raise ValueError(f'Unsupported rate limit storage URL: {url}')
+
+
+class AuthThrottle:
+    """Per-IP and per-account token buckets for the auth endpoints"""
+
+    def __init__(self, app=None):
+        self.store = None
+        self.enabled = True
+        self.limits = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('AUTH_RATE_LIMIT_ENABLED', True)
+        self.proxy_hops = app.config.get('AUTH_RATE_LIMIT_PROXY_HOPS', 0)
+        self.limits = {
+            'ip': app.config.get('AUTH_RATE_LIMIT_PER_IP', (20, 60)),
+            'account': app.config.get('AUTH_RATE_LIMIT_PER_ACCOUNT', (5, 300)),
+        }
+        self.store = create_store(app.config.get('AUTH_RATE_LIMIT_STORAGE_URL', 'memory://'))
+        app.extensions['auth_throttle'] = self
+
+    def client_ip(self):
+        """Client address, honouring X-Forwarded-For only for trusted proxy hops"""
+        if self.proxy_hops and request.access_route:
+            route = request.access_route
+            return route[max(0, len(route) - self.proxy_hops)]
+        return request.remote_addr or 'unknown'
+
+    def _take(self, kind, key):
+        capacity, period = self.limits[kind]
+        allowed, tokens = self.store.take(key, capacity, capacity / period, time.time())
+        if allowed:
+            return 0
+        # Seconds until one whole token has been refilled
+        return max(1, math.ceil((1 - tokens) * period / capacity))
+
+    def hit(self, action, account=None):
+        """
+        Spend one attempt for the current request.
+
+        Returns 0 when the attempt may proceed, otherwise the number of
+        seconds the client should wait before retrying.
+        """
+        if not self.enabled:
+            return 0
+
+        retry_after = self._take('ip', f'{action}:ip:{self.client_ip()}')
+        if not retry_after and account:
+            retry_after = self._take('account', f'{action}:account:{account}')
+
+        self.store.incr(f'{action}.rejected' if retry_after else f'{action}.allowed')
+        return retry_after
+
+    def stats(self):
+        """Attempt counters; every rejected attempt is one password hash saved"""
+        counters = self.store.counters()
+        actions = sorted({name.split('.', 1)[0] for name in counters})
+        stats = {
+            action: {
+                'allowed': counters.get(f'{action}.allowed', 0),
+                'rejected': counters.get(f'{action}.rejected', 0),
+            }
+            for action in actions
+        }
+        stats['hashes_saved'] = sum(action['rejected'] for action in stats.values())
+        return stats
+
+    def reset(self):
+        self.store.reset()
+
+
+def throttled_response(retry_after):
+    """429 response returned instead of hashing a password"""
+    current_app.logger.info('Throttled %s attempt from %s', request.endpoint, request.remote_addr)
+    response = jsonify({
+        'error': 'Too many attempts. Please try again later.',
+        'retry_after': retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
@@ -0,0 +1,156 @@
+"""
+Daily rollups for the admin analytics charts.
+
+``rollup(start, end)`` counts signups, new recipes, reviews and favorites
+per UTC day from the ``created_at`` indexes and replaces the matching
+``daily_metrics`` rows, so re-running any range is idempotent. Without
+arguments it re-rolls yesterday and today (catching late commits around
+midnight), which is what a scheduled ``flask analytics rollup`` does;
+``--backfill`` walks the whole history in ``BACKFILL_CHUNK_DAYS`` chunks.
+
+Views have no per-view timestamps, so each run stores the current
+``SUM(view_count)`` as today's ``views_total`` and today's ``views`` as
+the growth since the last earlier snapshot. View history therefore starts
+on the first rollup and cannot be backfilled.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, select
+
+BACKFILL_CHUNK_DAYS = 31
+
+VIEWS = 'views'
+VIEWS_TOTAL = 'views_total'
+
+
+def metric_sources():
+    """Metric name -> created_at column counted for it"""
+    from models.user import User
+    from models.recipe import Recipe
+    from models.review import Review
+    from models.favorite import Favorite
+
+    return {
+        'signups': User.created_at,
+        'recipes': Recipe.created_at,
+        'reviews': Review.created_at,
+        'favorites': Favorite.created_at,
+    }
+
+
+# Metrics the analytics endpoint serves (views_total is internal bookkeeping)
+METRICS = ('signups', 'recipes', 'reviews', 'favorites', VIEWS)
+
+
+def _as_date(value):
+    # func.date() returns a string on SQLite and a date on PostgreSQL
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def _replace_rows(session, metric, start, end, counts, now):
+    from extensions import db
+    from models.analytics import DailyMetric
+
+    session.execute(db.delete(DailyMetric).where(
+        DailyMetric.metric == metric, DailyMetric.day.between(start, end)
+    ))
+    rows = [{'metric': metric, 'day': day, 'value': value, 'updated_at': now}
+            for day, value in counts.items() if value]
+    if rows:
+        session.execute(db.insert(DailyMetric), rows)
+    return len(rows)
+
+
+def _rollup_views(session, today, now):
+    from models.analytics import DailyMetric
+    from models.recipe import Recipe
+
+    total = session.scalar(select(func.coalesce(func.sum(Recipe.view_count), 0)))
+    previous = session.scalar(
+        select(DailyMetric.value)
+        .where(DailyMetric.metric == VIEWS_TOTAL, DailyMetric.day < today)
+        .order_by(DailyMetric.day.desc())
+        .limit(1)
+    )
+    # First snapshot: no baseline, so today's growth is unknown rather than "all views ever"
+    views = max(total - previous, 0) if previous is not None else 0
+    return (_replace_rows(session, VIEWS_TOTAL, today, today, {today: total}, now)
+            + _replace_rows(session, VIEWS, today, today, {today: views}, now))
+
+
+def rollup(start=None, end=None):
+    """
+    Recompute daily rows for every metric between ``start`` and ``end``
+    (inclusive dates, default yesterday..today). Returns rows written.
+    """
+    from extensions import db
+
+    today = datetime.utcnow().date()
+    end = end or today
+    start = start or min(end, today) - timedelta(days=1)
+    if start > end:
+        raise ValueError('start must not be after end')
+
+    session = db.session
+    now = datetime.utcnow()
+    lower = datetime.combine(start, time.min)
+    upper = datetime.combine(end + timedelta(days=1), time.min)
+    written = 0
+
+    for metric, column in metric_sources().items():
+        day = func.date(column)
+        counts = {
+            _as_date(bucket): count
+            for bucket, count in session.execute(
+                select(day, func.count())
+                .where(column >= lower, column < upper)
+                .group_by(day)
+            )
+        }
+        written += _replace_rows(session, metric, start, end, counts, now)
+
+    if start <= today <= end:
+        written += _rollup_views(session, today, now)
+
+    session.commit()
+    return written
+
+
+def backfill(start=None, end=None):
+    """Roll up the whole history (or ``start``..``end``) chunk by chunk"""
+    from extensions import db
+
+    if start is None:
+        firsts = [db.session.scalar(select(func.min(column))) for column in metric_sources().values()]
+        firsts = [value for value in firsts if value is not None]
+        start = min(firsts).date() if firsts else datetime.utcnow().date()
+    end = end or datetime.utcnow().date()
+
+    written = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), end)
+        written += rollup(chunk_start, chunk_end)
+        chunk_start = chunk_end + timedelta(days=1)
+    return written
+
+
+analytics_cli = AppGroup('analytics', help='Maintain the daily analytics rollups.')
+
+
+@analytics_cli.command('rollup')
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='First day (UTC)')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day (UTC)')
+@click.option('--backfill', 'full', is_flag=True, help='Roll up the whole history')
+def rollup_command(start, end, full):
+    """Recompute daily rollups (default: yesterday and today)"""
+    start = start.date() if start else None
+    end = end.date() if end else None
+    if full:
+        written = backfill(start, end)
+    else:
+        written = rollup(start, end)
+    click.echo(f"✅ Analytics rollup complete: {written} daily rows written")
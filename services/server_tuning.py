@@ -0,0 +1,105 @@
+"""
+Process sizing for the production gunicorn server (``gunicorn.conf.py``).
+
+Workers default to ``2 x CPUs + 1``, capped so that their expected memory
+fits in the container limit, and threads per worker make up the rest of
+the target concurrency. CPU and memory come from the cgroup limits when
+they are set (Railway, Docker) instead of the host's. Each worker's
+database pool is derived last so that ``replicas x workers x (pool_size
++ max_overflow)`` stays under the database's connection limit.
+"""
+
+import math
+import os
+
+CGROUP_V2_CPU = '/sys/fs/cgroup/cpu.max'
+CGROUP_V1_CPU = ('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', '/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+CGROUP_MEMORY = ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes')
+UNLIMITED_MEMORY = 1 << 60  # cgroup v1 reports a huge number instead of "max"
+
+MEMORY_HEADROOM = 0.8  # share of the memory limit workers may use
+REQUESTS_PER_CPU = 8  # concurrent requests per CPU; handlers mostly wait on the database
+MAX_THREADS = 8
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit():
+    """CPUs this process may use: cgroup quota, else affinity mask, else CPU count"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS
+        cpus = os.cpu_count() or 1
+
+    quota = period = None
+    value = _read(CGROUP_V2_CPU)
+    if value:
+        quota, _, period = value.partition(' ')
+    else:
+        quota, period = (_read(path) for path in CGROUP_V1_CPU)
+    if quota and period and quota not in ('max', '-1'):
+        cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    return cpus
+
+
+def memory_limit():
+    """Memory limit in bytes: cgroup limit, else physical memory, else None"""
+    for path in CGROUP_MEMORY:
+        value = _read(path)
+        if value and value != 'max' and int(value) < UNLIMITED_MEMORY:
+            return int(value)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def pool_limits(workers, threads, max_connections, reserved=5, replicas=1):
+    """``(pool_size, max_overflow)`` per worker within the database connection limit"""
+    budget = (max_connections - reserved) // (workers * replicas)
+    if budget < 1:
+        raise ValueError(f'{replicas} x {workers} workers need at least {replicas * workers + reserved} '
+                         f'database connections, the limit is {max_connections}')
+    pool_size = min(threads, budget)
+    return pool_size, budget - pool_size
+
+
+def size_server(workers=None, threads=None, worker_memory_mb=150, max_connections=100,
+                reserved_connections=5, replicas=1, cpus=None, memory=None):
+    """
+    Worker, thread and database pool counts for one server.
+
+    Explicit ``workers``/``threads`` are kept; the others are derived from
+    ``cpus`` and ``memory`` (detected when None). Workers are also capped
+    so each one gets at least one database connection.
+    """
+    cpus = cpus or cpu_limit()
+    memory = memory if memory is not None else memory_limit()
+
+    if workers is None:
+        workers = 2 * cpus + 1
+        if memory:
+            workers = min(workers, int(memory * MEMORY_HEADROOM // (worker_memory_mb * 1024 * 1024)))
+        workers = max(1, min(workers, (max_connections - reserved_connections) // replicas))
+
+    if threads is None:
+        threads = max(1, min(MAX_THREADS, math.ceil(cpus * REQUESTS_PER_CPU / workers)))
+        # No more threads than database connections the worker can have
+        threads = max(1, min(threads, (max_connections - reserved_connections) // (workers * replicas)))
+
+    pool_size, max_overflow = pool_limits(workers, threads, max_connections,
+                                          reserved_connections, replicas)
+    return {
+        'cpus': cpus,
+        'memory_mb': memory // (1024 * 1024) if memory else None,
+        'workers': workers,
+        'threads': threads,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+    }
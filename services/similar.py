@@ -0,0 +1,392 @@
+"""
+Content-based similar recipes.
+
+Each published recipe is described by TF-IDF weighted terms from its
+normalized ingredients ("2 cups finely chopped onions" -> onion), tags,
+cuisine, category and the words of its title and description. ``flask
+similar rebuild`` (run from a scheduler) streams the recipes twice, once
+for document frequencies and once to build the L2-normalized sparse
+matrix. It multiplies the matrix by its transpose ``SIMILAR_CHUNK_SIZE``
+rows at a time (fewer when a block of scores would exceed
+``SIMILAR_BLOCK_MB``), and keeps each recipe's ``SIMILAR_K`` best cosine
+neighbors in ``recipe_neighbors``. ``GET /api/recipes/<id>/similar`` is
+then a single indexed read.
+
+The rebuild also saves the vocabulary, IDF weights and matrix to
+``SIMILAR_MODEL_PATH``. When a recipe is created or edited, a background
+refresh vectorizes it against that model and replaces its neighbor list.
+It also adds the recipe to, or drops it from, the lists of the recipes it
+is now closest to. Recipes created since the rebuild aren't rows of the
+saved matrix, so they only reach other lists through their own refresh,
+and the IDF weights stay those of the last rebuild.
+
+NumPy and SciPy are only imported by the rebuild and refresh.
+"""
+
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, select
+
+DEFAULT_FIELD_WEIGHTS = {'ingredients': 1.0, 'tags': 1.0, 'cuisine': 0.8, 'category': 0.4, 'text': 0.4}
+
+# Terms in fewer recipes can't relate two recipes; terms in more say little about either
+MIN_DF = 2
+MAX_DF_RATIO = 0.5
+
+# Recipes whose lists a refresh may enter, best scores first
+REVERSE_CANDIDATES = 200
+
+WORD = re.compile(r'[a-z]+')
+PARENTHESES = re.compile(r'\([^)]*\)')
+
+UNITS = {
+    'cup', 'cups', 'tbsp', 'tsp', 'tablespoon', 'tablespoons', 'teaspoon', 'teaspoons', 'g', 'kg', 'mg',
+    'gram', 'grams', 'ml', 'l', 'litre', 'liter', 'oz', 'ounce', 'ounces', 'lb', 'lbs', 'pound', 'pounds',
+    'pinch', 'dash', 'clove', 'cloves', 'slice', 'slices', 'can', 'cans', 'piece', 'pieces', 'bunch',
+    'handful', 'sprig', 'sprigs', 'stick', 'sticks', 'package', 'packet', 'jar', 'head',
+}
+PREPARATION = {
+    'chopped', 'diced', 'minced', 'sliced', 'grated', 'peeled', 'crushed', 'fresh', 'freshly', 'ground',
+    'finely', 'roughly', 'thinly', 'large', 'small', 'medium', 'whole', 'optional', 'softened', 'melted',
+    'cooked', 'boneless', 'skinless', 'taste', 'room', 'temperature', 'divided', 'beaten', 'cubed',
+}
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have', 'in', 'into',
+    'is', 'it', 'its', 'my', 'of', 'on', 'or', 'our', 'so', 'that', 'the', 'this', 'to', 'too', 'up',
+    'was', 'we', 'with', 'you', 'your', 'recipe', 'make', 'made', 'best', 'easy', 'very', 'just', 'all',
+    'more', 'most', 'than', 'then', 'will', 'can', 'also', 'out', 'over', 'some', 'any', 'each', 'per',
+}
+
+
+def singular(word):
+    """Crude English singular, enough to match "onions" with "onion" """
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith('oes'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def text_words(text):
+    return [singular(word) for word in WORD.findall((text or '').lower())
+            if len(word) > 2 and word not in STOPWORDS]
+
+
+def ingredient_terms(ingredient):
+    """Normalized words of an ingredient, plus the whole name when it has several"""
+    name = PARENTHESES.sub(' ', str(ingredient).lower()).split(',')[0]
+    words = [singular(word) for word in WORD.findall(name)
+             if len(word) > 1 and word not in UNITS and word not in PREPARATION and word not in STOPWORDS]
+    return words + [' '.join(words)] if len(words) > 1 else words
+
+
+def tag_terms(tags):
+    """Tags stored as a JSON list or comma-separated text"""
+    if not tags:
+        return []
+    try:
+        values = json.loads(tags)
+    except (TypeError, ValueError):
+        values = tags.split(',')
+    if not isinstance(values, list):
+        values = [values]
+    return ['-'.join(str(value).lower().split()) for value in values if str(value).strip()]
+
+
+def recipe_terms(row, weights):
+    """Term -> weighted, sublinear term frequency for one recipe row"""
+    fields = {
+        'ingredients': ('i:', [term for item in row.ingredients or [] for term in ingredient_terms(item)]),
+        'tags': ('t:', tag_terms(row.tags)),
+        'cuisine': ('c:', [row.cuisine_type.lower()] if row.cuisine_type else []),
+        'category': ('k:', [row.category.lower()] if row.category else []),
+        'text': ('w:', text_words(f'{row.title} {row.description}')),
+    }
+    terms = {}
+    for field, (prefix, values) in fields.items():
+        weight = weights.get(field, 0)
+        if weight:
+            for term, count in Counter(values).items():
+                terms[prefix + term] = weight * (1 + math.log(count))
+    return terms
+
+
+def vectorize(documents, vocabulary, idf):
+    """L2-normalized TF-IDF rows (scipy CSR) for term dicts over a fixed vocabulary"""
+    import numpy as np
+    from scipy import sparse
+
+    indptr, indices, data = [0], [], []
+    for terms in documents:
+        for term, frequency in terms.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                indices.append(column)
+                data.append(frequency * idf[column])
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix((np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+                                np.asarray(indptr, dtype=np.int64)), shape=(len(documents), len(vocabulary)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix).tocsr()
+
+
+def top_neighbors(scores, ids, exclude, k, min_score):
+    """(neighbor id, score) pairs of the k best scores, best first (ties by id)"""
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=np.float32)
+    ids = np.asarray(ids)
+    keep = (scores >= min_score) & (ids != exclude)
+    scores, ids = scores[keep], ids[keep]
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        scores, ids = scores[best], ids[best]
+    order = np.lexsort((ids, -scores))
+    return [(int(ids[i]), round(float(scores[i]), 4)) for i in order]
+
+
+def block_neighbors(block, ids, start, k, min_score):
+    """{recipe id: [(neighbor id, score)]} for a dense block of rows ``start``.. of the similarity matrix"""
+    import numpy as np
+
+    height = block.shape[0]
+    block[np.arange(height), np.arange(start, start + height)] = -1  # a recipe isn't its own neighbor
+    k = min(k, block.shape[1] - 1)
+    if k <= 0:
+        return {int(ids[start + offset]): [] for offset in range(height)}
+    best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(block, best, axis=1)
+    lists = {}
+    for offset in range(height):
+        pairs = [(int(ids[column]), round(float(score), 4))
+                 for column, score in zip(best[offset], scores[offset]) if score >= min_score]
+        lists[int(ids[start + offset])] = sorted(pairs, key=lambda pair: (-pair[1], pair[0]))
+    return lists
+
+
+class SimilarRecipes:
+    """Builds and refreshes the precomputed similar recipe lists"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._executor = None
+        self._model = None
+        self._model_mtime = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SIMILAR_RECIPES_ENABLED', True)
+        self.k = app.config.get('SIMILAR_K', 10)
+        self.min_score = app.config.get('SIMILAR_MIN_SCORE', 0.05)
+        self.chunk_size = app.config.get('SIMILAR_CHUNK_SIZE', 2000)
+        self.block_bytes = app.config.get('SIMILAR_BLOCK_MB', 256) * 1024 * 1024
+        self.weights = dict(DEFAULT_FIELD_WEIGHTS)
+        self.weights.update(app.config.get('SIMILAR_FIELD_WEIGHTS') or {})
+        self.model_path = app.config.get('SIMILAR_MODEL_PATH') or os.path.join(app.instance_path, 'similar_model.npz')
+        self._app = app
+        app.extensions['similar_recipes'] = self
+        app.cli.add_command(similar_cli)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='similar-recipes')
+        return self._executor
+
+    def _rows(self, session, recipe_ids=None):
+        from models.recipe import Recipe
+
+        query = select(Recipe.id, Recipe.title, Recipe.description, Recipe.ingredients, Recipe.tags,
+                       Recipe.cuisine_type, Recipe.category).where(Recipe.is_published.is_(True))
+        if recipe_ids is not None:
+            query = query.where(Recipe.id.in_(recipe_ids))
+        return session.execute(query.order_by(Recipe.id).execution_options(yield_per=self.chunk_size))
+
+    def _write(self, session, neighbor_lists):
+        """Replace the lists of the given recipes: {recipe id: [(neighbor id, score)]}"""
+        from models.similar import RecipeNeighbor
+
+        session.execute(delete(RecipeNeighbor).where(RecipeNeighbor.recipe_id.in_(list(neighbor_lists))))
+        rows = [{'recipe_id': recipe_id, 'neighbor_id': neighbor_id, 'score': score}
+                for recipe_id, neighbors in neighbor_lists.items() for neighbor_id, score in neighbors]
+        if rows:
+            session.execute(RecipeNeighbor.__table__.insert(), rows)
+        return len(rows)
+
+    def rebuild(self):
+        """Recompute every list and save the model; returns counts"""
+        import numpy as np
+        from extensions import db
+        from models.recipe import Recipe
+        from models.similar import RecipeNeighbor
+
+        started = time.monotonic()
+        session = db.session
+
+        # Pass 1: document frequencies
+        document_frequency = Counter()
+        total = 0
+        for row in self._rows(session):
+            document_frequency.update(recipe_terms(row, self.weights).keys())
+            total += 1
+        max_df = max(MIN_DF, MAX_DF_RATIO * total)
+        terms = sorted(term for term, df in document_frequency.items() if MIN_DF <= df <= max_df)
+        vocabulary = {term: column for column, term in enumerate(terms)}
+        idf = np.array([math.log((1 + total) / (1 + document_frequency[term])) + 1 for term in terms],
+                       dtype=np.float32)
+        del document_frequency
+
+        # Pass 2: the matrix
+        ids, documents = [], []
+        for row in self._rows(session):
+            ids.append(row.id)
+            documents.append(recipe_terms(row, self.weights))
+        session.rollback()  # end the read transaction before the long computation
+        matrix = vectorize(documents, vocabulary, idf)
+        del documents
+        ids = np.asarray(ids, dtype=np.int64)
+        self._save_model(matrix, ids, terms, idf)
+
+        # Top-k neighbors, one block of rows at a time; the sparse product and its dense
+        # copy take up to ~16 bytes per recipe pair, so the block height follows the budget
+        transposed = matrix.T.tocsr()
+        rows = max(1, min(self.chunk_size, self.block_bytes // (16 * max(len(ids), 1))))
+        written = 0
+        for start in range(0, len(ids), rows):
+            block = (matrix[start:start + rows] @ transposed).toarray()
+            written += self._write(session, block_neighbors(block, ids, start, self.k, self.min_score))
+            session.commit()
+
+        # Lists of recipes unpublished since, and entries pointing at them
+        unpublished = select(Recipe.id).where(Recipe.is_published.is_(False))
+        session.execute(delete(RecipeNeighbor).where(
+            RecipeNeighbor.recipe_id.in_(unpublished) | RecipeNeighbor.neighbor_id.in_(unpublished)))
+        session.commit()
+        return {'recipes': len(ids), 'terms': len(terms), 'neighbors': written,
+                'seconds': round(time.monotonic() - started, 1)}
+
+    def _save_model(self, matrix, ids, terms, idf):
+        import numpy as np
+
+        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+        temporary = self.model_path + '.tmp.npz'
+        np.savez(temporary, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                 shape=np.asarray(matrix.shape), ids=ids, terms=np.asarray(terms, dtype=str), idf=idf)
+        os.replace(temporary, self.model_path)  # workers never see a half-written model
+
+    def load_model(self):
+        """The saved model (reloaded when a rebuild replaced it), or None before the first rebuild"""
+        import numpy as np
+        from scipy import sparse
+
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except FileNotFoundError:
+            return None
+        if self._model is None or mtime != self._model_mtime:
+            with np.load(self.model_path) as saved:
+                terms = saved['terms'].tolist()
+                self._model = {
+                    'matrix': sparse.csr_matrix((saved['data'], saved['indices'], saved['indptr']),
+                                                shape=tuple(saved['shape'])),
+                    'ids': saved['ids'],
+                    'vocabulary': {term: column for column, term in enumerate(terms)},
+                    'idf': saved['idf'],
+                }
+            self._model_mtime = mtime
+        return self._model
+
+    def refresh(self, recipe_id):
+        """Recompute one recipe's list and its place in its neighbors' lists; None without a model"""
+        from extensions import db
+        from models.similar import RecipeNeighbor
+
+        model = self.load_model()
+        if model is None:
+            return None
+        session = db.session
+        row = self._rows(session, [recipe_id]).first()
+        session.execute(delete(RecipeNeighbor).where(RecipeNeighbor.neighbor_id == recipe_id))
+        if row is None:  # deleted or unpublished
+            session.execute(delete(RecipeNeighbor).where(RecipeNeighbor.recipe_id == recipe_id))
+            session.commit()
+            return 0
+
+        vector = vectorize([recipe_terms(row, self.weights)], model['vocabulary'], model['idf'])
+        scores = (model['matrix'] @ vector.T).toarray().ravel()
+        neighbors = top_neighbors(scores, model['ids'], recipe_id, self.k, self.min_score)
+        self._write(session, {recipe_id: neighbors})
+
+        # Enter the lists of the closest recipes where the new score makes their top k
+        candidates = top_neighbors(scores, model['ids'], recipe_id, REVERSE_CANDIDATES, self.min_score)
+        if candidates:
+            score_of = dict(candidates)
+            lists = {candidate: [] for candidate in score_of}
+            for entry in session.scalars(select(RecipeNeighbor).where(RecipeNeighbor.recipe_id.in_(list(lists)))):
+                lists[entry.recipe_id].append((entry.neighbor_id, entry.score))
+            changed = {}
+            for candidate, entries in lists.items():
+                entries.append((recipe_id, score_of[candidate]))
+                best = sorted(entries, key=lambda entry: (-entry[1], entry[0]))[:self.k]
+                if (recipe_id, score_of[candidate]) in best:
+                    changed[candidate] = best
+            if changed:
+                self._write(session, changed)
+        session.commit()
+        return len(neighbors)
+
+    def schedule(self, recipe_id):
+        """Refresh a created or edited recipe's neighbors in the background"""
+        if self.enabled and os.path.exists(self.model_path):
+            self.executor.submit(self._refresh_in_background, recipe_id)
+
+    def _refresh_in_background(self, recipe_id):
+        from extensions import db
+        from services.sqlite_tuning import run_with_retry
+
+        with self._app.app_context():
+            try:
+                run_with_retry(lambda: self.refresh(recipe_id))
+            except Exception:
+                db.session.rollback()
+                self._app.logger.exception('Similar recipes refresh failed for recipe %s', recipe_id)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+similar_cli = AppGroup('similar', help='Maintain the precomputed similar recipes.')
+
+
+@similar_cli.command('rebuild')
+def rebuild_command():
+    """Recompute the similar recipes of every published recipe"""
+    result = current_app.extensions['similar_recipes'].rebuild()
+    click.echo(f"✅ Similar recipes rebuilt: {result['recipes']} recipes, {result['terms']} terms, "
+               f"{result['neighbors']} neighbors in {result['seconds']}s")
+
+
+@similar_cli.command('refresh')
+@click.argument('recipe_id', type=int)
+def refresh_command(recipe_id):
+    """Recompute one recipe's similar recipes against the saved model"""
+    written = current_app.extensions['similar_recipes'].refresh(recipe_id)
+    if written is None:
+        click.echo('❌ No similarity model yet; run `flask similar rebuild` first')
+    else:
+        click.echo(f"✅ Recipe {recipe_id}: {written} similar recipes")
@@ -0,0 +1,192 @@
+"""
+Slow query log.
+
+Statements that take longer than ``SLOW_QUERY_THRESHOLD_MS`` are logged
+with their parameters redacted (strings and blobs become ``<str>``) and
+the endpoint that ran them, and aggregated per statement shape (see
+``services.query_stats.statement_shape``) for ``/api/admin/slow-queries``.
+The first time a SELECT shape is slow, and again at most every
+``SLOW_QUERY_EXPLAIN_INTERVAL`` seconds, its plan is captured on a
+background thread with ``EXPLAIN QUERY PLAN`` (SQLite) or ``EXPLAIN``
+(PostgreSQL, without ANALYZE so the query isn't run again) using the
+original parameters. Each worker keeps its own aggregates.
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from services.query_stats import TRANSACTION_CONTROL, statement_shape
+
+EXPLAINABLE = ('SELECT', 'WITH')
+SORT_KEYS = {
+    'total': lambda entry: entry['total'],
+    'max': lambda entry: entry['max'],
+    'count': lambda entry: entry['count'],
+    'mean': lambda entry: entry['total'] / entry['count'],
+}
+
+
+def redact(parameters, executemany=False):
+    """Parameters safe to log: numbers, booleans and NULLs are kept, anything else is replaced by its type"""
+    if executemany and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        return f'<{len(parameters)} parameter sets>'
+    if isinstance(parameters, dict):
+        return {name: _redact_value(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return f'<{type(value).__name__}>'
+
+
+def explain_prefix(dialect_name):
+    """Statement prefix that returns a plan without running the query"""
+    return 'EXPLAIN QUERY PLAN ' if dialect_name == 'sqlite' else 'EXPLAIN '
+
+
+def format_plan(rows, dialect_name):
+    """Plan rows as text: SQLite's (id, parent, notused, detail) tree indented, others one row per line"""
+    if dialect_name != 'sqlite':
+        return '\n'.join(' | '.join(str(value) for value in row) for row in rows)
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return '\n'.join(lines)
+
+
+class SlowQueryLog:
+    """Logs and aggregates slow statements, capturing their plans in the background"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register engine listeners (call after db.init_app)"""
+        from extensions import db
+
+        self.enabled = app.config.get('SLOW_QUERY_LOG_ENABLED', True)
+        self.threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+        self.explain = app.config.get('SLOW_QUERY_EXPLAIN', True)
+        self.explain_interval = app.config.get('SLOW_QUERY_EXPLAIN_INTERVAL', 300)
+        self.max_shapes = app.config.get('SLOW_QUERY_MAX_SHAPES', 200)
+        self._app = app
+        app.extensions['slow_queries'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-query-explain')
+        return self._executor
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['slow_query_start'].pop()
+        if duration < self.threshold:
+            return
+        keyword = statement.lstrip()[:9].upper()
+        if keyword.startswith(TRANSACTION_CONTROL) or keyword.startswith('EXPLAIN'):
+            return
+        self.record(conn.engine, statement, parameters, duration, executemany)
+
+    def record(self, engine, statement, parameters, duration, executemany=False):
+        """Log a slow statement, add it to its shape's totals and schedule an EXPLAIN if due"""
+        shape = statement_shape(statement)
+        route = (request.endpoint or 'unmatched') if has_request_context() else None
+        self._app.logger.warning('Slow query (%.0f ms) in %s: %s; parameters %s', duration * 1000,
+                                 route or 'no request', ' '.join(statement.split())[:1000],
+                                 redact(parameters, executemany))
+
+        now = time.monotonic()
+        explain = False
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                if len(self._entries) >= self.max_shapes:
+                    # Forget the shape that has cost the least so far
+                    del self._entries[min(self._entries, key=lambda key: self._entries[key]['total'])]
+                entry = self._entries[shape] = {
+                    'count': 0, 'total': 0.0, 'max': 0.0, 'routes': Counter(),
+                    'last_seen': None, 'plan': None, 'explained_at': None,
+                }
+            entry['count'] += 1
+            entry['total'] += duration
+            entry['max'] = max(entry['max'], duration)
+            entry['routes'][route or 'no request'] += 1
+            entry['last_seen'] = datetime.utcnow()
+            if (self.explain and not executemany and shape.upper().startswith(EXPLAINABLE)
+                    and (entry['explained_at'] is None or now - entry['explained_at'] >= self.explain_interval)):
+                entry['explained_at'] = now
+                explain = True
+
+        if explain:
+            return self.executor.submit(self._explain, engine, shape, statement, parameters)
+        return None
+
+    def _explain(self, engine, shape, statement, parameters):
+        dialect = engine.dialect.name
+        try:
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(explain_prefix(dialect) + statement, parameters).fetchall()
+            plan = format_plan(rows, dialect)
+        except Exception:
+            self._app.logger.exception('EXPLAIN failed for slow query: %s', shape[:500])
+            return None
+
+        with self._lock:
+            if shape in self._entries:
+                self._entries[shape]['plan'] = plan
+        self._app.logger.warning('Plan for slow query %s:\n%s', shape[:500], plan)
+        return plan
+
+    def stats(self, limit=20, sort='total'):
+        """Slowest statement shapes in this worker, most costly first"""
+        with self._lock:
+            entries = sorted(self._entries.items(), key=lambda item: SORT_KEYS[sort](item[1]), reverse=True)
+            return [
+                {
+                    'statement': shape,
+                    'count': entry['count'],
+                    'total_ms': round(entry['total'] * 1000, 1),
+                    'mean_ms': round(entry['total'] / entry['count'] * 1000, 1),
+                    'max_ms': round(entry['max'] * 1000, 1),
+                    'routes': dict(entry['routes'].most_common(5)),
+                    'last_seen': entry['last_seen'].isoformat(),
+                    'plan': entry['plan'],
+                }
+                for shape, entry in entries[:limit]
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,118 @@
+"""
+SQLite performance mode.
+
+SQLite is the development database and the Railway fallback. With the
+default rollback journal every writer blocks every reader and concurrent
+gunicorn workers hit "database is locked". On each new connection this
+module enables WAL and the other pragmas in ``SQLITE_PRAGMAS``.
+
+Transactions start deferred. Right before the first write of a request, the
+read transaction is ended and replaced by ``BEGIN IMMEDIATE``, so the writer
+queues on ``busy_timeout`` instead of failing when it upgrades a read lock,
+and the database-wide write lock is only held from the first write to the
+commit, never while the request hashes a password or resizes an image.
+Reads before the first write see committed data, as on PostgreSQL.
+Writes outside requests (background jobs) can use ``run_with_retry`` for
+a bounded retry with backoff.
+"""
+
+import random
+import time
+
+from flask import current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'mmap_size': 268435456,  # 256MB
+    'cache_size': -64000,  # 64MB (negative = KiB)
+    'foreign_keys': 'ON',
+    'temp_store': 'MEMORY',
+}
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def is_lock_error(error):
+    """True for SQLite 'database is locked' / busy errors"""
+    message = str(getattr(error, 'orig', error)).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def tune_engine(engine, pragmas):
+    """Apply pragmas and explicit BEGIN handling to a SQLite engine"""
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself (pysqlite's implicit BEGIN can't be IMMEDIATE)
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def begin_transaction(connection):
+        connection.info['sqlite_write_lock'] = False
+        connection.exec_driver_sql('BEGIN')
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def take_write_lock(connection, cursor, statement, parameters, context, executemany):
+        if (connection.info.get('sqlite_write_lock', True) or not has_request_context()
+                or connection.in_nested_transaction()
+                or not statement.lstrip()[:7].upper().startswith(WRITE_STATEMENTS)):
+            return
+        connection.info['sqlite_write_lock'] = True
+        # Below SQLAlchemy, which still sees one open transaction
+        cursor.connection.execute('COMMIT')
+        cursor.connection.execute('BEGIN IMMEDIATE')
+
+
+def sqlite_pragmas(app, url):
+    """Configured pragmas for a SQLite database URL"""
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+    if url.database in (None, '', ':memory:'):
+        # WAL and mmap don't apply to in-memory databases
+        return {key: value for key, value in pragmas.items()
+                if key not in ('journal_mode', 'mmap_size')}
+    return pragmas
+
+
+def init_sqlite_tuning(app, db):
+    """Tune every SQLite engine of the app (call after db.init_app)"""
+    if not app.config.get('SQLITE_PERFORMANCE_MODE', True):
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                tune_engine(engine, sqlite_pragmas(app, engine.url))
+
+
+def run_with_retry(operation, retries=None, base_delay=None):
+    """
+    Run ``operation()`` (which must commit), retrying SQLite lock errors.
+
+    The session is rolled back between attempts and the delay doubles each
+    time with jitter. Other errors, and the last lock error, are re-raised.
+    """
+    from extensions import db
+
+    if retries is None:
+        retries = current_app.config.get('SQLITE_WRITE_RETRIES', 5)
+    if base_delay is None:
+        base_delay = current_app.config.get('SQLITE_RETRY_BASE_DELAY', 0.05)
+
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except OperationalError as e:
+            db.session.rollback()
+            if attempt == retries or not is_lock_error(e):
+                raise
+            delay = base_delay * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay))
@@ -0,0 +1,385 @@
+"""
+Request tracing with OpenTelemetry-compatible export.
+
+A sampled request gets a root span, and each SQL statement it runs gets a
+child span, as do the blocks wrapped in ``with span(...)``: image
+processing, password hashing, form parsing, commits and serialization.
+``span()`` is a no-op outside a sampled request, so instrumented code
+costs almost nothing when tracing is off.
+
+Requests are sampled with probability ``TRACING_SAMPLE_RATE``. A sampled
+request with a W3C ``traceparent`` header joins that trace. The header's
+sampled flag only decides for itself with ``TRACING_TRUST_TRACEPARENT``
+(behind a gateway that sets it), so clients can't turn tracing on for
+their own requests. Sampled responses return the trace id in the
+``X-Trace-Id`` header.
+
+Finished spans are buffered per worker and exported in batches on a
+background thread, encoded as OTLP/JSON (``ExportTraceServiceRequest``).
+They are POSTed to ``TRACING_OTLP_ENDPOINT`` (an OpenTelemetry Collector,
+Jaeger or Tempo on ``http://host:4318/v1/traces``) when it is set. Otherwise
+they are appended to ``TRACING_FILE``, one request object per line. That
+is the format of the collector's file exporter and ``otlpjsonfile``
+receiver. ``flask traces show`` prints the traces in that file as trees.
+Spans still buffered when a worker is killed are lost.
+"""
+
+import atexit
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+import click
+from flask import current_app, request
+from flask.cli import AppGroup
+from sqlalchemy import event
+
+# OTLP span kinds and status codes
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_ERROR = 2
+
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+MAX_STATEMENT_LENGTH = 2000
+
+_current_span = ContextVar('current_span', default=None)
+
+
+class Span:
+    """A timed operation in a trace; ended spans go to the tracer's buffer"""
+
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'name', 'kind', 'attributes',
+                 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, tracer, name, trace_id, parent_id=None, kind=KIND_INTERNAL, attributes=None):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def child(self, name, kind=KIND_INTERNAL, **attributes):
+        return Span(self.tracer, name, self.trace_id, self.span_id, kind, attributes)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, message):
+        self.error = message
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        self.tracer.add(self)
+
+
+@contextmanager
+def span(name, kind=KIND_INTERNAL, **attributes):
+    """Time a block as a child of the current span; yields None outside a sampled request"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, kind, **attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set_error(f'{type(e).__name__}: {e}')
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}  # 64-bit integers are strings in OTLP/JSON
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def otlp_json(spans, service_name):
+    """Spans as an OTLP/JSON ExportTraceServiceRequest"""
+    encoded = []
+    for item in spans:
+        data = {
+            'traceId': item.trace_id,
+            'spanId': item.span_id,
+            'name': item.name,
+            'kind': item.kind,
+            'startTimeUnixNano': str(item.start_ns),
+            'endTimeUnixNano': str(item.end_ns),
+            'attributes': [{'key': key, 'value': _attribute_value(value)} for key, value in item.attributes.items()],
+        }
+        if item.parent_id:
+            data['parentSpanId'] = item.parent_id
+        if item.error:
+            data['status'] = {'code': STATUS_ERROR, 'message': item.error}
+        encoded.append(data)
+    return {'resourceSpans': [{
+        'resource': {'attributes': [
+            {'key': 'service.name', 'value': {'stringValue': service_name}},
+            {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}},
+        ]},
+        'scopeSpans': [{'scope': {'name': 'tastyshare.tracing'}, 'spans': encoded}],
+    }]}
+
+
+class Tracer:
+    """Traces sampled requests and exports their spans in batches"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._exported_at = time.monotonic()
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register request hooks and engine listeners (call after db.init_app)"""
+        from extensions import db
+
+        self.enabled = app.config.get('TRACING_ENABLED', False)
+        self.sample_rate = app.config.get('TRACING_SAMPLE_RATE', 1.0)
+        self.trust_traceparent = app.config.get('TRACING_TRUST_TRACEPARENT', False)
+        self.header = app.config.get('TRACING_HEADER', 'X-Trace-Id')
+        self.service_name = app.config.get('TRACING_SERVICE_NAME', 'tastyshare')
+        self.endpoint = app.config.get('TRACING_OTLP_ENDPOINT')
+        self.file = app.config.get('TRACING_FILE') or os.path.join(app.instance_path, 'traces.jsonl')
+        self.max_file_bytes = app.config.get('TRACING_FILE_MAX_MB', 50) * 1024 * 1024
+        self.batch_size = app.config.get('TRACING_BATCH_SIZE', 512)
+        self.export_interval = app.config.get('TRACING_EXPORT_INTERVAL', 5)
+        self._app = app
+        app.extensions['tracing'] = self
+        app.cli.add_command(traces_cli)
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        atexit.register(self.shutdown)
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+                event.listen(engine, 'handle_error', self._handle_error)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tracing-export')
+        return self._executor
+
+    def _start_request(self):
+        parent = TRACEPARENT.match(request.headers.get('traceparent', ''))
+        if parent and self.trust_traceparent:
+            sampled = bool(int(parent.group(3), 16) & 1)  # the upstream sampling decision
+        else:
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return
+        if parent:
+            trace_id, parent_id = parent.group(1), parent.group(2)
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+        root = Span(self, request.method, trace_id, parent_id, KIND_SERVER, {
+            'http.request.method': request.method,
+            'url.path': request.path,
+        })
+        if request.url_rule is not None:
+            root.name = f'{request.method} {request.url_rule.rule}'
+            root.attributes['http.route'] = request.url_rule.rule
+        request.environ['tracing.token'] = _current_span.set(root)
+
+    def _finish_request(self, response):
+        if 'tracing.token' in request.environ:
+            root = _current_span.get()
+            root.set_attribute('http.response.status_code', response.status_code)
+            if response.status_code >= 500:
+                root.set_error(f'HTTP {response.status_code}')
+            response.headers[self.header] = root.trace_id
+        return response
+
+    def _teardown_request(self, exc):
+        token = request.environ.pop('tracing.token', None)
+        if token is None:
+            return
+        root = _current_span.get()
+        _current_span.reset(token)
+        if exc is not None:
+            root.set_attribute('http.response.status_code', 500)
+            root.set_error(f'{type(exc).__name__}: {exc}')
+        root.end()
+        self.tick()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        operation = statement.lstrip()[:10].split(None, 1)[0].upper() if statement.strip() else 'SQL'
+        conn.info.setdefault('tracing_spans', []).append(parent.child(operation, KIND_CLIENT, **{
+            'db.system': conn.engine.dialect.name,
+            'db.operation.name': operation,
+            'db.query.text': ' '.join(statement.split())[:MAX_STATEMENT_LENGTH],
+        }))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('tracing_spans')
+        if spans:
+            statement_span = spans.pop()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                statement_span.set_attribute('db.response.returned_rows', cursor.rowcount)
+            statement_span.end()
+
+    def _handle_error(self, context):
+        spans = context.connection.info.get('tracing_spans') if context.connection is not None else None
+        if spans:
+            statement_span = spans.pop()
+            statement_span.set_error(f'{type(context.original_exception).__name__}: {context.original_exception}')
+            statement_span.end()
+
+    def add(self, finished):
+        with self._lock:
+            self._buffer.append(finished)
+
+    def tick(self):
+        """Export the buffered spans in the background when a batch is full or due"""
+        now = time.monotonic()
+        if self._buffer and (len(self._buffer) >= self.batch_size or now - self._exported_at >= self.export_interval):
+            self._exported_at = now
+            self.executor.submit(self.flush)
+
+    def flush(self):
+        """Export all buffered spans now; returns how many were exported"""
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if not spans:
+            return 0
+        try:
+            payload = json.dumps(otlp_json(spans, self.service_name), separators=(',', ':'))
+            if self.endpoint:
+                self._post(payload)
+            else:
+                self._append(payload)
+        except Exception:
+            self._app.logger.exception('Exporting %d trace spans failed', len(spans))
+            return 0
+        return len(spans)
+
+    def _post(self, payload):
+        import urllib.request
+
+        export = urllib.request.Request(self.endpoint, data=payload.encode(), method='POST',
+                                        headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(export, timeout=5) as response:
+            response.read()
+
+    def _append(self, payload):
+        os.makedirs(os.path.dirname(self.file), exist_ok=True)
+        try:
+            if os.path.getsize(self.file) > self.max_file_bytes:
+                os.replace(self.file, self.file + '.1')  # keep one rotated file
+        except FileNotFoundError:
+            pass
+        # One write per batch in append mode, so lines from several workers don't interleave
+        with open(self.file, 'a') as f:
+            f.write(payload + '\n')
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.flush()
+
+
+def read_traces(path):
+    """Spans of an OTLP/JSON lines file, grouped by trace id (file order)"""
+    traces = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line).get('resourceSpans', []):
+                for scope_spans in resource_spans.get('scopeSpans', []):
+                    for item in scope_spans.get('spans', []):
+                        traces.setdefault(item['traceId'], []).append(item)
+    return traces
+
+
+def format_trace(spans):
+    """A trace as an indented tree: offset, duration and name of each span"""
+    children = {}
+    ids = {item['spanId'] for item in spans}
+    for item in sorted(spans, key=lambda item: int(item['startTimeUnixNano'])):
+        parent = item.get('parentSpanId')
+        children.setdefault(parent if parent in ids else None, []).append(item)
+    start = min(int(item['startTimeUnixNano']) for item in spans)
+
+    lines = []
+
+    def walk(item, depth):
+        attributes = {entry['key']: next(iter(entry['value'].values())) for entry in item.get('attributes', [])}
+        offset = (int(item['startTimeUnixNano']) - start) / 1e6
+        duration = (int(item['endTimeUnixNano']) - int(item['startTimeUnixNano'])) / 1e6
+        detail = attributes.get('db.query.text') or attributes.get('http.response.status_code', '')
+        error = f"  ❌ {item['status'].get('message', '')}" if item.get('status', {}).get('code') == STATUS_ERROR else ''
+        lines.append(f"{offset:>9.1f} {duration:>9.1f} ms  {'  ' * depth}{item['name']}  {str(detail)[:100]}{error}")
+        for child in children.get(item['spanId'], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return '\n'.join(lines)
+
+
+traces_cli = AppGroup('traces', help='Inspect exported request traces.')
+
+
+@traces_cli.command('show')
+@click.option('--trace-id', help='Only this trace')
+@click.option('--limit', default=5, show_default=True, help='Most recent traces to show')
+@click.option('--min-ms', default=0.0, help='Only traces whose root took at least this long')
+def show_command(trace_id, limit, min_ms):
+    """Print traces from TRACING_FILE as span trees"""
+    path = current_app.extensions['tracing'].file
+    if not os.path.exists(path):
+        click.echo(f'No traces at {path}')
+        return
+    traces = read_traces(path)
+    if trace_id:
+        selected = [(trace_id, traces.get(trace_id, []))]
+    else:
+        selected = []
+        for key, spans in reversed(list(traces.items())):
+            duration = max(int(item['endTimeUnixNano']) for item in spans) - \
+                min(int(item['startTimeUnixNano']) for item in spans)
+            if duration >= min_ms * 1e6:
+                selected.append((key, spans))
+            if len(selected) >= limit:
+                break
+    for key, spans in selected:
+        if not spans:
+            click.echo(f'Trace {key} not found')
+            continue
+        started = datetime.utcfromtimestamp(min(int(item['startTimeUnixNano']) for item in spans) / 1e9)
+        click.echo(f'🔎 Trace {key} at {started.isoformat(timespec="milliseconds")}Z, {len(spans)} spans')
+        click.echo(f"{'start ms':>9} {'duration':>12}  span")
+        click.echo(format_trace(spans))
+        click.echo()
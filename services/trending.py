@@ -0,0 +1,289 @@
+"""
+Time-decayed trending ranking.
+
+Views, favorites and reviews are summed in a per-worker buffer and flushed
+at most every ``TRENDING_FLUSH_INTERVAL`` seconds as one ``trending_events``
+row per recipe and kind. A refresh (``flask trending refresh`` from a scheduler, or
+automatically every ``TRENDING_REFRESH_INTERVAL`` seconds in a background
+thread) multiplies every score in ``recipe_trending`` by
+``0.5 ** (elapsed / half-life)``, adds the decayed weight of the pending
+events and deletes them. Its cost follows the activity since the last
+refresh plus the ranked rows, never the full history, and
+``sort_by=trending`` reads a single page off ``ix_recipe_trending_score``.
+
+Buffered events of a worker that is killed before its next flush are lost,
+which is acceptable for a popularity signal.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, func, select, text
+
+DEFAULT_WEIGHTS = {'view': 1.0, 'favorite': 5.0, 'review': 8.0}
+
+# pg_advisory lock id so only one worker refreshes at a time
+ADVISORY_LOCK_KEY = 7301
+
+CHUNK_SIZE = 500
+
+# Rows sampled per index by SQLite's ANALYZE after a refresh
+ANALYSIS_LIMIT = 400
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class TrendingTracker:
+    """Buffers recipe activity and maintains the materialized ranking"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._buffer = defaultdict(float)
+        self._flushed_at = time.monotonic()
+        self._refresh_due = 0
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('TRENDING_ENABLED', True)
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(app.config.get('TRENDING_WEIGHTS') or {})
+        self.half_life = app.config.get('TRENDING_HALF_LIFE_HOURS', 24) * 3600
+        self.flush_interval = app.config.get('TRENDING_FLUSH_INTERVAL', 30)
+        self.refresh_interval = app.config.get('TRENDING_REFRESH_INTERVAL', 300)
+        self.min_score = app.config.get('TRENDING_MIN_SCORE', 0.05)
+        self._app = app
+        app.extensions['trending'] = self
+        app.after_request(self._after_request)
+        app.cli.add_command(trending_cli)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='trending')
+        return self._executor
+
+    def decay(self, seconds):
+        """Weight left after ``seconds`` of exponential decay"""
+        return 0.5 ** (max(seconds, 0) / self.half_life)
+
+    def record(self, recipe_id, kind):
+        """Count one 'view', 'favorite' or 'review' of a recipe"""
+        weight = self.weights.get(kind)
+        if not self.enabled or not weight:
+            return
+        with self._lock:
+            self._buffer[recipe_id, kind] += weight
+
+    def _after_request(self, response):
+        self.tick()
+        return response
+
+    def tick(self):
+        """Flush the buffer and schedule a refresh when due (needs an app context)"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self._buffer and now - self._flushed_at >= self.flush_interval:
+            self.flush()
+        if self.refresh_interval and now >= self._refresh_due:
+            self._refresh_due = now + self.refresh_interval
+            self.executor.submit(self._refresh_in_background)
+
+    def flush(self):
+        """Write buffered weights as one event row per recipe and kind; returns rows written"""
+        from extensions import db
+        from models.trending import TrendingEvent
+
+        session = db.session
+        if session.new or session.dirty or session.deleted:
+            # Never commit half-finished work of the request handler
+            return 0
+
+        with self._lock:
+            buffer, self._buffer = self._buffer, defaultdict(float)
+            self._flushed_at = time.monotonic()
+        if not buffer:
+            return 0
+
+        now = datetime.utcnow()
+        try:
+            session.commit()  # end the request's read transaction before writing
+            session.execute(db.insert(TrendingEvent), [
+                {'recipe_id': recipe_id, 'kind': kind, 'weight': weight, 'created_at': now}
+                for (recipe_id, kind), weight in buffer.items()
+            ])
+            session.commit()
+        except Exception:
+            session.rollback()
+            with self._lock:
+                for key, weight in buffer.items():
+                    self._buffer[key] += weight
+            current_app.logger.warning('Trending flush failed; keeping %d events buffered',
+                                       len(buffer), exc_info=True)
+            return 0
+        return len(buffer)
+
+    def refresh(self, now=None):
+        """
+        Decay the ranking to ``now`` and fold in pending events.
+
+        Returns counts of processed events, touched recipes and pruned rows,
+        or None when another worker holds the refresh lock.
+        """
+        from extensions import db
+        from models.recipe import Recipe
+        from models.trending import RecipeTrending, TrendingEvent
+
+        now = now or datetime.utcnow()
+        session = db.session
+        ranking = RecipeTrending.__table__
+
+        if session.get_bind().dialect.name == 'postgresql':
+            locked = session.execute(text('SELECT pg_try_advisory_xact_lock(:key)'),
+                                     {'key': ADVISORY_LOCK_KEY}).scalar()
+            if not locked:
+                session.rollback()
+                return None
+
+        last = session.scalar(select(func.max(RecipeTrending.updated_at)))
+        if last is not None and now > last:
+            factor = self.decay((now - last).total_seconds())
+            session.execute(ranking.update().values(score=ranking.c.score * factor, updated_at=now))
+
+        events = session.execute(
+            select(TrendingEvent.id, TrendingEvent.recipe_id, TrendingEvent.weight, TrendingEvent.created_at)
+            .order_by(TrendingEvent.id)
+        ).all()
+        deltas = defaultdict(float)
+        for event in events:
+            deltas[event.recipe_id] += event.weight * self.decay((now - event.created_at).total_seconds())
+
+        updates, inserts = [], []
+        for ids in _chunks(deltas):
+            existing = set(session.scalars(select(Recipe.id).where(Recipe.id.in_(ids))))
+            ranked = set(session.scalars(select(RecipeTrending.recipe_id).where(RecipeTrending.recipe_id.in_(ids))))
+            for recipe_id in ids:
+                if recipe_id in ranked:
+                    updates.append({'row_id': recipe_id, 'delta': deltas[recipe_id]})
+                elif recipe_id in existing:
+                    inserts.append({'recipe_id': recipe_id, 'score': deltas[recipe_id], 'updated_at': now})
+
+        if updates:
+            session.execute(
+                ranking.update()
+                .where(ranking.c.recipe_id == bindparam('row_id'))
+                .values(score=ranking.c.score + bindparam('delta'), updated_at=now),
+                updates
+            )
+        if inserts:
+            session.execute(ranking.insert(), inserts)
+        if events:
+            session.execute(db.delete(TrendingEvent).where(TrendingEvent.id <= events[-1].id))
+        pruned = session.execute(db.delete(RecipeTrending).where(RecipeTrending.score < self.min_score)).rowcount
+        session.commit()
+
+        if session.get_bind().dialect.name == 'sqlite':
+            self._analyze(session)
+
+        return {'events': len(events), 'recipes': len(deltas), 'pruned': pruned}
+
+    @staticmethod
+    def _analyze(session):
+        # Without sqlite_stat1 the planner scans published recipes and sorts
+        # instead of walking ix_recipe_trending_score; the limit keeps this cheap
+        session.execute(text(f'PRAGMA analysis_limit={ANALYSIS_LIMIT}'))
+        for table in ('recipes', 'recipe_trending'):
+            session.execute(text(f'ANALYZE {table}'))
+        session.commit()
+
+    def rebuild(self, now=None):
+        """
+        Recompute the ranking from favorite and review timestamps.
+
+        Used to bootstrap the table. Pending favorite and review events are
+        replaced by the recomputed ones; views have no history, so pending
+        view events are kept.
+        """
+        from extensions import db
+        from models.favorite import Favorite
+        from models.review import Review
+        from models.trending import RecipeTrending, TrendingEvent
+
+        now = now or datetime.utcnow()
+        session = db.session
+        scores = defaultdict(float)
+        for model, kind in ((Favorite, 'favorite'), (Review, 'review')):
+            rows = session.execute(select(model.recipe_id, model.created_at).where(model.created_at.isnot(None)))
+            for recipe_id, created_at in rows:
+                scores[recipe_id, kind] += self.weights.get(kind, 0) * self.decay((now - created_at).total_seconds())
+
+        session.execute(db.delete(RecipeTrending))
+        session.execute(db.delete(TrendingEvent).where(TrendingEvent.kind.in_(('favorite', 'review'))))
+        # Rewritten as events so refresh() applies the same existence checks and pruning
+        if scores:
+            session.execute(db.insert(TrendingEvent), [
+                {'recipe_id': recipe_id, 'kind': kind, 'weight': score, 'created_at': now}
+                for (recipe_id, kind), score in scores.items()
+            ])
+        session.commit()
+        return self.refresh(now)
+
+    def _refresh_in_background(self):
+        from extensions import db
+        from models.trending import RecipeTrending
+
+        with self._app.app_context():
+            try:
+                self.flush()
+                last = db.session.scalar(select(func.max(RecipeTrending.updated_at)))
+                if last is None or (datetime.utcnow() - last).total_seconds() >= self.refresh_interval:
+                    self.refresh()
+                else:
+                    db.session.rollback()
+            except Exception:
+                db.session.rollback()
+                self._app.logger.exception('Trending refresh failed')
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+trending_cli = AppGroup('trending', help='Maintain the trending recipe ranking.')
+
+
+@trending_cli.command('refresh')
+def refresh_command():
+    """Fold buffered events into the ranking (run from a scheduler)"""
+    tracker = current_app.extensions['trending']
+    tracker.flush()
+    result = tracker.refresh()
+    if result is None:
+        click.echo('⏳ Another worker is refreshing the trending ranking')
+    else:
+        click.echo(f"✅ Trending refreshed: {result['events']} events, "
+                   f"{result['recipes']} recipes, {result['pruned']} pruned")
+
+
+@trending_cli.command('rebuild')
+def rebuild_command():
+    """Recompute the ranking from favorites and reviews"""
+    result = current_app.extensions['trending'].rebuild()
+    if result is None:
+        click.echo('⏳ Another worker is refreshing the trending ranking')
+    else:
+        click.echo(f"✅ Trending rebuilt: {result['recipes']} recipes ranked")
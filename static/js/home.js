@@ -8,8 +8,14 @@ document.addEventListener('DOMContentLoaded', function() {
 
 async function loadFeaturedRecipes() {
     try {
-        const response = await fetchWithAuth('/api/recipes?sort_by=rating&per_page=6');
-        const data = await response.json();
+        let response = await fetchWithAuth('/api/recipes?sort_by=trending&per_page=6&view=card');
+        let data = await response.json();
+        
+        // Nothing trending yet (new site or quiet period): show the latest recipes
+        if (!data.recipes || data.recipes.length === 0) {
+            response = await fetchWithAuth('/api/recipes?sort_by=rating&per_page=6&view=card');
+            data = await response.json();
+        }
         
         const container = document.getElementById('featured-recipes');
         
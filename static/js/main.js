@@ -154,7 +154,7 @@ function createRecipeCard(recipe, options = {}) {
                      onerror="this.src='/static/images/recipe-placeholder.svg'">
                 <div class="card-body d-flex flex-column">
                     <h5 class="card-title">${recipe.title}</h5>
-                    <p class="card-text text-truncate-3">${recipe.description}</p>
+                    <p class="card-text text-truncate-3">${recipe.summary ?? recipe.description}</p>
                     ${authorInfo}
                     
                     <div class="recipe-meta mt-auto">
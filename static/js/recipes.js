@@ -132,6 +132,7 @@ class RecipesManager {
             const params = new URLSearchParams({
                 page: page,
                 per_page: 12,
+                view: 'card',
                 ...this.currentFilters
             });
 
@@ -219,7 +220,7 @@ class RecipesManager {
                                     </div>
                                 </div>
                                 
-                                <p class="card-text text-truncate-2">${recipe.description}</p>
+                                <p class="card-text text-truncate-2">${recipe.summary ?? recipe.description}</p>
                                 
                                 <div class="row g-2 mb-3">
                                     <div class="col-auto">